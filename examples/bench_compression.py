@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+import os
+import sys
+import time
+import tempfile
+
+from adif_file import adi, adx, compressed
+
+
+def gen_doc(qsos: int) -> dict:
+    return {'HEADER': {'PROGRAMID': 'bench_compression'},
+            'RECORDS': [{'CALL': f'DL{i % 10}ABC',
+                         'QSO_DATE': '20250425',
+                         'TIME_ON': f'{i % 24:02d}{i % 60:02d}',
+                         'BAND': '20M',
+                         'MODE': 'SSB',
+                         'NAME': f'Test OM #{i}',
+                         'GRIDSQUARE': 'JO30uj',
+                         'RST_SENT': '59',
+                         'RST_RCVD': '59'} for i in range(qsos)]}
+
+
+def main():
+    qsos = 100000
+    if len(sys.argv) > 1:
+        try:
+            qsos = int(sys.argv[1])
+        except ValueError:
+            sys.exit('Argument must be a valid integer')
+
+    extensions = ['', '.gz', '.bz2', '.xz']
+    if compressed.available('zstd'):
+        extensions.append('.zst')
+    else:
+        print('zstd skipped (zstandard not installed)')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The ADX export is dominated by the XSD validation, so a smaller log is used
+        for fmt, module, count in (('adi', adi, qsos), ('adx', adx, qsos // 10)):
+            print(f'Generating {count} QSOs for {fmt.upper()}...')
+            doc = gen_doc(count)
+            raw_size = None
+            for ext in extensions:
+                file_name = os.path.join(tmp, f'bench.{fmt}{ext}')
+
+                start = time.perf_counter()
+                module.dump(file_name, doc, fsync=False)
+                write_time = time.perf_counter() - start
+                size = os.path.getsize(file_name)
+                raw_size = raw_size or size
+
+                start = time.perf_counter()
+                module.load(file_name)
+                read_time = time.perf_counter() - start
+
+                print(f'{fmt}{ext or " (plain)":8} size {size / 1e6:7.2f} MB (ratio {raw_size / size:5.1f}), '
+                      f'write {raw_size / write_time / 1e6:6.2f} MB/s, read {raw_size / read_time / 1e6:6.2f} MB/s')
+
+
+if __name__ == '__main__':
+    main()
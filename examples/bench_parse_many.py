@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+
+import sys
+import time
+import sysconfig
+
+from adif_file import adi
+
+
+def gen_log(qsos: int, seed: int) -> str:
+    doc = {'HEADER': {'PROGRAMID': 'bench_parse_many'},
+           'RECORDS': [{'CALL': f'DL{(seed + i) % 10}ABC',
+                        'QSO_DATE': '20250425',
+                        'TIME_ON': f'{i % 24:02d}{i % 60:02d}',
+                        'BAND': '20m',
+                        'MODE': 'SSB',
+                        'NAME': f'Test OM #{i}',
+                        'GRIDSQUARE': 'JO30uj',
+                        'RST_SENT': '59',
+                        'RST_RCVD': '59'} for i in range(qsos)]}
+    return adi.dumps(doc)
+
+
+def main():
+    logs = 200
+    qsos = 500
+    if len(sys.argv) > 1:
+        try:
+            logs = int(sys.argv[1])
+        except ValueError:
+            sys.exit('Argument must be a valid integer')
+
+    gil = sys._is_gil_enabled() if hasattr(sys, '_is_gil_enabled') else True
+    print(f'Python {sys.version.split()[0]}, free-threaded build: {bool(sysconfig.get_config_var("Py_GIL_DISABLED"))}, '
+          f'GIL enabled: {gil}')
+    print(f'Generating {logs} logs with {qsos} QSOs each...')
+    data = [gen_log(qsos, i) for i in range(logs)]
+
+    base = None
+    for workers in (1, 2, 4, 8):
+        start = time.perf_counter()
+        adi.parse_many(data, workers)
+        duration = time.perf_counter() - start
+        base = base or duration
+        print(f'parse_many workers={workers}: {duration:.3f}s ({logs * qsos / duration:,.0f} records/s, '
+              f'speedup {base / duration:.2f})')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,23 +2,20 @@
 
 import os
 import sys
-import json
 import random
 import string
 import datetime
 
-from adif_file import adx, adi
+from adif_file import adx, adi, band, mode
 
 
 def get_file_path(file: str):
     return os.path.join(os.path.dirname(__file__), file)
 
 
-with open(get_file_path('data/bands.json')) as bf:
-    BANDS: dict = json.load(bf)
+BANDS: dict = band.load_bands()
 
-with open(get_file_path('data/modes.json')) as mf:
-    MODES: dict = json.load(mf)
+MODES: dict = mode.load_modes()
 
 
 def gen_call(calls: int = 1000, cnt_prefix: str = '', anc_suffix: str = ''):
@@ -68,22 +65,9 @@ def get_rand_suffix() -> str:
 
 
 # noinspection PyPep8Naming
-def main():
-    rec_amount = 1000
-    adif_type = 'i'
-    if '-x' in sys.argv[1:]:
-        adif_type = 'x'
-        sys.argv.remove('-x')
-
-    if len(sys.argv) > 1:
-        try:
-            rec_amount = int(sys.argv[1])
-        except ValueError:
-            sys.exit('Argument must be a valid integer')
-
-
+def gen_doc(rec_amount: int = 1000, program_id: str = 'gen_big_adi.py') -> dict:
     doc = {
-        'HEADER': {'PROGRAMID': os.path.basename(sys.argv[0]),
+        'HEADER': {'PROGRAMID': program_id,
                    'PROGRAMVERSION': '0.2'},
         'RECORDS': []
     }
@@ -122,6 +106,24 @@ def main():
 
         doc['RECORDS'].append(record)
 
+    return doc
+
+
+def main():
+    rec_amount = 1000
+    adif_type = 'i'
+    if '-x' in sys.argv[1:]:
+        adif_type = 'x'
+        sys.argv.remove('-x')
+
+    if len(sys.argv) > 1:
+        try:
+            rec_amount = int(sys.argv[1])
+        except ValueError:
+            sys.exit('Argument must be a valid integer')
+
+    doc = gen_doc(rec_amount, os.path.basename(sys.argv[0]))
+
     print(f'Generating testfile for {rec_amount} QSOs...')
     if adif_type == 'i':
         adi.dump(f'big_testfile_{rec_amount}.adi', doc, comment=f'Big test file with {rec_amount} QSOs')
@@ -6,6 +6,7 @@ import sys
 import json
 
 from adif_file import adi
+from adif_file.util import adif_date2iso, adif_time2iso
 
 NUSHELL_VERSION = 0, 102
 PLUGIN_VERSION = '0.1.1'
@@ -86,19 +87,6 @@ def signatures():
     }
 
 
-def adif_date2iso(date: str) -> str:
-    """Convert ADIF date to iso format"""
-    if not date or len(date) != 8:
-        return date
-    return date[:4] + '-' + date[4:6] + '-' + date[6:8]
-
-
-def adif_time2iso(time: str) -> str:
-    if not time or len(time) not in (4, 6):
-        return time
-    return time[:2] + ':' + time[2:4] + (':' + time[4:6] if len(time) == 6 else '')
-
-
 def process_to_adi(data):
     """Convert table data to ADIF string"""
     global __adi_doc__
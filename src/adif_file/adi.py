@@ -3,13 +3,21 @@
 
 """Convert ADIF ADI content to dictionary and vice versa"""
 
+import io
+import os
 import re
-import copy
+import codecs
+import time
+import inspect
 from warnings import warn
-from collections.abc import Iterator
+from typing import Any, NamedTuple, Union, Optional, TextIO
+from collections.abc import Callable, Iterable, Iterator, AsyncIterator, Mapping
 
 from . import __version_str__, __proj_name__
-from .util import get_cur_adif_dt, replace_non_ascii
+from .util import get_cur_adif_dt, get_translation_table
+from .output import AtomicFile, OutputStats, BUFFER_SIZE
+from . import compressed
+from . import metrics
 
 
 class TooMuchHeadersException(Exception):
@@ -17,7 +25,12 @@ class TooMuchHeadersException(Exception):
 
 
 class TagDefinitionException(Exception):
-    pass
+    def __init__(self, message: str = '', offset: Optional[int] = None, tag: Optional[str] = None):
+        super().__init__(message)
+        self.offset = offset
+        """position of the invalid tag in the unpacked data"""
+        self.tag = tag
+        """text of the invalid tag"""
 
 
 class StringNotASCIIException(Exception):
@@ -32,12 +45,21 @@ class IllegalDataTypeException(Exception):
     pass
 
 
+class IncompleteFileException(Exception):
+    pass
+
+
 class NonASCIIWarning(Warning):
     pass
 
 
 REGEX_ASCII = re.compile(r'[ -~\n\r]*')
 REGEX_PARAM = re.compile(r'[a-zA-Z][a-zA-Z_0-9]*')
+REGEX_EOX = re.compile(r'<[eE][oO]([hHrR])>')
+REGEX_SPACE = re.compile(r'\s*')
+
+CHUNK_SIZE = 1024 * 1024
+ASYNC_CHUNK_SIZE = 64 * 1024
 
 
 def unpack(data: str, strip_tags: bool = True) -> dict[str, str]:
@@ -60,7 +82,10 @@ def unpack(data: str, strip_tags: bool = True) -> dict[str, str]:
         except ValueError:
             break
 
-        end = data.index('>', start)
+        try:
+            end = data.index('>', start)
+        except ValueError:
+            raise TagDefinitionException('Wrong tag definition', start, data[start:]) from None
         tag = data[start + 1:end]
         dtype = None
         try:
@@ -69,13 +94,13 @@ def unpack(data: str, strip_tags: bool = True) -> dict[str, str]:
             length = tag_def[1]
             if len(tag_def) == 3:
                 dtype = tag_def[2]
-        except ValueError:
-            raise TagDefinitionException('Wrong tag definition')
+        except (ValueError, IndexError):
+            raise TagDefinitionException('Wrong tag definition', start, data[start:end + 1]) from None
 
         try:
             length = int(length)
         except ValueError:
-            raise TagDefinitionException('Wrong length')
+            raise TagDefinitionException('Wrong length', start, data[start:end + 1]) from None
 
         value = data[end + 1:end + 1 + length]
         if param.upper().startswith('USERDEF'):
@@ -89,34 +114,386 @@ def unpack(data: str, strip_tags: bool = True) -> dict[str, str]:
     return unpacked
 
 
-def loadi(adi: str, skip: int = 0, strip_tags: bool = True) -> Iterator[dict[str, str]]:
+class RawRecord(NamedTuple):
+    """A header or record with the original ADI text it was parsed from (see loadi_raw)"""
+    fields: dict[str, str]
+    """the parsed fields"""
+    text: str
+    """the original text from the first tag (or header comment) up to and including <EOR>/<EOH>"""
+    start: int
+    """offset of the text in the input (in characters)"""
+    end: int
+    """offset after the text in the input (in characters)"""
+
+
+class RecordError(NamedTuple):
+    """A header or record skipped by a tolerant load (see loadi)"""
+    record: int
+    """the record number (0 for the header)"""
+    offset: int
+    """offset of the invalid tag in the input (in characters)"""
+    tag: str
+    """text of the invalid tag"""
+    message: str
+    """the error message"""
+
+
+class LazyRecord(Mapping):
+    """Read only record which keeps its ADI text and is unpacked on first access (see loadi with lazy)
+    The fields are cached after the first access and the text is released.
+
+    :param text: the ADI text of the record without <EOR>
+    :param strip_tags: remove any leading or trailing whitespaces in tag names
+    :param stages: functions applied to the record when it is unpacked"""
+
+    __slots__ = ('_text', '_strip_tags', '_stages', '_fields')
+
+    def __init__(self, text: str, strip_tags: bool = True, stages: tuple = ()):
+        self._text = text
+        self._strip_tags = strip_tags
+        self._stages = stages
+        self._fields = None
+
+    def _unpack(self) -> dict[str, str]:
+        if self._fields is None:
+            rec = unpack(self._text, self._strip_tags)
+            for stage in self._stages:
+                rec = stage(rec)
+            self._fields = rec
+            self._text = None
+        return self._fields
+
+    @property
+    def unpacked(self) -> bool:
+        """True if the record was already unpacked"""
+        return self._fields is not None
+
+    def __getitem__(self, key: str) -> str:
+        return self._unpack()[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._unpack()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._unpack())
+
+    def __len__(self) -> int:
+        return len(self._unpack())
+
+    def __repr__(self) -> str:
+        return f'LazyRecord({self._unpack()!r})'
+
+
+class _Splitter:
+    """Incremental splitter for ADI text into header and record parts
+    Text can be fed in chunks of any size. Every complete part is returned as tuple (is_header, text).
+    If the data has no header an empty header part is returned in front of the first record.
+    With raw the parts are returned as (is_header, text, raw_text, offset) where raw_text is the
+    original text including the end marker without leading whitespaces and offset its position in the input."""
+
+    def __init__(self, raw: bool = False):
+        self._buf = ''
+        self._pos = 0
+        self._header_done = False
+        self._raw = raw
+        self._offset = 0
+
+    def feed(self, text: str) -> list[tuple[bool, str]]:
+        """Add text and return the parts completed by it
+        :param text: the next chunk of ADI data
+        :return: list of (is_header, text) tuples
+        :raises TooMuchHeadersException: if the data contains more than one header"""
+
+        buf = self._buf + text if self._buf else text
+        parts = []
+        start = 0
+        for m in REGEX_EOX.finditer(buf, self._pos):
+            if m.group(1) in 'hH':
+                if self._header_done:
+                    raise TooMuchHeadersException()
+                parts.append(self._span(True, buf, start, m) if self._raw else (True, buf[start:m.start()]))
+            else:
+                if not self._header_done:  # Header is missing
+                    parts.append((True, '', '', self._offset + start) if self._raw else (True, ''))
+                parts.append(self._span(False, buf, start, m) if self._raw else (False, buf[start:m.start()]))
+            self._header_done = True
+            start = m.end()
+
+        self._buf = buf[start:] if start else buf
+        self._offset += start
+        self._pos = max(0, len(self._buf) - 4)  # A marker may be split over two chunks
+        return parts
+
+    def _span(self, is_header: bool, buf: str, start: int, m: re.Match) -> tuple[bool, str, str, int]:
+        start = REGEX_SPACE.match(buf, start).end()
+        return is_header, buf[start:m.start()], buf[start:m.end()], self._offset + start
+
+    def close(self) -> list[tuple]:
+        """Finish splitting, a trailing part without <EOR> is dropped
+        :return: the empty header part if no part was found at all"""
+
+        self._buf = ''
+        self._pos = 0
+        if not self._header_done:
+            self._header_done = True
+            return [(True, '', '', self._offset) if self._raw else (True, '')]
+        return []
+
+
+def _read_chunks(adi: Union[str, TextIO], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    if isinstance(adi, str):
+        yield adi
+    else:
+        yield from iter(lambda: adi.read(chunk_size), '')
+
+
+def _parts(adi: Union[str, TextIO], raw: bool = False) -> Iterator[tuple]:
+    splitter = _Splitter(raw)
+    for chunk in _read_chunks(adi):
+        yield from splitter.feed(chunk)
+    yield from splitter.close()
+
+
+def split(adi: Union[str, TextIO]) -> Iterator[tuple[bool, str]]:
+    """Split ADI data into the text of the header and the records without unpacking them
+    The text can be unpacked later (see unpack) e.g. in a worker process.
+    If a text stream (e.g. an opened file) is given it is read incrementally.
+
+    :param adi: the ADI data as string or text stream
+    :return: an iterator of (is_header, text) tuples (first one is the header even if not available)
+    :raises TooMuchHeadersException: if the data contains more than one header"""
+
+    return _parts(adi)
+
+
+def loadi(adi: Union[str, TextIO], skip: int = 0, strip_tags: bool = True,
+          stages: Iterable[Callable[[dict], dict]] = (), errors: Optional[list[RecordError]] = None,
+          lazy: bool = False) -> Iterator[Mapping[str, str]]:
     """Turn ADI formated string to header/records as an iterator over dict
     The skip option is useful if you want to watch a file for new records only. This saves processing time.
+    If a text stream (e.g. an opened file) is given it is read incrementally, so even huge files are processed
+    in constant memory.
 
-    :param adi: the ADI data
+    If a list is given for errors the load is tolerant: a record with an invalid tag is skipped,
+    a RecordError is appended to the list and parsing continues with the next record.
+    An invalid header is returned as empty header. So all problems are found in a single pass.
+
+    With lazy the records are yielded as LazyRecord which only hold their text. The fields are unpacked
+    (and the stages applied) on first access. So loading is limited by finding the record ends only.
+    This can not be combined with errors, an invalid tag raises the exception on first access.
+
+    :param adi: the ADI data as string or text stream
     :param skip: skip first number of records (does not apply for header)
     :param strip_tags: remove any leading or trailing whitespaces in tag names (default: True)
+    :param stages: functions applied to each record in order (e.g. band.fill_missing_band)
+    :param errors: a list to collect the errors of skipped records in instead of raising
+    :param lazy: yield the records as LazyRecord unpacked on first access (the header is always a dict)
     :return: an iterator of records (first record is the header even if not available)
     :raises TooMuchHeadersException: if the data contains more than one header
     :raises TagDefinitionException: if the tag definition is invalid or the length is not an integer
     """
 
-    hr_list = re.split(r'<[eE][oO][hH]>', adi)
-    if len(hr_list) == 1:  # Header is missing
-        yield {}
-        record_data = hr_list[0]
-    elif len(hr_list) > 2:  # More than one header
-        raise TooMuchHeadersException()
-    else:  # One header and the records
-        yield unpack(hr_list[0], strip_tags)
-        record_data = hr_list[1]
+    stages = tuple(stages)
+    if lazy:
+        if errors is not None:
+            raise ValueError('Lazy records can not be combined with errors')
+        yield from _loadi_lazy(adi, skip, strip_tags, stages)
+        return
+    if errors is not None:
+        yield from _loadi_tolerant(adi, skip, strip_tags, stages, errors)
+        return
+    m = metrics.current()
+    if m is not None:
+        yield from _loadi_metered(adi, skip, strip_tags, stages, m)
+        return
+
+    i = 0
+    for is_header, part in _parts(adi):
+        if is_header:
+            yield unpack(part, strip_tags)
+        else:
+            if i >= skip:
+                rec = unpack(part, strip_tags)
+                for stage in stages:
+                    rec = stage(rec)
+                yield rec
+            i += 1
+
+
+def _loadi_lazy(adi: Union[str, TextIO], skip: int, strip_tags: bool, stages: tuple) -> Iterator[Mapping[str, str]]:
+    i = 0
+    for is_header, part in _parts(adi):
+        if is_header:
+            yield unpack(part, strip_tags)
+        else:
+            if i >= skip:
+                yield LazyRecord(part, strip_tags, stages)
+            i += 1
+
+
+def _loadi_metered(adi: Union[str, TextIO], skip: int, strip_tags: bool, stages: tuple,
+                   m: metrics.Metrics) -> Iterator[dict[str, str]]:
+    clock = time.perf_counter
+    timings = m.timings
+    splitter = _Splitter()
+    chunks = _read_chunks(adi)
+    i = 0
+    while True:
+        t0 = clock()
+        chunk = next(chunks, None)
+        t1 = clock()
+        if chunk is None:
+            parts = splitter.close()
+        else:
+            m.add('chars_read', len(chunk))
+            m.buffer(len(splitter._buf) + len(chunk))
+            parts = splitter.feed(chunk)
+        t2 = clock()
+        timings['read'] += t1 - t0
+        timings['split'] += t2 - t1
+
+        for is_header, part in parts:
+            if not is_header:
+                i += 1
+                if i <= skip:
+                    continue
+            t0 = clock()
+            rec = unpack(part, strip_tags)
+            t1 = clock()
+            timings['unpack'] += t1 - t0
+            m.add('records_parsed')
+            m.add('fields_parsed', len(rec))
+            if not is_header and stages:
+                for stage in stages:
+                    rec = stage(rec)
+                timings['stages'] += clock() - t1
+            yield rec
+
+        if chunk is None:
+            break
+
+
+def _loadi_tolerant(adi: Union[str, TextIO], skip: int, strip_tags: bool, stages: tuple,
+                    errors: list[RecordError]) -> Iterator[dict[str, str]]:
+    i = 0
+    for is_header, part, _, start in _parts(adi, True):
+        if not is_header:
+            i += 1
+            if i <= skip:
+                continue
+        try:
+            rec = unpack(part, strip_tags)
+        except TagDefinitionException as exc:
+            errors.append(RecordError(0 if is_header else i, start + exc.offset, exc.tag, exc.args[0]))
+            if is_header:
+                yield {}
+            continue
+        if not is_header:
+            for stage in stages:
+                rec = stage(rec)
+        yield rec
+
+
+def loadi_raw(adi: Union[str, TextIO], skip: int = 0, strip_tags: bool = True) -> Iterator[RawRecord]:
+    """Turn ADI formated string to header/records as an iterator over RawRecord
+    Each record carries its original text and position in the input besides the parsed fields.
+    Untouched records can be written verbatim with Writer, so filtering and forwarding records
+    does not need to format them again.
+
+        with open('in.adi') as fin, open('out.adi', 'w') as fout:
+            records = adi.loadi_raw(fin)
+            writer = adi.Writer(fout, next(records))
+            for rec in records:
+                if rec.fields.get('BAND') == '20M':
+                    writer.write(rec)
+
+    :param adi: the ADI data as string or text stream
+    :param skip: skip first number of records (does not apply for header)
+    :param strip_tags: remove any leading or trailing whitespaces in tag names (default: True)
+    :return: an iterator of RawRecord (first record is the header even if not available)
+    :raises TooMuchHeadersException: if the data contains more than one header
+    :raises TagDefinitionException: if the tag definition is invalid or the length is not an integer
+    """
+
+    i = 0
+    for is_header, part, text, start in _parts(adi, True):
+        if is_header:
+            yield RawRecord(unpack(part, strip_tags), text, start, start + len(text))
+        else:
+            if i >= skip:
+                yield RawRecord(unpack(part, strip_tags), text, start, start + len(text))
+            i += 1
+
 
-    for i, rec in enumerate(re.finditer(r'(.*?)<[eE][oO][rR]>', record_data, re.S)):
-        if i >= skip:
-            yield unpack(rec.groups()[0], strip_tags)
+def _unpack_parts(parts: list[tuple[bool, str]], strip_tags: bool) -> list[tuple[bool, dict[str, str]]]:
+    return [(is_header, unpack(part, strip_tags)) for is_header, part in parts]
 
 
-def loads(adi: str, skip: int = 0, strip_tags: bool = True) -> dict:
+async def aloadi(stream, skip: int = 0, strip_tags: bool = True, encoding: str = 'utf-8',
+                 yield_every: int = 100, executor=None) -> AsyncIterator[dict[str, str]]:
+    """Turn an asynchronous ADI stream to header/records as an asynchronous iterator over dict
+    The stream is read in chunks and control is given back to the event loop every yield_every records,
+    so other tasks stay responsive while a big log is parsed.
+
+        async for rec in adi.aloadi(reader):
+            ...
+
+    :param stream: an object with an awaitable read(n) returning str or bytes (e.g. asyncio.StreamReader)
+    :param skip: skip first number of records (does not apply for header)
+    :param strip_tags: remove any leading or trailing whitespaces in tag names (default: True)
+    :param encoding: the encoding to decode bytes with
+    :param yield_every: number of records after which control is given back to the event loop
+    :param executor: an optional concurrent.futures executor to unpack the records of each chunk in
+    :return: an asynchronous iterator of records (first record is the header even if not available)
+    :raises TooMuchHeadersException: if the data contains more than one header
+    :raises TagDefinitionException: if the tag definition is invalid or the length is not an integer
+    """
+
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    splitter = _Splitter()
+    decoder = None
+    i = 0
+    n = 0
+    eof = False
+    while not eof:
+        data = await stream.read(ASYNC_CHUNK_SIZE)
+        eof = not data  # A chunk may decode to nothing if it ends within a multibyte character
+        if isinstance(data, bytes):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(encoding)()
+            data = decoder.decode(data, final=eof)
+        if eof:
+            parts = splitter.close()
+        else:
+            parts = splitter.feed(data)
+
+        if skip:
+            kept = []
+            for is_header, part in parts:
+                if not is_header:
+                    i += 1
+                    if i <= skip:
+                        continue
+                kept.append((is_header, part))
+            parts = kept
+
+        if executor is not None and parts:
+            unpacked = await loop.run_in_executor(executor, _unpack_parts, parts, strip_tags)
+        else:
+            unpacked = ((is_header, unpack(part, strip_tags)) for is_header, part in parts)
+
+        for _, rec in unpacked:
+            yield rec
+            n += 1
+            if n % yield_every == 0:
+                await asyncio.sleep(0)
+
+
+def loads(adi: Union[str, TextIO], skip: int = 0, strip_tags: bool = True,
+          stages: Iterable[Callable[[dict], dict]] = (), errors: Optional[list[RecordError]] = None,
+          lazy: bool = False) -> dict:
     """Turn ADI formated string to dictionary
     The parameters are converted to uppercase
 
@@ -128,9 +505,12 @@ def loads(adi: str, skip: int = 0, strip_tags: bool = True) -> dict:
     The skip option is useful if you want to watch a file for new records only. This saves processing time.
     In this case consider to use loadi() directly.
 
-    :param adi: the ADI data
+    :param adi: the ADI data as string or text stream
     :param skip: skip first number of records (does not apply for header)
     :param strip_tags: remove any leading or trailing whitespaces in tag names (default: True)
+    :param stages: functions applied to each record in order (e.g. band.fill_missing_band)
+    :param errors: a list to collect the errors of skipped records in instead of raising (see loadi)
+    :param lazy: return the records as LazyRecord unpacked on first access (see loadi)
     :return: the ADI as a dict
     :raises TooMuchHeadersException: if the data contains more than one header
     :raises TagDefinitionException: if the tag definition is invalid or the length is not an integer
@@ -141,7 +521,7 @@ def loads(adi: str, skip: int = 0, strip_tags: bool = True) -> dict:
            }
 
     first = True
-    for rec in loadi(adi, skip, strip_tags):
+    for rec in loadi(adi, skip, strip_tags, stages, errors, lazy):
         if first:
             doc['HEADER'] = rec
             first = False
@@ -151,7 +531,9 @@ def loads(adi: str, skip: int = 0, strip_tags: bool = True) -> dict:
     return doc
 
 
-def load(file_name: str, skip: int = 0, encoding=None, strip_tags: bool = True) -> dict:
+def load(file_name: str, skip: int = 0, encoding=None, strip_tags: bool = True,
+         stages: Iterable[Callable[[dict], dict]] = (), errors: Optional[list[RecordError]] = None,
+         lazy: bool = False) -> dict:
     """Load ADI formated file to dictionary
     The parameters are converted to uppercase
 
@@ -163,19 +545,128 @@ def load(file_name: str, skip: int = 0, encoding=None, strip_tags: bool = True)
     The skip option is useful if you want to watch a file for new records only. This saves processing time.
     In this case consider to use loadi() directly.
 
+    Compressed files (gzip, bz2, xz, zstd) are detected and decompressed while reading (see compressed.reader).
+
     :param file_name: the file name where the ADI data is stored
     :param skip: skip first number of records (does not apply for header)
-    :param encoding: the file encoding
+    :param encoding: the file encoding (detected from the content if None, see util.sniff_encoding)
     :param strip_tags: remove any leading or trailing whitespaces in tag names (default: True)
+    :param stages: functions applied to each record in order (e.g. band.fill_missing_band)
+    :param errors: a list to collect the errors of skipped records in instead of raising (see loadi)
+    :param lazy: return the records as LazyRecord unpacked on first access (see loadi)
     :return: the ADI as a dict
     :raises TooMuchHeadersException: if the data contains more than one header
     :raises TagDefinitionException: if the tag definition is invalid or the length is not an integer
     """
 
-    with open(file_name, encoding=encoding) as af:
-        data = af.read()
+    with compressed.reader(file_name, encoding=encoding) as af:
+        doc = loads(af, skip, strip_tags, stages, errors, lazy)
+    metrics.count('bytes_read', lambda: os.path.getsize(file_name))
+    return doc
+
+
+def parse_many(adi_list: Iterable[str], workers: Optional[int] = None, skip: int = 0, strip_tags: bool = True,
+               return_exceptions: bool = False) -> list[Union[dict, Exception]]:
+    """Turn many independent ADI formated strings to dictionaries concurrently in a thread pool
+    Parsing is thread safe: all module level state (compiled patterns, constants) is read only
+    and every call works on its own splitter and dictionaries. On a free-threaded Python build
+    this scales with the number of workers, with the GIL it mainly helps if other threads do I/O.
+
+    :param adi_list: the ADI data strings (e.g. uploaded logs)
+    :param workers: number of threads (default: see concurrent.futures.ThreadPoolExecutor)
+    :param skip: skip first number of records (does not apply for header)
+    :param strip_tags: remove any leading or trailing whitespaces in tag names (default: True)
+    :param return_exceptions: return exceptions in the result list instead of raising the first one
+    :return: list of ADI dicts (see loads) in the order of the input
+    :raises TooMuchHeadersException: if a data string contains more than one header
+    :raises TagDefinitionException: if a tag definition is invalid or the length is not an integer
+    """
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    def parse(adi: str) -> Union[dict, Exception]:
+        try:
+            return loads(adi, skip, strip_tags)
+        except (TooMuchHeadersException, TagDefinitionException) as exc:
+            if return_exceptions:
+                return exc
+            raise
+
+    with ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(parse, adi_list))
+
+
+def _load_file(file_name: str, skip: int, encoding: Optional[str], strip_tags: bool,
+               stages: tuple) -> tuple[str, Optional[dict], Union[list[dict], Exception]]:
+    try:
+        doc = load(file_name, skip, encoding, strip_tags, stages)
+    except (TooMuchHeadersException, TagDefinitionException, OSError, UnicodeError) as exc:
+        return file_name, None, exc
+    return file_name, doc['HEADER'], doc['RECORDS']
+
+
+def load_many(files: Union[str, Iterable[str]], workers: Optional[int] = None, chunksize: int = 8, skip: int = 0,
+              encoding: Optional[str] = None, strip_tags: bool = True,
+              stages: Iterable[Callable[[dict], dict]] = ()
+              ) -> Iterator[tuple[str, Optional[dict], Union[list[dict], Exception]]]:
+    """Load many ADI files concurrently in a process pool
+    The files are submitted to the workers in chunks, so the per file overhead of the pool is small
+    even for thousands of little files. Every file is parsed independently (see load), the results
+    are yielded in the order of the input while the other files are still parsed.
+
+    A file which can not be loaded does not abort the batch. Instead (path, None, exception) is yielded.
+
+        for path, header, records in load_many('uploads/*.adi'):
+            if header is None:
+                print(path, records)  # the exception
+                continue
+            ...
+
+    :param files: the file names or a glob pattern (recursive with **)
+    :param workers: number of processes (default: see concurrent.futures.ProcessPoolExecutor)
+    :param chunksize: number of files sent to a worker at once
+    :param skip: skip first number of records (does not apply for header)
+    :param encoding: the file encoding (detected from the content if None, see util.sniff_encoding)
+    :param strip_tags: remove any leading or trailing whitespaces in tag names (default: True)
+    :param stages: functions applied to each record in order (must be picklable i.e. module level functions)
+    :return: iterator of (path, header, records) or (path, None, exception) for files that could not be loaded
+    """
+
+    from glob import glob
+    from functools import partial
+    from concurrent.futures import ProcessPoolExecutor
+
+    if isinstance(files, str):
+        files = sorted(glob(files, recursive=True))
+
+    load_file = partial(_load_file, skip=skip, encoding=encoding, strip_tags=strip_tags, stages=tuple(stages))
+    with ProcessPoolExecutor(workers) as executor:
+        yield from executor.map(load_file, files, chunksize=max(1, chunksize))
+
+
+def _pack_tag(param: str, value: str, dtype: Optional[str], table: Optional[dict], check_ascii: bool = True
+              ) -> tuple[str, bool]:
+    if not REGEX_PARAM.fullmatch(param):
+        raise IllegalParameterException(f'Parameter "{param}" contains not allowed characters')
 
-    return loads(data, skip, strip_tags)
+    if param.upper().endswith('_INTL'):
+        return '', False
+
+    replaced = False
+    if check_ascii and isinstance(value, str) and not REGEX_ASCII.fullmatch(value):
+        if table is None:
+            raise StringNotASCIIException(f'Value "{value}" in parameter "{param}" contains non ASCII characters')
+        value = value.translate(table)
+        replaced = True
+
+    if not value:
+        return '', replaced
+
+    if dtype:
+        if len(dtype) > 1 or dtype not in 'BNDTSEL':
+            raise IllegalDataTypeException(f'Datatype "{dtype}" in "{param}"')
+        return f'<{param.upper()}:{len(str(value))}:{dtype}>{value}', replaced
+    return f'<{param.upper()}:{len(str(value))}>{value}', replaced
 
 
 def pack(param: str, value: str, dtype: str = None, repl_non_ascii=True) -> str:
@@ -191,104 +682,316 @@ def pack(param: str, value: str, dtype: str = None, repl_non_ascii=True) -> str:
     :raises IllegalParameterException: if parameter or data type contains invalid characters
     """
 
-    if not re.fullmatch(REGEX_PARAM, param):
-        raise IllegalParameterException(f'Parameter "{param}" contains not allowed characters')
+    tag, replaced = _pack_tag(param, value, dtype, get_translation_table() if repl_non_ascii else None)
+    if replaced:
+        warn(f'Replaced non ASCII chars in tag "{param}"', NonASCIIWarning)
+    return tag
+
+
+class _Packer:
+    """Formats header and records of one export
+    Non ASCII chars are replaced with one cached translation table. Each record is checked for non ASCII chars
+    in one pass and only the fields of affected records are checked one by one.
+    A warning is issued only once per tag for the whole export, the counts are collected in replaced.
+    In intl mode a missing field is filled from its *_INTL counterpart with transliteration (no warning)."""
+
+    def __init__(self, linebreaks: bool = True, spaces: int = 1, repl_non_ascii=True,
+                 replace: Optional[dict[str, str]] = None, translit: bool = False, intl: bool = False):
+        self.linebreaks = linebreaks
+        self.field_separator = ' ' * spaces if spaces >= 0 else ' '
+        self.table = get_translation_table(replace, '_', translit) if repl_non_ascii else None
+        self.intl_table = get_translation_table(replace, '_', True) if intl else None
+        self.replaced = {}
+
+    def tag(self, param: str, value: str, dtype: Optional[str] = None, check_ascii: bool = True) -> str:
+        tag, replaced = _pack_tag(param, value, dtype, self.table, check_ascii)
+        if replaced:
+            if param not in self.replaced:
+                self.replaced[param] = 0
+                warn(f'Replaced non ASCII chars in tag "{param}"', NonASCIIWarning)
+            self.replaced[param] += 1
+        return tag
+
+    def header(self, header: dict, comment: str) -> str:
+        default = {'ADIF_VER': '3.1.4',
+                   'PROGRAMID': __proj_name__,
+                   'PROGRAMVERSION': __version_str__,
+                   'CREATED_TIMESTAMP': get_cur_adif_dt(),
+                   }
+        tag_separator = '\n' if self.linebreaks else self.field_separator
 
-    if not param.upper().endswith('_INTL'):
-        if isinstance(value, str) and not re.fullmatch(REGEX_ASCII, value):
-                if repl_non_ascii:
-                    value = replace_non_ascii(value)
-                    warn(f'Replaced non ASCII chars in tag "{param}"', NonASCIIWarning)
-                else:
-                    raise StringNotASCIIException(f'Value "{value}" in parameter "{param}" contains non ASCII characters')
+        data = comment + ' \n'
+        try:
+            for p in header:
+                if p.upper() in ('ADIF_VER', 'PROGRAMID', 'PROGRAMVERSION', 'CREATED_TIMESTAMP'):
+                    data += self.tag(p.upper(), header[p]) + tag_separator
+                    default.pop(p.upper())
+                elif p.upper() == 'USERDEFS':
+                    for i, u in enumerate(header[p], 1):
+                        data += self.tag(f'USERDEF{i}', u['userdef'], u['dtype']) + tag_separator
+            for p in default:
+                data += self.tag(p, default[p]) + tag_separator
+        except StringNotASCIIException as exc:
+            raise StringNotASCIIException(f'Header: {exc.args[0]}') from None
+        except IllegalParameterException as exc:
+            raise IllegalParameterException(f'Header: {exc.args[0]}') from None
 
-        if dtype:
-            if len(dtype) > 1 or dtype not in 'BNDTSEL':
-                raise IllegalDataTypeException(f'Datatype "{dtype}" in "{param}"')
-            return f'<{param.upper()}:{len(str(value))}:{dtype}>{value}' if value else ''
-        else:
-            return f'<{param.upper()}:{len(str(value))}>{value}' if value else ''
-    else:
-        return ''
+        return data + '<EOH>'
+
+    def _intl_tag(self, param: str, value: str, present: set[str]) -> str:
+        param = param[:-5]
+        if param in present:
+            return ''
+        return self.tag(param, value.translate(self.intl_table) if isinstance(value, str) else value, check_ascii=False)
+
+    def record(self, record: dict, r_num: int) -> str:
+        check_ascii = not REGEX_ASCII.fullmatch(''.join([v for v in record.values() if isinstance(v, str)]))
+        present = {k.upper() for k, v in record.items() if v} if self.intl_table else None
+
+        data = ''
+        empty = True
+        for i, pv in enumerate(zip(record.keys(), record.values()), 1):
+            try:
+                param = pv[0].upper()
+                if present is not None and param.endswith('_INTL'):
+                    tag = self._intl_tag(param, pv[1], present)
+                else:
+                    tag = self.tag(param, pv[1], check_ascii=check_ascii)
+                if tag:
+                    empty = False
+                    if self.linebreaks:
+                        data += tag + ('\n' if i % 5 == 0 else self.field_separator)
+                    else:
+                        data += tag + self.field_separator
+            except StringNotASCIIException as exc:
+                raise StringNotASCIIException(f'Record #{r_num}: {exc.args[0]}') from None
+            except IllegalParameterException as exc:
+                raise IllegalParameterException(f'Record #{r_num}: {exc.args[0]}') from None
+
+        if empty:
+            return ''
+
+        if not data.endswith('\n'):
+            data += '\n' if self.linebreaks else ''
+        return data + '<EOR>'
 
 
 def dumpi(data_dict: dict, comment: str = 'ADIF export by ' + __proj_name__,
-          linebreaks: bool = True, spaces: int = 1, repl_non_ascii=True) -> Iterator[str]:
+          linebreaks: bool = True, spaces: int = 1, repl_non_ascii=True,
+          replace: Optional[dict[str, str]] = None, translit: bool = False, intl: bool = False) -> Iterator[str]:
     """Takes a dictionary and converts it to ADI format
     Parameters can be in upper or lower case. The output is upper case. The user must take care
     that parameters are not doubled!
     *_INTL parameters are ignored as they are not allowed in ADI.
+    With intl the missing or empty ASCII field is filled from its *_INTL field, transliterated to ASCII.
     Empty records are skipped.
 
     If 'HEADER' is present the comment is added and missing header fields are filled with defaults.
     The header can contain a list of user definitions as USERDEFS. Each user definition is expected as a dictionary
     with datatype as "dtype" and field definition as "userdef" instead of a string value.
+    The records can be any iterable (e.g. a generator) so huge logs can be exported without holding them in memory.
+    Header and records loaded with loadi_raw are written verbatim from their original text.
 
     :param data_dict: the dictionary with header and records
     :param comment: the comment to induce the header
     :param linebreaks: Format output with additional linebreaks for readability
     :param spaces: Number of spaces between fields
     :param repl_non_ascii: replace non ASCII characters with "_" and generates a warning instead of raising StringNotASCIIException
+    :param replace: a mapping with non ASCII chars and suiting substitutes (e.g. {'ä':'ae', 'ß':'ss'})
+    :param translit: transliterate with util.TRANSLIT_MAP and strip diacritics before "_" is used
+    :param intl: fill missing fields from their *_INTL fields (e.g. NAME from NAME_INTL)
     :return: an iterator of chunks of the ADI (header, record 1, ..., record n)
     :raises StringNotASCIIException: if a value in a record contains non ASCII characters
     :raises IllegalParameterException: if a parameter or data type in a record contains invalid characters"""
 
-    data_dict = copy.deepcopy(data_dict)
-
-    field_separator = ' ' * spaces if spaces >= 0 else ' '
+    packer = _Packer(linebreaks, spaces, repl_non_ascii, replace, translit, intl)
+    m = metrics.current()
+    if m is not None:
+        yield from _dumpi_metered(data_dict, comment, packer, m)
+        return
 
     if 'HEADER' in data_dict:
-        default = {'ADIF_VER': '3.1.4',
-                   'PROGRAMID': __proj_name__,
-                   'PROGRAMVERSION': __version_str__,
-                   'CREATED_TIMESTAMP': get_cur_adif_dt(),
-                   }
+        header = data_dict['HEADER']
+        if not isinstance(header, RawRecord):
+            yield packer.header(header, comment)
+        elif header.text:
+            yield header.text
 
-        data = comment + ' \n'
+    if 'RECORDS' in data_dict:
+        for r_num, r in enumerate(data_dict['RECORDS'], 1):
+            data = r.text if isinstance(r, RawRecord) else packer.record(r, r_num)
+            if data:
+                yield data
 
-        try:
-            for p in data_dict['HEADER']:
-                if p.upper() in ('ADIF_VER', 'PROGRAMID', 'PROGRAMVERSION', 'CREATED_TIMESTAMP'):
-                    data += (pack(p.upper(), data_dict['HEADER'][p], repl_non_ascii=repl_non_ascii)
-                             + ('\n' if linebreaks else field_separator))
-                    default.pop(p.upper())
-                elif p.upper() == 'USERDEFS':
-                    for i, u in enumerate(data_dict['HEADER'][p], 1):
-                        data += pack(f'USERDEF{i}', u['userdef'], u['dtype'], repl_non_ascii=repl_non_ascii) + (
-                            '\n' if linebreaks else field_separator)
-            for p in default:
-                data += pack(p, default[p], repl_non_ascii=repl_non_ascii) + ('\n' if linebreaks else field_separator)
-            data += '<EOH>'
-            yield data
-        except StringNotASCIIException as exc:
-            raise StringNotASCIIException(f'Header: {exc.args[0]}') from None
-        except IllegalParameterException as exc:
-            raise IllegalParameterException(f'Header: {exc.args[0]}') from None
 
-    if 'RECORDS' in data_dict:
-        for r_num, r in enumerate(data_dict['RECORDS']):
-            data = ''
-            empty = True
-            for i, pv in enumerate(zip(r.keys(), r.values()), 1):
-                try:
-                    tag = pack(pv[0].upper(), pv[1], repl_non_ascii=repl_non_ascii)
-                    if tag:
-                        empty = False
-                        if linebreaks:
-                            data += tag + ('\n' if i % 5 == 0 else field_separator)
-                        else:
-                            data += tag + field_separator
-                except StringNotASCIIException as exc:
-                    raise StringNotASCIIException(f'Record #{r_num + 1}: {exc.args[0]}') from None
-                except IllegalParameterException as exc:
-                    raise IllegalParameterException(f'Record #{r_num + 1}: {exc.args[0]}') from None
-            if not data.endswith('\n'):
-                data += '\n' if linebreaks else ''
-
-            if not empty:
-                data += '<EOR>'
+def _dumpi_metered(data_dict: dict, comment: str, packer: _Packer, m: metrics.Metrics) -> Iterator[str]:
+    clock = time.perf_counter
+    try:
+        if 'HEADER' in data_dict:
+            header = data_dict['HEADER']
+            t0 = clock()
+            data = header.text if isinstance(header, RawRecord) else packer.header(header, comment)
+            m.timings['pack'] += clock() - t0
+            if data:
                 yield data
 
+        if 'RECORDS' in data_dict:
+            for r_num, r in enumerate(data_dict['RECORDS'], 1):
+                t0 = clock()
+                data = r.text if isinstance(r, RawRecord) else packer.record(r, r_num)
+                m.timings['pack'] += clock() - t0
+                if data:
+                    m.add('records_written')
+                    yield data
+    finally:
+        m.add('warnings', len(packer.replaced))
+        m.add('replaced_values', sum(packer.replaced.values()))
+
+
+class Writer:
+    """Writes ADI header and records one by one to a text stream
+    The output is formatted exactly like dump(). The stream is not closed by the writer.
+    The number of replaced non ASCII values per tag is available in replaced.
+
+    :param fp: the text stream to write to (e.g. an opened file or sys.stdout)
+    :param header: the header to write first (no header if None, a RawRecord is written verbatim)
+    :param comment: the comment to induce the header
+    :param linebreaks: Format output with additional linebreaks for readability
+    :param spaces: Number of spaces between fields
+    :param repl_non_ascii: replace non ASCII characters with "_" and generates a warning
+                           instead of raising StringNotASCIIException
+    :param replace: a mapping with non ASCII chars and suiting substitutes (e.g. {'ä':'ae', 'ß':'ss'})
+    :param translit: transliterate with util.TRANSLIT_MAP and strip diacritics before "_" is used
+    :param intl: fill missing fields from their *_INTL fields (e.g. NAME from NAME_INTL)
+    :raises StringNotASCIIException: if a value in the header contains non ASCII characters
+    :raises IllegalParameterException: if a parameter or data type in the header contains invalid characters"""
+
+    def __init__(self, fp: TextIO, header: Union[dict, RawRecord, None] = None,
+                 comment: str = 'ADIF export by ' + __proj_name__,
+                 linebreaks: bool = True, spaces: int = 1, repl_non_ascii=True,
+                 replace: Optional[dict[str, str]] = None, translit: bool = False, intl: bool = False):
+        self._fp = fp
+        self._packer = _Packer(linebreaks, spaces, repl_non_ascii, replace, translit, intl)
+        self._chunk_separator = '\n\n' if linebreaks else '\n'
+        self._first = True
+        self._metrics = metrics.current()
+        self.records = 0
+
+        if isinstance(header, RawRecord):
+            if header.text:
+                self._write_chunk(header.text)
+        elif header is not None:
+            self._write_chunk(self._packer.header(header, comment))
+            if self._metrics is not None:
+                self._metrics.add('warnings', len(self.replaced))
+                self._metrics.add('replaced_values', sum(self.replaced.values()))
+
+    @property
+    def replaced(self) -> dict[str, int]:
+        """Number of values with replaced non ASCII chars per tag"""
+        return self._packer.replaced
+
+    def _write_chunk(self, chunk: str):
+        if self._first:
+            self._first = False
+        else:
+            self._fp.write(self._chunk_separator)
+        self._fp.write(chunk)
+
+    def write(self, record: Union[dict, RawRecord]) -> bool:
+        """Write a single record, empty records are skipped
+        A RawRecord (see loadi_raw) is written verbatim from its original text without any checks.
+
+        :param record: the record to write
+        :return: True if the record was written
+        :raises StringNotASCIIException: if a value in the record contains non ASCII characters
+        :raises IllegalParameterException: if a parameter or data type in the record contains invalid characters"""
+
+        if self._metrics is not None:
+            return self._write_metered(record, self._metrics)
+
+        data = record.text if isinstance(record, RawRecord) else self._packer.record(record, self.records + 1)
+        if data:
+            self._write_chunk(data)
+            self.records += 1
+            return True
+        return False
+
+    def _write_metered(self, record: Union[dict, RawRecord], m: metrics.Metrics) -> bool:
+        warned = len(self.replaced)
+        replaced = sum(self.replaced.values())
+        t0 = time.perf_counter()
+        data = record.text if isinstance(record, RawRecord) else self._packer.record(record, self.records + 1)
+        t1 = time.perf_counter()
+        m.timings['pack'] += t1 - t0
+        m.add('warnings', len(self.replaced) - warned)
+        m.add('replaced_values', sum(self.replaced.values()) - replaced)
+        if data:
+            self._write_chunk(data)
+            m.timings['write'] += time.perf_counter() - t1
+            m.add('records_written')
+            self.records += 1
+            return True
+        return False
+
+
+class AsyncWriter:
+    """Writes ADI header and records one by one to an asynchronous stream
+    The output is formatted exactly like dump(). The header is written together with the first record or on flush().
+
+        writer = adi.AsyncWriter(stream_writer, {})
+        await writer.write(rec)
+        await writer.flush()
+
+    :param stream: an asyncio.StreamWriter or an object with an (awaitable) write() e.g. an async file
+    :param header: the header to write first (no header if None)
+    :param encoding: encode the output with this encoding for an asyncio.StreamWriter or if binary is True
+    :param binary: write bytes instead of str (default: True for an asyncio.StreamWriter)
+    :param params: further parameters for Writer (comment, linebreaks, spaces, repl_non_ascii, replace, translit, intl)
+    :raises StringNotASCIIException: if a value in the header contains non ASCII characters
+    :raises IllegalParameterException: if a parameter or data type in the header contains invalid characters"""
+
+    def __init__(self, stream: Any, header: Union[dict, RawRecord, None] = None, encoding: str = 'ascii',
+                 binary: Optional[bool] = None, **params):
+        import asyncio
+
+        self._stream = stream
+        self._encoding = encoding
+        self._binary = isinstance(stream, asyncio.StreamWriter) if binary is None else binary
+        self._buffer = io.StringIO()
+        self._writer = Writer(self._buffer, header, **params)
+
+    @property
+    def records(self) -> int:
+        """Number of records written"""
+        return self._writer.records
+
+    async def write(self, record: Union[dict, RawRecord]) -> bool:
+        """Write a single record, empty records are skipped
+        :param record: the record to write
+        :return: True if the record was written
+        :raises StringNotASCIIException: if a value in the record contains non ASCII characters
+        :raises IllegalParameterException: if a parameter or data type in the record contains invalid characters"""
+
+        written = self._writer.write(record)
+        await self.flush()
+        return written
+
+    async def flush(self):
+        """Write out pending data and wait for the stream to drain"""
+
+        data = self._buffer.getvalue()
+        if data:
+            self._buffer.seek(0)
+            self._buffer.truncate()
+            res = self._stream.write(data.encode(self._encoding) if self._binary else data)
+            if inspect.isawaitable(res):
+                await res
+
+        drain = getattr(self._stream, 'drain', None)
+        if drain is not None:
+            await drain()
+
 
 def dumps(data_dict: dict, comment: str = 'ADIF export by ' + __proj_name__, linebreaks: bool = True, **params) -> str:
     """Takes a dictionary and converts it to ADI format
@@ -312,8 +1015,30 @@ def dumps(data_dict: dict, comment: str = 'ADIF export by ' + __proj_name__, lin
     return line_separator.join(list(dumpi(data_dict, comment, linebreaks=linebreaks, **params)))
 
 
-def dump(file_name: str, data_dict: dict, comment: str = 'ADIF export by ' + __proj_name__,
-         linebreaks: bool = True, encoding='ascii', **params):
+def dump_many(data_dicts: Iterable[dict], workers: Optional[int] = None,
+              comment: str = 'ADIF export by ' + __proj_name__, linebreaks: bool = True, **params) -> list[str]:
+    """Takes many dictionaries and converts them to ADI format concurrently in a thread pool
+    Dumping is thread safe as long as the dictionaries are not modified while they are dumped.
+    Warnings for replaced non ASCII characters are issued from the worker threads,
+    so do not rely on warnings.catch_warnings() (which is not thread safe) to capture them.
+
+    :param data_dicts: the dictionaries with header and records (see dumps)
+    :param workers: number of threads (default: see concurrent.futures.ThreadPoolExecutor)
+    :param comment: the comment to induce the header
+    :param linebreaks: Format output with additional linebreaks for readability
+    :param params: further parameters for dumps (spaces, repl_non_ascii, replace, translit, intl)
+    :return: list of ADI strings in the order of the input
+    :raises IllegalParameterException: if a parameter or data type in a record contains invalid characters"""
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(lambda d: dumps(d, comment, linebreaks, **params), data_dicts))
+
+
+def dump(file_name: Union[str, TextIO], data_dict: dict, comment: str = 'ADIF export by ' + __proj_name__,
+         linebreaks: bool = True, encoding='ascii', buffering: int = BUFFER_SIZE, fsync: bool = False,
+         report: Optional[Callable[[OutputStats], Any]] = None, **params) -> OutputStats:
     """Takes a dictionary and stores it to filename in ADI format
     Parameters can be in upper or lower case. The output is upper case. The user must take care
     that parameters are not doubled!
@@ -324,24 +1049,113 @@ def dump(file_name: str, data_dict: dict, comment: str = 'ADIF export by ' + __p
     The header can contain a list of user definitions as USERDEFS. Each user definition is expected as a dictionary
     with datatype as "dtype" and field definition as "userdef" instead of a string value.
 
-    :param file_name: the filename to store the ADI data to
+    A file is written to a temporary file first which replaces the target file only on success (see output.AtomicFile).
+    It is compressed if the file name ends with .gz, .bz2, .xz or .zst (see compressed.writer).
+
+    :param file_name: the filename to store the ADI data to or an opened text stream
     :param data_dict: the dictionary with header and records
     :param comment: the comment to induce the header
     :param linebreaks: format output with additional linebreaks for readability
-    :param encoding: the file encoding
+    :param encoding: the file encoding (not used for streams)
+    :param buffering: the write buffer size in bytes (not used for streams)
+    :param fsync: sync the file to disk before replacing the target (not used for streams)
+    :param report: a function called with the statistics after the file was written
+    :return: the statistics (file name and bytes are None for streams)
     :raises IllegalParameterException: if a parameter or data type in a record contains invalid characters"""
 
-    with open(file_name, 'w', encoding=encoding) as af:
-        first = True
-        for chunk in dumpi(data_dict, comment, linebreaks=linebreaks, **params):
-            if first:
-                first = False
+    if isinstance(file_name, str):
+        compression = compressed.from_extension(file_name)
+        with AtomicFile(file_name, bool(compression), encoding, buffering, fsync) as out:
+            if compression:
+                with compressed.text_writer(out.file, compression, encoding) as fp:
+                    out.records = dump(fp, data_dict, comment, linebreaks, **params).records
             else:
-                af.write('\n\n' if linebreaks else '\n')
-            af.write(chunk)
+                out.records = dump(out.file, data_dict, comment, linebreaks, **params).records
+        stats = out.stats
+        metrics.count('bytes_written', stats.bytes)
+    else:
+        writer = Writer(file_name, data_dict['HEADER'] if 'HEADER' in data_dict else None,
+                        comment, linebreaks, **params)
+        for rec in data_dict.get('RECORDS', []):
+            writer.write(rec)
+        stats = OutputStats(None, None, writer.records)
+
+    if report:
+        report(stats)
+    return stats
+
 
+TAIL_SIZE = 4096
+REGEX_TAIL = re.compile(r'<[eE][oO][hHrR]>(\s*)$')
 
-__all__ = ['load', 'loads', 'loadi', 'dump', 'dumps', 'dumpi',
+
+def append(file_name: str, records: Iterable[dict], linebreaks: bool = True, encoding='ascii',
+           fsync: bool = True, **params) -> int:
+    """Append records to an ADI file without reading or rewriting the existing content
+    Only the tail of the file is read to check that it ends with <EOR> or <EOH>. The records are
+    formatted exactly like dump() (incl. the platform line endings) before the file is touched and written at once.
+    If writing raises an exception the file is restored to its former size. A crash of the process while
+    writing may still leave an incomplete record at the end of the file which has to be removed manually.
+    A missing or empty file is written with a default header like dump() (atomically, see output.AtomicFile).
+    No file is created if there are no records to append.
+
+    :param file_name: the filename of the ADI file
+    :param records: the records to append
+    :param linebreaks: format output with additional linebreaks for readability
+    :param encoding: the file encoding
+    :param fsync: flush the data to disk before returning
+    :param params: further parameters for Writer (comment, spaces, repl_non_ascii, replace, translit, intl)
+    :return: number of records appended (empty records are skipped)
+    :raises IncompleteFileException: if the file does not end with <EOR> or <EOH>
+    :raises StringNotASCIIException: if a value in a record contains non ASCII characters
+    :raises IllegalParameterException: if a parameter or data type in a record contains invalid characters"""
+
+    size = os.path.getsize(file_name) if os.path.exists(file_name) else 0
+    end = size
+    if size:
+        with open(file_name, 'rb') as af:
+            af.seek(max(0, size - TAIL_SIZE))
+            m = REGEX_TAIL.search(af.read().decode('latin-1'))
+        if not m:
+            raise IncompleteFileException(f'File "{file_name}" does not end with <EOR> or <EOH>')
+        end -= len(m.group(1))
+
+    buffer = io.StringIO()
+    writer = Writer(buffer, None if size else {}, linebreaks=linebreaks, **params)
+    for rec in records:
+        writer.write(rec)
+    if not writer.records:
+        return 0
+
+    if not size:
+        with AtomicFile(file_name, encoding=encoding, fsync=fsync) as out:
+            out.file.write(buffer.getvalue())
+        return writer.records
+
+    # Translate line endings like a file opened in text mode
+    data = (('\n\n' if linebreaks else '\n') + buffer.getvalue()).replace('\n', os.linesep).encode(encoding)
+    with open(file_name, 'rb+') as af:
+        af.seek(end)
+        trailer = af.read()
+        try:
+            af.seek(end)
+            af.write(data)
+            af.truncate()
+            af.flush()
+            if fsync:
+                os.fsync(af.fileno())
+        except BaseException:
+            af.seek(end)
+            af.write(trailer)
+            af.truncate(size)
+            raise
+
+    return writer.records
+
+
+__all__ = ['load', 'loads', 'loadi', 'loadi_raw', 'split', 'aloadi', 'parse_many', 'load_many',
+           'dump', 'dumps', 'dumpi', 'dump_many', 'append',
+           'Writer', 'AsyncWriter', 'RawRecord', 'RecordError', 'LazyRecord',
            'TooMuchHeadersException', 'TagDefinitionException',
            'IllegalDataTypeException', 'IllegalParameterException',
-           'StringNotASCIIException']
+           'StringNotASCIIException', 'IncompleteFileException']
@@ -4,16 +4,21 @@
 """Convert ADIF ADX content to dictionary and vice versa
 The XML is validated against the XSD from ADIF.org"""
 
+import re
 import copy
 import os.path
-import xml
-from xml.etree.ElementTree import ElementTree, ParseError
+import xml.parsers.expat
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Optional, Union
+from xml.etree.ElementTree import ElementTree, ParseError, tostring
 
 import xmlschema
 import xmltodict
 
 from . import __version_str__, __proj_name__
-from .util import get_cur_adif_dt
+from .util import get_cur_adif_dt, INTL_FIELDS
+from .output import AtomicFile, OutputStats, BUFFER_SIZE
+from . import compressed
+from . import metrics
 
 ADX_EXPORT_SCHEMA = xmlschema.XMLSchema(os.path.join(os.path.dirname(__file__), 'xsd/adx314.xsd'))
 ADX_IMPORT_SCHEMA = xmlschema.XMLSchema(os.path.join(os.path.dirname(__file__), 'xsd/adx314generic.xsd'))
@@ -35,65 +40,356 @@ class XmlSyntaxError(SyntaxError):
     pass
 
 
-def loads(adx_data: str, validate: bool = False) -> dict:
+def fill_intl(records: list[dict]) -> list[dict]:
+    """Fill missing *_INTL fields from their ASCII counterpart in place (e.g. NAME_INTL from NAME)
+       This is the inverse of the intl mode of the ADI export, so the UTF-8 fields can always be used.
+
+       :param records: the records
+       :return: the records
+       """
+
+    for rec in records:
+        for f in INTL_FIELDS:
+            if rec.get(f) and not rec.get(f + '_INTL'):
+                rec[f + '_INTL'] = rec[f]
+    return records
+
+
+def _validate(source: Union[str, BinaryIO]):
+    try:
+        ADX_IMPORT_SCHEMA.validate(source)
+    except ParseError as exc:
+        raise XmlSyntaxError(str(exc)) from None
+    except xmlschema.validators.exceptions.XMLSchemaChildrenValidationError as exc:
+        raise UndefinedElementException(f'in {exc.elem.tag}') from None
+    except xmlschema.validators.exceptions.XMLSchemaValidationError as exc:
+        raise MalformedValueException(f'Field "{exc.elem.tag}": {exc.reason}') from None
+
+
+def loads(adx_data: Union[str, BinaryIO], validate: bool = False, intl: bool = False) -> dict:
     """Load ADX content to dictionary
        The ADX is not validated to conform to the standard
 
-       :param adx_data: the ADX content
+       :param adx_data: the ADX content or a binary stream to parse incrementally (read at once if validated)
        :param validate: validate the ADX against the genereic XSD (very slow)
+       :param intl: fill missing *_INTL fields from their ASCII counterpart (see fill_intl)
        :return: the ADX as a dict
        """
 
     if validate:
-        try:
-            ADX_IMPORT_SCHEMA.validate(adx_data)
-        except ParseError as exc:
-            raise XmlSyntaxError(str(exc)) from None
-        except xmlschema.validators.exceptions.XMLSchemaChildrenValidationError as exc:
-            raise UndefinedElementException(f'in {exc.elem.tag}') from None
-        except xmlschema.validators.exceptions.XMLSchemaValidationError as exc:
-            raise MalformedValueException(f'Field "{exc.elem.tag}": {exc.reason}') from None
+        if hasattr(adx_data, 'read'):
+            adx_data = adx_data.read()  # A stream can be read only once
+        with metrics.timed('validate'):
+            _validate(adx_data)
 
     try:
-        data_dict = xmltodict.parse(adx_data, cdata_key='$')['ADX']
+        with metrics.timed('parse'):
+            data_dict = xmltodict.parse(adx_data, cdata_key='$')['ADX']
         if all(('RECORDS' in data_dict, bool(data_dict['RECORDS']),
                'RECORD' in data_dict['RECORDS'], bool(data_dict['RECORDS']['RECORD']))):
             data_dict['RECORDS'] = data_dict['RECORDS']['RECORD']
         else:
             data_dict['RECORDS'] = []
+        records = data_dict['RECORDS'] if type(data_dict['RECORDS']) is list else [data_dict['RECORDS']]
+        if intl:
+            fill_intl(records)
+        metrics.count('records_parsed', len(records))
         return data_dict
     except xml.parsers.expat.ExpatError as exc:
         raise XmlSyntaxError(str(exc)) from None
 
 
-def load(file_name: str, validate: bool = False) -> dict:
+def load(file_name: str, validate: bool = False, intl: bool = False) -> dict:
     """Load ADX file to dictionary
        The XML is validated against the generic XSD
+       Compressed files (gzip, bz2, xz, zstd) are detected and decompressed while parsing (see compressed.reader).
+
+       :param file_name: the file name where the ADX data is stored
+       :param validate: validate the ADX against the genereic XSD (very slow)
+       :param intl: fill missing *_INTL fields from their ASCII counterpart (see fill_intl)
+       :return: the ADX as a dict
+       """
+
+    if validate:
+        with compressed.reader(file_name, True) as xf, metrics.timed('validate'):
+            _validate(xf)
+
+    with compressed.reader(file_name, True) as xf:
+        data_dict = loads(xf, False, intl)
+    metrics.count('bytes_read', lambda: os.path.getsize(file_name))
+    return data_dict
+
+
+class _FlatParser:
+    """Expat callbacks building ADI shaped header and records (see loads_flat)"""
+
+    def __init__(self):
+        self.header = {}
+        self.records = []
+        self._cur = None
+        self._field = None
+        self._attrs = None
+        self._text = []
+
+    def start(self, name: str, attrs: dict):
+        if self._cur is None:
+            if name == 'RECORD':
+                self._cur = {}
+                self.records.append(self._cur)
+            elif name == 'HEADER':
+                self._cur = self.header
+        elif self._field is None:
+            self._field = name
+            self._attrs = attrs
+            self._text.clear()
+
+    def end(self, name: str):
+        if self._field is None:
+            self._cur = None  # End of RECORD or HEADER
+        elif name == self._field:
+            self._set_field(name, ''.join(self._text))
+            self._field = None
+
+    def data(self, chars: str):
+        if self._field is not None:
+            self._text.append(chars)
+
+    def _set_field(self, name: str, value: str):
+        attrs = self._attrs
+        if name == 'APP':
+            self._cur[f'APP_{attrs.get("PROGRAMID", "")}_{attrs.get("FIELDNAME", "")}'.upper()] = value
+        elif name != 'USERDEF':
+            self._cur[name] = value
+        elif self._cur is self.header:
+            limits = attrs.get('ENUM') or attrs.get('RANGE')
+            self.header.setdefault('USERDEFS', []).append({'dtype': attrs.get('TYPE'),
+                                                           'userdef': f'{value},{limits}' if limits else value})
+        else:
+            self._cur[attrs.get('FIELDNAME', '').upper()] = value
+
+    def parse(self, adx_data: Union[str, bytes, BinaryIO]) -> tuple[dict, list[dict]]:
+        parser = xml.parsers.expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler = self.start
+        parser.EndElementHandler = self.end
+        parser.CharacterDataHandler = self.data
+        try:
+            if hasattr(adx_data, 'read'):
+                parser.ParseFile(adx_data)
+            else:
+                parser.Parse(adx_data, True)
+        except xml.parsers.expat.ExpatError as exc:
+            raise XmlSyntaxError(str(exc)) from None
+        return self.header, self.records
+
+
+def loads_flat(adx_data: Union[str, bytes, BinaryIO], validate: bool = False, intl: bool = False) -> dict:
+    """Load ADX content to dictionary with records shaped like ADI records
+       The content is parsed with expat callbacks which know the flat ADX structure, so no generic
+       XML dictionaries are built. RECORDS is always a list (even for a single record).
+       APP elements become APP_<PROGRAMID>_<FIELDNAME> fields, USERDEF elements in records
+       become fields named like the user definition and USERDEF elements in the header
+       become USERDEFS like in adi.loads.
+
+       :param adx_data: the ADX content or a binary stream to parse incrementally (read at once if validated)
+       :param validate: validate the ADX against the genereic XSD (very slow)
+       :param intl: fill missing *_INTL fields from their ASCII counterpart (see fill_intl)
+       :return: the ADX as a dict
+       """
+
+    if validate:
+        if hasattr(adx_data, 'read'):
+            adx_data = adx_data.read()  # A stream can be read only once
+        with metrics.timed('validate'):
+            _validate(adx_data)
+
+    with metrics.timed('parse'):
+        header, records = _FlatParser().parse(adx_data)
+    if intl:
+        fill_intl(records)
+    metrics.count('records_parsed', len(records))
+    return {'HEADER': header, 'RECORDS': records}
+
+
+def load_flat(file_name: str, validate: bool = False, intl: bool = False) -> dict:
+    """Load ADX file to dictionary with records shaped like ADI records (see loads_flat)
+       Compressed files (gzip, bz2, xz, zstd) are detected and decompressed while parsing (see compressed.reader).
 
        :param file_name: the file name where the ADX data is stored
        :param validate: validate the ADX against the genereic XSD (very slow)
+       :param intl: fill missing *_INTL fields from their ASCII counterpart (see fill_intl)
        :return: the ADX as a dict
        """
 
-    with open(file_name, encoding='utf-8') as xf:
-        adx_data = xf.read()
+    if validate:
+        with compressed.reader(file_name, True) as xf, metrics.timed('validate'):
+            _validate(xf)
+
+    with compressed.reader(file_name, True) as xf:
+        data_dict = loads_flat(xf, False, intl)
+    metrics.count('bytes_read', lambda: os.path.getsize(file_name))
+    return data_dict
+
+
+async def aloads(adx_data: str, validate: bool = False, executor=None, intl: bool = False) -> dict:
+    """Load ADX content to dictionary without blocking the event loop
+       The parsing is done in an executor (see loads)
 
-    return loads(adx_data, validate)
+       :param adx_data: the ADX content
+       :param validate: validate the ADX against the genereic XSD (very slow)
+       :param executor: the concurrent.futures executor to parse in (default: the loops default executor)
+       :param intl: fill missing *_INTL fields from their ASCII counterpart (see fill_intl)
+       :return: the ADX as a dict
+       """
+
+    import asyncio
+
+    return await asyncio.get_running_loop().run_in_executor(executor, loads, adx_data, validate, intl)
+
+
+async def aload(stream, validate: bool = False, encoding: str = 'utf-8', executor=None, intl: bool = False) -> dict:
+    """Load ADX from an asynchronous stream to dictionary without blocking the event loop
+       The stream is read completely before the content is parsed in an executor (see loads)
+
+       :param stream: an object with an awaitable read() returning str or bytes (e.g. asyncio.StreamReader)
+       :param validate: validate the ADX against the genereic XSD (very slow)
+       :param encoding: the encoding to decode bytes with
+       :param executor: the concurrent.futures executor to parse in (default: the loops default executor)
+       :param intl: fill missing *_INTL fields from their ASCII counterpart (see fill_intl)
+       :return: the ADX as a dict
+       """
 
+    adx_data = await stream.read()
+    if isinstance(adx_data, bytes):
+        adx_data = adx_data.decode(encoding)
+    return await aloads(adx_data, validate, executor, intl)
 
-def dump(file_name: str, data_dict: dict, raise_exc=True) -> list[Exception]:
+
+REGEX_RECORD_PATH = re.compile(r'^/ADX/RECORDS/RECORD(?:\[(\d+)])?')
+
+
+def _map_errors(errors: list, offset: int = 0, header: bool = True) -> list[Exception]:
+    exc = []
+    for err in errors:
+        if type(err) is xmlschema.validators.exceptions.XMLSchemaValidationError:
+            path = err.path
+            if offset and path.startswith('/ADX/RECORDS/'):
+                path = REGEX_RECORD_PATH.sub(lambda m: f'/ADX/RECORDS/RECORD[{offset + int(m.group(1) or 1)}]', path)
+            elif not header and path.startswith('/ADX/HEADER'):
+                continue
+            if err.elem.tag == 'RECORD':
+                exc.append(UndefinedElementException(f'{path}: {err.reason}'))
+            elif err.elem.tag == 'HEADER':
+                exc.append(UndefinedElementException(f'{path}: {err.reason}'))
+            else:
+                exc.append(MalformedValueException(f'{path}: value "{err.obj}" {err.reason}'))
+    return exc
+
+
+def _encode_chunk(header: dict, records: list[dict], offset: int) -> tuple[bytes, bytes, bytes, list[Exception]]:
+    et, errors = ADX_EXPORT_SCHEMA.encode({'HEADER': header, 'RECORDS': {'RECORD': records}}, validation='lax')
+    exc = _map_errors(errors, offset, offset == 0)
+
+    records_elem = et.find('RECORDS')
+    indent = (records_elem.text or '').encode()
+    last_tail = records_elem[-1].tail or ''
+    data = []
+    for r in records_elem:
+        r.tail = None
+        data.append(indent)
+        data.append(tostring(r, encoding='utf-8'))
+
+    head = tail = b''
+    if offset == 0:
+        head = f'<ADX>{et.text or ""}'.encode() + tostring(et.find('HEADER'), encoding='utf-8') + b'<RECORDS>'
+        tail = f'{last_tail}</RECORDS>{records_elem.tail or ""}</ADX>{et.tail or ""}'.encode()
+    return head, b''.join(data), tail, exc
+
+
+def _timed_iter(iterable: Iterable, timing: str) -> Iterator:
+    m = metrics.current()
+    if m is None:
+        yield from iterable
+        return
+    it = iter(iterable)
+    while True:
+        with m.time(timing):
+            item = next(it, StopIteration)
+        if item is StopIteration:
+            return
+        yield item
+
+
+def _write_parallel(fp: BinaryIO, header: dict, records: list[dict], raise_exc: bool, workers: Optional[int],
+                    chunk_size: int) -> list[Exception]:
+    from concurrent.futures import ProcessPoolExecutor
+
+    exc = []
+    tail = b''
+    offsets = range(0, len(records), chunk_size)
+    with ProcessPoolExecutor(workers) as executor:
+        chunks = executor.map(_encode_chunk, [header] * len(offsets), [records[o:o + chunk_size] for o in offsets],
+                              offsets)
+        for head, data, chunk_tail, chunk_exc in _timed_iter(chunks, 'encode'):
+            if raise_exc and chunk_exc:
+                raise chunk_exc[0]
+            exc += chunk_exc
+            if head:
+                fp.write(b"<?xml version='1.0' encoding='utf-8'?>\n" + head)
+                tail = chunk_tail
+            fp.write(data)
+    fp.write(tail)
+    return exc
+
+
+def _write_output(file_name: Union[str, BinaryIO], write: Callable[[BinaryIO], Any], records: int,
+                  buffering: int, fsync: bool) -> OutputStats:
+    if not isinstance(file_name, str):
+        write(file_name)
+        stats = OutputStats(None, None, records)
+    else:
+        compression = compressed.from_extension(file_name)
+        with AtomicFile(file_name, binary=True, buffering=buffering, fsync=fsync) as out:
+            if compression:
+                with compressed.writer(out.file, compression) as fp:
+                    write(fp)
+            else:
+                write(out.file)
+            out.records = records
+        stats = out.stats
+        metrics.count('bytes_written', stats.bytes)
+    metrics.count('records_written', stats.records)
+    return stats
+
+
+def dump(file_name: Union[str, BinaryIO], data_dict: dict, raise_exc=True, buffering: int = BUFFER_SIZE,
+         fsync: bool = False,
+         report: Optional[Callable[[OutputStats], Any]] = None, workers: Optional[int] = 1,
+         chunk_size: int = 1000) -> list[Exception]:
     """Takes a dictionary and stores it to ADX xml file
        If 'HEADER' is missing the header fields are filled with defaults.
        The XML is validated against the strict XSD
+       A file is written to a temporary file first which replaces the target file only on success
+       (see output.AtomicFile). It is compressed if the file name ends with .gz, .bz2, .xz or .zst.
 
-       :param file_name: the filename to store the ADX data to
+       With more than one worker the records are validated and encoded in chunks in a process pool.
+       The encoded records are written in order under one header, so the file is identical to the one
+       written by a single worker. The paths of validation errors refer to the index of the record
+       in the whole export.
+
+       :param file_name: the filename to store the ADX data to or an opened binary stream
        :param data_dict: the dictionary with header and records
        :param raise_exc: if the validation exceptions are to be raised immediately
+       :param buffering: the write buffer size in bytes (not used for streams)
+       :param fsync: sync the file to disk before replacing the target (not used for streams)
+       :param report: a function called with the statistics after the file was written
+                      (file name and bytes are None for streams)
+       :param workers: number of processes to encode the records (default: encode in this process,
+                       None: see concurrent.futures.ProcessPoolExecutor)
+       :param chunk_size: number of records encoded at once by a worker
        :return: list of validation exception (if not raised immediately)
        """
 
-    data_dict = copy.deepcopy(data_dict)
-
     header = {
         'ADIF_VER': '3.1.4',
         'PROGRAMID': __proj_name__,
@@ -101,6 +397,25 @@ def dump(file_name: str, data_dict: dict, raise_exc=True) -> list[Exception]:
         'CREATED_TIMESTAMP': get_cur_adif_dt()
     }
 
+    if 'RECORDS' not in data_dict:
+        raise MissingRecordsException('Missing records in data_dict')
+
+    rec = data_dict['RECORDS']
+    if workers != 1 and type(rec) is list and len(rec) > chunk_size > 0:
+        defaults = header
+        header = dict(data_dict.get('HEADER', defaults))
+        for h in defaults:
+            header.setdefault(h, defaults[h])
+        exc = []
+        stats = _write_output(file_name,
+                              lambda fp: exc.extend(_write_parallel(fp, header, rec, raise_exc, workers, chunk_size)),
+                              len(rec), buffering, fsync)
+        if report:
+            report(stats)
+        return exc
+
+    data_dict = copy.deepcopy(data_dict)
+
     if 'HEADER' not in data_dict:
         data_dict['HEADER'] = header
     else:
@@ -108,30 +423,39 @@ def dump(file_name: str, data_dict: dict, raise_exc=True) -> list[Exception]:
             if h not in data_dict['HEADER']:
                 data_dict['HEADER'][h] = header[h]
 
-    if 'RECORDS' not in data_dict:
-        raise MissingRecordsException('Missing records in data_dict')
-
     rec = data_dict.pop('RECORDS')
     data_dict['RECORDS'] = {'RECORD': rec}
 
-    exc = []
-
-    et, errors = ADX_EXPORT_SCHEMA.encode(data_dict, validation='lax')
-    for err in errors:
-        if type(err) is xmlschema.validators.exceptions.XMLSchemaValidationError:
-            if err.elem.tag == 'RECORD':
-                exc.append(UndefinedElementException(f'{err.path}: {err.reason}'))
-            elif err.elem.tag == 'HEADER':
-                exc.append(UndefinedElementException(f'{err.path}: {err.reason}'))
-            else:
-                exc.append(MalformedValueException(f'{err.path}: value "{err.obj}" {err.reason}'))
+    with metrics.timed('encode'):
+        et, errors = ADX_EXPORT_SCHEMA.encode(data_dict, validation='lax')
+    exc = _map_errors(errors)
 
     if raise_exc and exc:
         raise exc[0]
 
-    ElementTree(et).write(file_name, xml_declaration=True, encoding='utf-8')
+    with metrics.timed('write'):
+        stats = _write_output(file_name, lambda fp: ElementTree(et).write(fp, xml_declaration=True, encoding='utf-8'),
+                              len(rec) if type(rec) is list else 1, buffering, fsync)
+    if report:
+        report(stats)
     return exc
 
 
-__all__ = ['load', 'loads', 'dump', 'MissingRecordsException', 'UndefinedElementException',
-           'MalformedValueException', 'XmlSyntaxError']
+async def adump(file_name: str, data_dict: dict, raise_exc=True, executor=None) -> list[Exception]:
+    """Takes a dictionary and stores it to ADX xml file without blocking the event loop
+       The encoding and writing is done in an executor (see dump)
+
+       :param file_name: the filename to store the ADX data to
+       :param data_dict: the dictionary with header and records
+       :param raise_exc: if the validation exceptions are to be raised immediately
+       :param executor: the concurrent.futures executor to run in (default: the loops default executor)
+       :return: list of validation exception (if not raised immediately)
+       """
+
+    import asyncio
+
+    return await asyncio.get_running_loop().run_in_executor(executor, dump, file_name, data_dict, raise_exc)
+
+
+__all__ = ['load', 'loads', 'load_flat', 'loads_flat', 'aload', 'aloads', 'dump', 'adump', 'fill_intl',
+           'MissingRecordsException', 'UndefinedElementException', 'MalformedValueException', 'XmlSyntaxError']
@@ -0,0 +1,119 @@
+# PyADIF-File (c) 2023-2025 by Andreas Schawo is licensed under CC BY-SA 4.0.
+# To view a copy of this license, visit http://creativecommons.org/licenses/by-sa/4.0/
+
+"""Lookup of ADIF bands by frequency and vice versa
+The band table (data/bands.json, edges in kHz) is loaded once on first use.
+Frequencies are looked up by bisecting the sorted lower band edges.
+
+    print(freq2band('14.074'))  # 20m
+    for rec in adi.loadi(af, stages=[fill_missing_band]):
+        ...
+"""
+
+import os
+import json
+from bisect import bisect_right
+from typing import Optional, Union
+from collections.abc import Iterable
+
+BANDS_FILE = os.path.join(os.path.dirname(__file__), 'data', 'bands.json')
+FREQ_FIELDS = (('FREQ', 'BAND'), ('FREQ_RX', 'BAND_RX'))
+
+_table = None
+
+
+class _BandTable:
+    def __init__(self, bands: dict[str, list]):
+        edges = sorted((lower / 1000, upper / 1000, name) for name, (lower, upper, *_) in bands.items())
+        self.lowers = [e[0] for e in edges]
+        self.uppers = [e[1] for e in edges]
+        self.names = [e[2] for e in edges]
+        self.ranges = {e[2].lower(): (e[0], e[1]) for e in edges}
+
+
+def load_bands() -> dict[str, list]:
+    """Get the raw band table as {band: [lower kHz, upper kHz, step kHz]}"""
+    with open(BANDS_FILE) as bf:
+        return json.load(bf)
+
+
+def _get_table() -> _BandTable:
+    global _table
+    if _table is None:
+        _table = _BandTable(load_bands())
+    return _table
+
+
+def freq2band(freq: Union[str, float]) -> Optional[str]:
+    """Get the band of a frequency
+    :param freq: the frequency in MHz (as in FREQ)
+    :return: the band name (e.g. 20m) or None if the frequency is outside of all bands or invalid"""
+
+    try:
+        freq = float(freq)
+    except (TypeError, ValueError):
+        return None
+
+    table = _get_table()
+    i = bisect_right(table.lowers, freq) - 1
+    if i < 0:
+        return None
+    if i > 0 and freq <= table.uppers[i - 1]:  # Shared edge belongs to the lower band (e.g. 54 MHz is 6m)
+        i -= 1
+    return table.names[i] if freq <= table.uppers[i] else None
+
+
+def band_range(band: str) -> Optional[tuple[float, float]]:
+    """Get the edges of a band
+    :param band: the band name (case insensitive)
+    :return: (lower, upper) in MHz or None if the band is unknown"""
+    return _get_table().ranges.get(band.lower())
+
+
+def check_band(freq: Union[str, float], band: str) -> bool:
+    """Test if a frequency is within a band
+    :param freq: the frequency in MHz
+    :param band: the band name (case insensitive)
+    :return: True if the frequency is within the band"""
+
+    edges = band_range(band)
+    try:
+        return edges is not None and edges[0] <= float(freq) <= edges[1]
+    except (TypeError, ValueError):
+        return False
+
+
+def batch_freq2band(freqs: Iterable[Union[str, float, None]]) -> list[Optional[str]]:
+    """Get the bands for a column of frequencies, each distinct frequency is looked up once
+    :param freqs: the frequencies in MHz
+    :return: a list of band names, None for frequencies outside of all bands or invalid"""
+
+    known = {}
+    result = []
+    for freq in freqs:
+        try:
+            result.append(known[freq])
+        except KeyError:
+            known[freq] = band = freq2band(freq)
+            result.append(band)
+    return result
+
+
+def fill_missing_band(record: dict) -> dict:
+    """Set missing BAND and BAND_RX from FREQ and FREQ_RX in place
+    Can be used as stage for adi.loadi/loads/load.
+
+    :param record: the record
+    :return: the record"""
+
+    for freq_field, band_field in FREQ_FIELDS:
+        if not record.get(band_field):
+            freq = record.get(freq_field)
+            if freq:
+                band = freq2band(freq)
+                if band:
+                    record[band_field] = band
+    return record
+
+
+__all__ = ['freq2band', 'band_range', 'check_band', 'batch_freq2band', 'fill_missing_band', 'load_bands']
@@ -0,0 +1,231 @@
+# PyADIF-File (c) 2023-2025 by Andreas Schawo is licensed under CC BY-SA 4.0.
+# To view a copy of this license, visit http://creativecommons.org/licenses/by-sa/4.0/
+
+"""Analyse call signs and resolve their DXCC entity
+Parsed call signs are cached, so repeated calls in a log cost a dict lookup only.
+Entities are resolved by longest prefix match against a prefix table in the cty.dat format
+(e.g. from https://www.country-files.com, the file must be supplied locally).
+
+    table = PrefixTable.load('cty.dat')
+    for info, entity in analyze_calls(['DF1ASC', 'HB9/DF1ASC/P'], table):
+        print(info.call, info.wpx, entity.name if entity else '?')
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+from collections.abc import Iterable
+
+from .util import REGEX_CALL
+
+CACHE_SIZE = 1 << 16
+REGEX_PREFIX = re.compile(r'.*[0-9]')
+# Suffixes without a DXCC entity (maritime and aeronautical mobile)
+NO_ENTITY_SUFFIXES = ('/MM', '/AM')
+
+
+class CallInfo(NamedTuple):
+    """The parts of a call sign (uppercase)"""
+    call: str
+    """the complete call sign"""
+    prefix: Optional[str]
+    """the country prefix without "/" (e.g. HB9 for HB9/DF1ASC) or None"""
+    base: str
+    """the base call sign (e.g. DF1ASC for HB9/DF1ASC/P)"""
+    suffix: Optional[str]
+    """the operation suffix with "/" (e.g. /P) or None"""
+    wpx: str
+    """the WPX style prefix (e.g. DF1 for DF1ASC, HB9 for HB9/DF1ASC, F0 for F/DF1ASC)"""
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_call(call: str) -> Optional[CallInfo]:
+    """Split a call sign into its parts, the results are cached
+    :param call: a call sign
+    :return: the parts or None if the call sign is invalid"""
+
+    m = REGEX_CALL.fullmatch(call)
+    if not m:
+        return None
+
+    prefix, base, suffix = (p.upper() if p else p for p in m.groups())
+    if prefix:
+        prefix = prefix[:-1]
+        pm = REGEX_PREFIX.match(prefix)
+        wpx = pm.group() if pm else prefix + '0'
+    else:
+        wpx = REGEX_PREFIX.match(base).group()
+    return CallInfo(call.upper(), prefix, base, suffix, wpx)
+
+
+class Entity(NamedTuple):
+    """A DXCC entity (or WAE region) from the prefix table"""
+    name: str
+    cq_zone: int
+    itu_zone: int
+    continent: str
+    latitude: float
+    """degrees north"""
+    longitude: float
+    """degrees east"""
+    utc_offset: float
+    prefix: str
+    """the primary prefix (with leading * for WAE only regions as in cty.dat)"""
+
+
+class PrefixTrie:
+    """Trie mapping prefixes to values for longest prefix matching"""
+
+    def __init__(self):
+        self._root = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, prefix: str, value):
+        """Add or replace a prefix"""
+        node = self._root
+        for c in prefix:
+            node = node.setdefault(c, {})
+        if None not in node:
+            self._size += 1
+        node[None] = value
+
+    def longest_match(self, text: str):
+        """Get the value of the longest prefix matching the start of the text
+        :param text: the text to match
+        :return: the value or None if no prefix matches"""
+        node = self._root
+        value = node.get(None)
+        for c in text:
+            node = node.get(c)
+            if node is None:
+                break
+            if None in node:
+                value = node[None]
+        return value
+
+
+REGEX_OVERRIDE = re.compile(r'\((\d+)\)|\[(\d+)]|<([-+.\d]+)/([-+.\d]+)>|\{(\w+)}|~([-+.\d]+)~')
+
+
+class PrefixTable:
+    """Prefix table to resolve call signs to entities by longest prefix match
+    Exact call sign entries (=CALL in cty.dat) take precedence. The last CACHE_SIZE lookups are cached per table."""
+
+    def __init__(self):
+        self.prefixes = PrefixTrie()
+        self.calls: dict[str, Entity] = {}
+        self.entities: list[Entity] = []
+        self._cache = lru_cache(maxsize=CACHE_SIZE)(self._resolve)
+
+    def add(self, prefix: str, entity: Entity):
+        """Add a prefix or an exact call sign (with leading "=") for an entity"""
+        prefix = prefix.upper()
+        if prefix.startswith('='):
+            self.calls[prefix[1:]] = entity
+        else:
+            self.prefixes.insert(prefix, entity)
+        self._cache.cache_clear()
+
+    @staticmethod
+    def _override(entity: Entity, text: str) -> Entity:
+        changes = {}
+        for cq, itu, lat, lon, cont, tz in REGEX_OVERRIDE.findall(text):
+            if cq:
+                changes['cq_zone'] = int(cq)
+            elif itu:
+                changes['itu_zone'] = int(itu)
+            elif lat:
+                changes['latitude'] = float(lat)
+                changes['longitude'] = -float(lon)
+            elif cont:
+                changes['continent'] = cont
+            elif tz:
+                changes['utc_offset'] = float(tz)
+        return entity._replace(**changes) if changes else entity
+
+    @classmethod
+    def loads(cls, cty_data: str) -> 'PrefixTable':
+        """Create a prefix table from content in the cty.dat format
+        Each entity starts with a line "Name: CQ: ITU: Continent: Lat: Lon (west): UTC offset: Prefix:"
+        followed by a comma separated list of prefixes terminated by ";".
+
+        :param cty_data: the cty.dat content
+        :return: the prefix table
+        :raises ValueError: if an entity line is malformed"""
+
+        table = cls()
+        for block in cty_data.split(';'):
+            if not block.strip():
+                continue
+            fields = block.split(':', 8)
+            if len(fields) != 9:
+                raise ValueError(f'Malformed entity "{block.strip()[:40]}"')
+            try:
+                entity = Entity(fields[0].strip(), int(fields[1]), int(fields[2]), fields[3].strip(),
+                                float(fields[4]), -float(fields[5]), float(fields[6]), fields[7].strip())
+            except ValueError:
+                raise ValueError(f'Malformed entity "{fields[0].strip()}"') from None
+            table.entities.append(entity)
+            for pfx in fields[8].split(','):
+                pfx = pfx.strip()
+                if pfx:
+                    m = REGEX_OVERRIDE.search(pfx)
+                    if m:
+                        table.add(pfx[:m.start()], table._override(entity, pfx[m.start():]))
+                    else:
+                        table.add(pfx, entity)
+        return table
+
+    @classmethod
+    def load(cls, file_name: str, encoding: str = 'latin-1') -> 'PrefixTable':
+        """Create a prefix table from a cty.dat file
+        :param file_name: the file name
+        :param encoding: the file encoding
+        :return: the prefix table"""
+
+        with open(file_name, encoding=encoding) as cf:
+            return cls.loads(cf.read())
+
+    def lookup(self, call: str) -> Optional[Entity]:
+        """Resolve a call sign to its entity
+        A country prefix (HB9/DF1ASC) is resolved instead of the base call, /MM and /AM have no entity.
+
+        :param call: a call sign
+        :return: the entity or None if the call sign is invalid or not resolvable"""
+
+        return self._cache(call)
+
+    def _resolve(self, call: str) -> Optional[Entity]:
+        entity = None
+        info = parse_call(call)
+        if info:
+            entity = self.calls.get(info.call)
+            if entity is None and info.suffix not in NO_ENTITY_SUFFIXES:
+                entity = self.calls.get(info.base) if not info.prefix else None
+                if entity is None:
+                    entity = self.prefixes.longest_match(info.prefix or info.base)
+        return entity
+
+
+def analyze_calls(calls: Iterable[str],
+                  table: Optional[PrefixTable] = None) -> list[tuple[Optional[CallInfo], Optional[Entity]]]:
+    """Parse many call signs and resolve their entities, every distinct call sign is processed once
+    :param calls: the call signs
+    :param table: the prefix table to resolve the entities (no resolving if None)
+    :return: a list of (parts or None, entity or None) in the order of the calls"""
+
+    seen = {}
+    result = []
+    for call in calls:
+        try:
+            result.append(seen[call])
+        except KeyError:
+            seen[call] = res = (parse_call(call), table.lookup(call) if table else None)
+            result.append(res)
+    return result
+
+
+__all__ = ['CallInfo', 'Entity', 'PrefixTrie', 'PrefixTable', 'parse_call', 'analyze_calls']
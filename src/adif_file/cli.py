@@ -0,0 +1,366 @@
+# PyADIF-File (c) 2023-2025 by Andreas Schawo is licensed under CC BY-SA 4.0.
+# To view a copy of this license, visit http://creativecommons.org/licenses/by-sa/4.0/
+
+"""Command line tool to process ADIF files in Unix pipelines
+All ADI processing is streaming. Input is read from stdin and output is written to stdout if no file is given.
+The ADX module (and its heavy dependencies) is only imported if ADX is read or written."""
+
+import io
+import os
+import re
+import sys
+import json
+import argparse
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional, TextIO, Union
+from collections.abc import Iterator, Iterable
+
+from . import adi, stats, __proj_name__, __version_str__
+from .compressed import reader, strip_extension
+
+BATCH_SIZE = 2000
+DEDUPE_FIELDS = ['CALL', 'QSO_DATE', 'TIME_ON', 'BAND', 'MODE']
+REGEX_CONDITION = re.compile(r'([a-zA-Z][a-zA-Z_0-9]*)(=|!=|~)(.*)', re.S)
+
+
+def get_format(file_name: str, fmt: Optional[str]) -> str:
+    """Determine the file format from an explicit format or the file extension (default: adi)"""
+    if fmt:
+        return fmt
+    if file_name and file_name != '-' and os.path.splitext(strip_extension(file_name))[1].lower() == '.adx':
+        return 'adx'
+    return 'adi'
+
+
+def parse_conditions(conditions: Iterable[str]) -> list[tuple[str, str, Union[str, re.Pattern]]]:
+    """Parse filter conditions FIELD=VALUE, FIELD!=VALUE or FIELD~REGEX
+    Values are upper cased and regular expressions are compiled case insensitive.
+    :param conditions: the condition expressions
+    :return: list of (field, operator, value or compiled regex)
+    :raises ValueError: if a condition is malformed or the regular expression is invalid"""
+    parsed = []
+    for c in conditions:
+        m = REGEX_CONDITION.fullmatch(c)
+        if not m:
+            raise ValueError(f'Malformed condition "{c}"')
+        field, op, value = m.groups()
+        if op == '~':
+            try:
+                value = re.compile(value, re.I)
+            except re.error as exc:
+                raise ValueError(f'Invalid regular expression in condition "{c}": {exc}') from None
+        else:
+            value = value.upper()
+        parsed.append((field.upper(), op, value))
+    return parsed
+
+
+def match(record: dict, conditions: list[tuple[str, str, Union[str, re.Pattern]]]) -> bool:
+    """Test if a record fulfills all conditions
+    The comparison is case insensitive. Missing fields and non text values (e.g. ADX APP elements)
+    are treated as empty.
+    :param record: the record
+    :param conditions: parsed conditions (see parse_conditions)
+    :return: True if all conditions match"""
+    for field, op, value in conditions:
+        rec_value = record.get(field, '')
+        if not isinstance(rec_value, str):
+            rec_value = ''
+        if op == '=':
+            if rec_value.upper() != value:
+                return False
+        elif op == '!=':
+            if rec_value.upper() == value:
+                return False
+        elif not value.search(rec_value):
+            return False
+    return True
+
+
+def project(record: dict, fields: Optional[list[str]]) -> dict:
+    """Reduce a record to the given fields in the given order"""
+    if not fields:
+        return record
+    return {f: record[f] for f in fields if f in record}
+
+
+def work_records(records: Iterable[dict], conditions: list, fields: Optional[list[str]]) -> list[dict]:
+    """Filter and project records"""
+    return [project(rec, fields) for rec in records if match(rec, conditions)]
+
+
+def work_stats(records: Iterable[dict], conditions: list, _) -> list[dict]:
+    """Compute the default statistics (see stats.default_aggregates)"""
+    return [stats.collect((rec for rec in records if match(rec, conditions)), stats.default_aggregates())]
+
+
+def _run_batch(work, parts: list[str], strip_tags: bool, conditions: list, fields: Optional[list[str]]) -> list:
+    return work((adi.unpack(p, strip_tags) for p in parts), conditions, fields)
+
+
+def _batches(parts: Iterator[tuple[bool, str]], size: int) -> Iterator[list[str]]:
+    batch = []
+    for _, part in parts:
+        batch.append(part)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def process_adi(fp: TextIO, work, strip_tags: bool = True, conditions: Optional[list] = None,
+                fields: Optional[list[str]] = None, jobs: int = 1) -> tuple[dict, Iterator[dict]]:
+    """Run a worker function over the records of an ADI stream
+    With more than one job the raw records are unpacked and processed in a process pool
+    in batches, while the order of the results is kept. Only jobs * 2 batches are in flight at a time.
+
+    :param fp: the ADI text stream
+    :param work: the worker function(records, conditions, fields) -> list of results (e.g. work_records)
+    :param strip_tags: remove any leading or trailing whitespaces in tag names
+    :param conditions: parsed filter conditions
+    :param fields: fields for projection
+    :param jobs: number of worker processes
+    :return: the header and an iterator over the results"""
+
+    conditions = conditions or []
+    parts = adi.split(fp)
+    _, header_part = next(parts)
+    header = adi.unpack(header_part, strip_tags)
+
+    def results_serial():
+        for batch in _batches(parts, BATCH_SIZE):
+            yield from _run_batch(work, batch, strip_tags, conditions, fields)
+
+    def results_parallel():
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(jobs) as executor:
+            pending = deque()
+            for batch in _batches(parts, BATCH_SIZE):
+                pending.append(executor.submit(_run_batch, work, batch, strip_tags, conditions, fields))
+                if len(pending) >= jobs * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    return header, results_parallel() if jobs > 1 else results_serial()
+
+
+@contextmanager
+def _open_input(opts) -> Iterator[TextIO]:
+    if opts.input != '-':
+        with reader(opts.input,
+                    encoding='utf-8' if get_format(opts.input, opts.informat) == 'adx' else opts.encoding) as fp:
+            yield fp
+    elif opts.encoding:
+        fp = io.TextIOWrapper(sys.stdin.buffer, encoding=opts.encoding)
+        try:
+            yield fp
+        finally:
+            fp.detach()  # Keep stdin open
+    else:
+        yield sys.stdin
+
+
+def _out_format(opts) -> str:
+    return get_format(getattr(opts, 'output', '-'), getattr(opts, 'outformat', None))
+
+
+def _read(opts, fp: TextIO, work, conditions=None, fields=None) -> tuple[dict, Iterator]:
+    if get_format(opts.input, opts.informat) == 'adx':
+        from . import adx
+
+        if _out_format(opts) != 'adx':
+            doc = adx.loads_flat(fp.read())
+            records = doc['RECORDS']
+        else:
+            doc = adx.loads(fp.read())
+            records = doc['RECORDS'] if isinstance(doc['RECORDS'], list) else [doc['RECORDS']]
+        return doc.get('HEADER') or {}, iter(work(records, conditions or [], fields))
+    return process_adi(fp, work, opts.strip_tags, conditions, fields, opts.jobs)
+
+
+def _write(opts, header: dict, records: Iterable[dict]) -> int:
+    header = dict(header)
+    header['PROGRAMID'] = __proj_name__
+    header['PROGRAMVERSION'] = __version_str__
+    header.pop('CREATED_TIMESTAMP', None)
+
+    if _out_format(opts) == 'adx':
+        from . import adx
+
+        records = [{k: v for k, v in r.items() if k != 'USERDEFS'} for r in records]
+        header.pop('USERDEFS', None)
+        out = sys.stdout.buffer if opts.output == '-' else opts.output
+        for exc in adx.dump(out, {'HEADER': header, 'RECORDS': records}, raise_exc=False):
+            sys.stderr.write(f'Warning: {exc}\n')
+        return len(records)
+
+    if opts.output == '-':
+        writer = adi.Writer(sys.stdout, header)
+        for rec in records:
+            writer.write(rec)
+        sys.stdout.write('\n')
+        return writer.records
+
+    return adi.dump(opts.output, {'HEADER': header, 'RECORDS': records}).records
+
+
+def cmd_convert(opts):
+    with _open_input(opts) as fp:
+        header, records = _read(opts, fp, work_records)
+        _write(opts, header, records)
+
+
+def cmd_select(opts):
+    fields = [f.strip().upper() for f in opts.fields.split(',') if f.strip()]
+    with _open_input(opts) as fp:
+        header, records = _read(opts, fp, work_records, fields=fields)
+        _write(opts, header, records)
+
+
+def cmd_filter(opts):
+    with _open_input(opts) as fp:
+        header, records = _read(opts, fp, work_records, parse_conditions(opts.conditions))
+        _write(opts, header, records)
+
+
+def cmd_dedupe(opts):
+    keys = [f.strip().upper() for f in opts.keys.split(',') if f.strip()]
+
+    def unique(recs):
+        seen = set()
+        for rec in recs:
+            key = tuple(rec.get(k, '').upper() for k in keys)
+            if key not in seen:
+                seen.add(key)
+                yield rec
+
+    with _open_input(opts) as fp:
+        header, records = _read(opts, fp, work_records)
+        _write(opts, header, unique(records))
+
+
+def cmd_stats(opts):
+    total = stats.default_aggregates()
+    with _open_input(opts) as fp:
+        _, partial = _read(opts, fp, work_stats, parse_conditions(opts.conditions))
+        for p in partial:
+            stats.merge(total, p)
+    result = stats.results(total)
+
+    out = sys.stdout if opts.output == '-' else open(opts.output, 'w')
+    try:
+        if opts.json:
+            json.dump(result, out, indent=2)
+            out.write('\n')
+        else:
+            for name, value in result.items():
+                title = name.replace('_', ' ').capitalize()
+                if isinstance(value, dict):
+                    out.write(f'{title}:\n')
+                    for k, v in value.items():
+                        out.write(f'  {k}: {v}\n')
+                else:
+                    out.write(f'{title}: {value if value is not None else "-"}\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def split_key(record: dict, by: str) -> str:
+    """Get the split key of a record by date, month, year or band"""
+    if by == 'band':
+        key = record.get('BAND', '').upper()
+    else:
+        key = record.get('QSO_DATE', '')[:{'date': 8, 'month': 6, 'year': 4}[by]]
+    return re.sub(r'[^A-Z0-9.]', '_', key) or 'unknown'
+
+
+def cmd_split(opts):
+    files = {}
+    writers = {}
+    try:
+        with _open_input(opts) as fp:
+            header, records = _read(opts, fp, work_records)
+            for rec in records:
+                key = split_key(rec, opts.by)
+                if key not in writers:
+                    files[key] = open(os.path.join(opts.directory, f'{opts.prefix}_{key}.adi'), 'w', encoding='ascii')
+                    writers[key] = adi.Writer(files[key], header)
+                writers[key].write(rec)
+    finally:
+        for f in files.values():
+            f.close()
+
+    for key in sorted(writers):
+        sys.stderr.write(f'{opts.prefix}_{key}.adi: {writers[key].records} records\n')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='adif', description='Process ADIF ADI/ADX files in a streaming way. '
+                                                              'Use "-" or omit files for stdin/stdout.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def add_command(name, func, help_txt, output=True):
+        cmd = sub.add_parser(name, help=help_txt)
+        cmd.set_defaults(func=func)
+        cmd.add_argument('-i', '--input', default='-', help='input file (default stdin)')
+        cmd.add_argument('--from', dest='informat', choices=('adi', 'adx'), help='input format (default by extension)')
+        cmd.add_argument('-e', '--encoding', help='ADI input encoding')
+        cmd.add_argument('--no-strip', dest='strip_tags', action='store_false', help='do not strip tag names')
+        cmd.add_argument('-j', '--jobs', type=int, default=1, help='number of worker processes for ADI input')
+        if output:
+            cmd.add_argument('-o', '--output', default='-', help='output file (default stdout)')
+            cmd.add_argument('--to', dest='outformat', choices=('adi', 'adx'),
+                             help='output format (default by extension)')
+        return cmd
+
+    add_command('convert', cmd_convert, 'convert between ADI and ADX')
+
+    cmd = add_command('select', cmd_select, 'keep only the given fields')
+    cmd.add_argument('fields', help='comma separated list of fields')
+
+    cmd = add_command('filter', cmd_filter, 'keep records matching all conditions')
+    cmd.add_argument('conditions', nargs='+', help='FIELD=VALUE, FIELD!=VALUE or FIELD~REGEX (case insensitive)')
+
+    cmd = add_command('dedupe', cmd_dedupe, 'drop duplicate records')
+    cmd.add_argument('-k', '--keys', default=','.join(DEDUPE_FIELDS),
+                     help=f'comma separated key fields (default {",".join(DEDUPE_FIELDS)})')
+
+    cmd = add_command('stats', cmd_stats, 'compute statistics per band, mode, day and prefix', output=False)
+    cmd.add_argument('-o', '--output', default='-', help='output file (default stdout)')
+    cmd.add_argument('--json', action='store_true', help='output as JSON')
+    cmd.add_argument('conditions', nargs='*', help='optional filter conditions')
+
+    cmd = add_command('split', cmd_split, 'split into ADI files by date, month, year or band', output=False)
+    cmd.add_argument('-b', '--by', choices=('date', 'month', 'year', 'band'), default='date', help='split key')
+    cmd.add_argument('-d', '--directory', default='.', help='output directory')
+    cmd.add_argument('-p', '--prefix', default='log', help='output file name prefix')
+
+    return parser
+
+
+def main(args: Optional[list[str]] = None):
+    """Command line entry point"""
+
+    opts = build_parser().parse_args(args)
+    if opts.jobs < 1:
+        sys.exit('Number of jobs must be at least 1')
+
+    try:
+        opts.func(opts)
+    except BrokenPipeError:
+        pass
+    except (adi.TooMuchHeadersException, adi.TagDefinitionException, adi.StringNotASCIIException,
+            adi.IllegalParameterException, SyntaxError, ValueError, OSError) as exc:  # SyntaxError: adx.XmlSyntaxError
+        sys.exit(f'{type(exc).__name__}: {exc}')
+
+
+__all__ = ['main', 'build_parser', 'process_adi', 'parse_conditions', 'match', 'project', 'split_key',
+           'work_records', 'work_stats']
+
+if __name__ == '__main__':
+    main()
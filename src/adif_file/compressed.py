@@ -0,0 +1,149 @@
+# PyADIF-File (c) 2023-2025 by Andreas Schawo is licensed under CC BY-SA 4.0.
+# To view a copy of this license, visit http://creativecommons.org/licenses/by-sa/4.0/
+
+"""Transparent support for compressed files (gzip, bz2, xz and zstd)
+Compressed input is detected by magic bytes and decompressed incrementally while reading.
+Compressed output is selected by the file extension (.gz, .bz2, .xz, .zst).
+zstd requires the zstandard package (or Python 3.14+).
+
+    with compressed.reader('qsos.adi.gz') as af:
+        for rec in adi.loadi(af):
+            ...
+"""
+
+import io
+import os
+import bz2
+import gzip
+import lzma
+from typing import BinaryIO, Optional, Union, TextIO
+
+from .util import sniff_encoding, SNIFF_SIZE
+
+MAGIC = ((b'\x1f\x8b', 'gzip'),
+         (b'BZh', 'bz2'),
+         (b'\xfd7zXZ\x00', 'xz'),
+         (b'\x28\xb5\x2f\xfd', 'zstd'),
+         )
+EXTENSIONS = {'.gz': 'gzip',
+              '.gzip': 'gzip',
+              '.bz2': 'bz2',
+              '.xz': 'xz',
+              '.zst': 'zstd',
+              '.zstd': 'zstd',
+              }
+
+
+def _zstd():
+    try:
+        from compression import zstd  # Python 3.14+
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        raise ImportError('zstd compression requires the zstandard package') from None
+
+
+def available(compression: str) -> bool:
+    """Test if a compression is supported (zstd needs an additional package before Python 3.14)"""
+    if compression == 'zstd':
+        try:
+            _zstd()
+        except ImportError:
+            return False
+        return True
+    return compression in EXTENSIONS.values()
+
+
+def detect(file_name: str) -> Optional[str]:
+    """Detect the compression of a file by its magic bytes
+    :param file_name: the file name
+    :return: the compression (gzip, bz2, xz or zstd) or None if not compressed"""
+
+    with open(file_name, 'rb') as f:
+        head = f.read(6)
+    for magic, compression in MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def from_extension(file_name: str) -> Optional[str]:
+    """Get the compression from the file extension
+    :param file_name: the file name
+    :return: the compression (gzip, bz2, xz or zstd) or None if not compressed"""
+    return EXTENSIONS.get(os.path.splitext(file_name)[1].lower())
+
+
+def strip_extension(file_name: str) -> str:
+    """Remove a compression extension from the file name (e.g. qsos.adi.gz -> qsos.adi)"""
+    base, ext = os.path.splitext(file_name)
+    return base if ext.lower() in EXTENSIONS else file_name
+
+
+def _open(file_name: str, compression: Optional[str], mode: str, encoding: Optional[str], errors: Optional[str]):
+    if compression == 'gzip':
+        return gzip.open(file_name, mode, encoding=encoding, errors=errors)
+    if compression == 'bz2':
+        return bz2.open(file_name, mode, encoding=encoding, errors=errors)
+    if compression == 'xz':
+        return lzma.open(file_name, mode, encoding=encoding, errors=errors)
+    if compression == 'zstd':
+        return _zstd().open(file_name, mode, encoding=encoding, errors=errors)
+    return open(file_name, mode, encoding=encoding, errors=errors)
+
+
+def reader(file_name: str, binary: bool = False, encoding: Optional[str] = None) -> Union[TextIO, BinaryIO]:
+    """Open a file for reading which is decompressed incrementally if it is compressed
+    :param file_name: the file name
+    :param binary: open in binary mode
+    :param encoding: the text encoding (detected from the first bytes with util.sniff_encoding if None)
+    :return: the opened file"""
+
+    compression = detect(file_name)
+    if binary:
+        return _open(file_name, compression, 'rb', None, None)
+
+    errors = None
+    if encoding is None:
+        with _open(file_name, compression, 'rb', None, None) as f:
+            encoding, errors = sniff_encoding(f.read(SNIFF_SIZE))
+    return _open(file_name, compression, 'rt', encoding, errors)
+
+
+def writer(fileobj: BinaryIO, compression: str, level: Optional[int] = None) -> BinaryIO:
+    """Wrap a binary file to compress everything written to it
+    Closing the returned stream finishes the compression but does not close the file.
+
+    :param fileobj: the binary file to write the compressed data to
+    :param compression: the compression (gzip, bz2, xz or zstd)
+    :param level: the compression level (default of the codec if None)
+    :return: the stream to write to
+    :raises ValueError: if the compression is unknown"""
+
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=fileobj, mode='wb', compresslevel=9 if level is None else level)
+    if compression == 'bz2':
+        return bz2.BZ2File(fileobj, 'wb', compresslevel=9 if level is None else level)
+    if compression == 'xz':
+        return lzma.LZMAFile(fileobj, 'wb', preset=level)
+    if compression == 'zstd':
+        zstd = _zstd()
+        if hasattr(zstd, 'ZstdFile'):
+            return zstd.ZstdFile(fileobj, 'wb', level=level)
+        cctx = zstd.ZstdCompressor() if level is None else zstd.ZstdCompressor(level=level)
+        return cctx.stream_writer(fileobj, closefd=False)
+    raise ValueError(f'Unknown compression "{compression}"')
+
+
+def text_writer(fileobj: BinaryIO, compression: str, encoding: Optional[str] = None,
+                level: Optional[int] = None) -> TextIO:
+    """Wrap a binary file to compress all text written to it (see writer)"""
+    return io.TextIOWrapper(writer(fileobj, compression, level), encoding=encoding)
+
+
+__all__ = ['available', 'detect', 'from_extension', 'strip_extension', 'reader', 'writer', 'text_writer',
+           'EXTENSIONS']
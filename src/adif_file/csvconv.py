@@ -0,0 +1,197 @@
+# PyADIF-File (c) 2023-2025 by Andreas Schawo is licensed under CC BY-SA 4.0.
+# To view a copy of this license, visit http://creativecommons.org/licenses/by-sa/4.0/
+
+"""Convert ADIF ADI files to CSV and vice versa
+Both directions are streaming, so the memory usage does not depend on the file size."""
+
+import csv
+import sys
+import json
+import os.path
+import argparse
+import tempfile
+from typing import Optional
+from collections.abc import Iterator, Iterable
+
+from . import adi, compressed
+from .util import REGEX_ISODATE, REGEX_ISOTIME, REGEX_ADIFDATE, REGEX_ADIFTIME
+
+CSV_SEPARATOR = ';'
+CSV_FIELDS = ['QSO_DATE', 'TIME_ON', 'CALL', 'BAND', 'MODE', 'RST_SENT', 'RST_RCVD']
+
+
+def is_date_field(field: str) -> bool:
+    """Check if a field contains a date by its name"""
+    return 'DATE' in field.upper()
+
+
+def is_time_field(field: str) -> bool:
+    """Check if a field contains a time by its name"""
+    return field.upper().startswith('TIME')
+
+
+def norm2adif(field: str, value: str) -> str:
+    """Convert ISO formated date or time values to ADIF, other values are returned unchanged
+    :param field: the field name to decide if it is a date or time
+    :param value: the value to convert
+    :return: the converted value"""
+    if is_date_field(field):
+        if REGEX_ISODATE.fullmatch(value):
+            return value.replace('-', '')
+    elif is_time_field(field):
+        if REGEX_ISOTIME.fullmatch(value):
+            return value.replace(':', '')
+    return value
+
+
+def norm2iso(field: str, value: str) -> str:
+    """Convert ADIF formated date or time values to ISO, other values are returned unchanged
+    :param field: the field name to decide if it is a date or time
+    :param value: the value to convert
+    :return: the converted value"""
+    if is_date_field(field):
+        if REGEX_ADIFDATE.fullmatch(value):
+            return value[:4] + '-' + value[4:6] + '-' + value[6:8]
+    elif is_time_field(field):
+        if REGEX_ADIFTIME.fullmatch(value):
+            return value[:2] + ':' + value[2:4] + (':' + value[4:6] if len(value) == 6 else '')
+    return value
+
+
+def csv_recordsi(rows: Iterable[dict[str, str]], fieldnames: list[str]) -> Iterator[dict[str, str]]:
+    """Turn CSV rows to ADIF records with date and time normalised to ADIF format
+    :param rows: the CSV rows (e.g. from a csv.DictReader)
+    :param fieldnames: the CSV column names
+    :return: an iterator of records"""
+
+    fields = [(f, f.upper(), is_date_field(f) or is_time_field(f)) for f in fieldnames if f]
+    for row in rows:
+        rec = {}
+        for f, param, norm in fields:
+            value = row.get(f)
+            if value:
+                rec[param] = norm2adif(param, value) if norm else value
+        yield rec
+
+
+def csv2adi(csv_file: str, adi_file: str, header: bool = True, separator: str = CSV_SEPARATOR,
+            encoding: Optional[str] = None, **params) -> int:
+    """Convert a CSV file to an ADI file in one streaming pass
+    ISO formated dates and times are converted to ADIF format.
+
+    :param csv_file: the CSV file name (the first line must contain the field names)
+    :param adi_file: the ADI file name to write to
+    :param header: write an ADI header
+    :param separator: the CSV field separator
+    :param encoding: the CSV file encoding
+    :param params: further parameters for adi.dump
+    :return: number of CSV rows processed"""
+
+    count = 0
+
+    def counted(rows):
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    with open(csv_file, newline='', encoding=encoding) as csv_f:
+        reader = csv.DictReader(csv_f, delimiter=separator)
+        doc = {'RECORDS': csv_recordsi(counted(reader), reader.fieldnames or [])}
+        if header:
+            doc['HEADER'] = {}
+        adi.dump(adi_file, doc, **params)
+
+    return count
+
+
+def _write_csv(csv_file: str, fieldnames: list[str], records: Iterable[dict[str, str]],
+               separator: str, iso_format: bool) -> int:
+    count = 0
+    with open(csv_file, 'w', newline='', encoding='utf-8') as csv_f:
+        csv_w = csv.DictWriter(csv_f, fieldnames, delimiter=separator, extrasaction='ignore')
+        csv_w.writeheader()
+        for rec in records:
+            if iso_format:
+                rec = {f: norm2iso(f, v) for f, v in rec.items()}
+            csv_w.writerow(rec)
+            count += 1
+    return count
+
+
+def adi2csv(adi_file: str, csv_file: str, fieldnames: Optional[list[str]] = None, separator: str = CSV_SEPARATOR,
+            encoding: Optional[str] = None, iso_format: bool = False, strip_tags: bool = True) -> int:
+    """Convert an ADI file to a UTF-8 CSV file
+    If the fieldnames are given the file is converted in one streaming pass and other fields are dropped.
+    Otherwise the ADI is parsed only once while the records are spilled to a temporary file
+    to discover all fieldnames (CSV_FIELDS first).
+    Compressed ADI files (gzip, bz2, xz, zstd) are detected and decompressed while reading (see compressed.reader).
+
+    :param adi_file: the ADI file name
+    :param csv_file: the CSV file name to write to
+    :param fieldnames: the columns to write (schema)
+    :param separator: the CSV field separator
+    :param encoding: the ADI file encoding (detected from the content if None, see util.sniff_encoding)
+    :param iso_format: convert dates and times to ISO format
+    :param strip_tags: remove any leading or trailing whitespaces in tag names (default: True)
+    :return: number of records written
+    :raises TooMuchHeadersException: if the data contains more than one header
+    :raises TagDefinitionException: if the tag definition is invalid or the length is not an integer"""
+
+    with compressed.reader(adi_file, encoding=encoding) as adi_f:
+        records = adi.loadi(adi_f, strip_tags=strip_tags)
+        next(records)  # Skip header
+
+        if fieldnames:
+            return _write_csv(csv_file, fieldnames, records, separator, iso_format)
+
+        fieldnames = CSV_FIELDS.copy()
+        known = set(fieldnames)
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as spill_f:
+            for rec in records:
+                for k in rec:
+                    if k not in known:
+                        known.add(k)
+                        fieldnames.append(k)
+                spill_f.write(json.dumps(rec))
+                spill_f.write('\n')
+
+            spill_f.seek(0)
+            return _write_csv(csv_file, fieldnames, map(json.loads, spill_f), separator, iso_format)
+
+
+def main(args: Optional[list[str]] = None):
+    """Command line entry point for CSV conversion"""
+
+    parser = argparse.ArgumentParser(description='Convert an ADI file to CSV or vice versa. '
+                                                 'The direction is determined by the input file extension.')
+    parser.add_argument('input', help='the .adi or .csv input file')
+    parser.add_argument('output', help='the output file')
+    parser.add_argument('-n', '--noheader', action='store_true', help='do not write an ADI header')
+    parser.add_argument('-s', '--separator', default=CSV_SEPARATOR, help=f'CSV separator (default "{CSV_SEPARATOR}")')
+    parser.add_argument('-f', '--fields', help='comma separated list of CSV columns (no field discovery)')
+    parser.add_argument('-e', '--encoding', help='the input file encoding')
+    parser.add_argument('--iso', action='store_true', help='write dates and times in ISO format to CSV')
+    opts = parser.parse_args(args)
+
+    if not os.path.isfile(opts.input):
+        sys.exit(f'Unable to read file "{opts.input}"')
+
+    ftype = os.path.splitext(compressed.strip_extension(opts.input))[1].lower()
+    try:
+        if ftype == '.csv':
+            csv2adi(opts.input, opts.output, not opts.noheader, opts.separator, opts.encoding)
+        elif ftype == '.adi':
+            adi2csv(opts.input, opts.output, opts.fields.split(',') if opts.fields else None,
+                    opts.separator, opts.encoding, opts.iso)
+        else:
+            sys.exit(f'Unable to determine filetype from extension "{ftype}".\nUse .adi or .csv files only.')
+    except (adi.TooMuchHeadersException, adi.TagDefinitionException, adi.StringNotASCIIException,
+            adi.IllegalParameterException) as exc:
+        sys.exit(f'Error converting "{opts.input}": {exc}')
+
+
+__all__ = ['csv2adi', 'adi2csv', 'csv_recordsi', 'norm2adif', 'norm2iso', 'main', 'CSV_SEPARATOR', 'CSV_FIELDS']
+
+if __name__ == '__main__':
+    main()
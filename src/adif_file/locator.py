@@ -0,0 +1,190 @@
+# PyADIF-File (c) 2023-2025 by Andreas Schawo is licensed under CC BY-SA 4.0.
+# To view a copy of this license, visit http://creativecommons.org/licenses/by-sa/4.0/
+
+"""Maidenhead locator math
+Decoded locators are cached. The batch functions use NumPy if it is installed
+and fall back to pure Python otherwise.
+
+    print(locator_distance('JO30uj', 'JN47kp'))  # (km, bearing in degrees)
+    km, deg = batch_distance([r.get('MY_GRIDSQUARE') for r in recs], [r.get('GRIDSQUARE') for r in recs])
+"""
+
+import math
+from functools import lru_cache
+from typing import Optional
+from collections.abc import Iterable
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+from .util import REGEX_LOCATOR
+
+CACHE_SIZE = 1 << 16
+EARTH_RADIUS = 6371.0
+"""mean earth radius in km"""
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _decode(locator: str) -> Optional[tuple[float, float]]:
+    if not locator or not REGEX_LOCATOR.fullmatch(locator):
+        return None
+
+    loc = locator.upper()
+    lon = (ord(loc[0]) - 65) * 20 - 180 + int(loc[2]) * 2
+    lat = (ord(loc[1]) - 65) * 10 - 90 + int(loc[3])
+    lon_size, lat_size = 2, 1
+    if len(loc) >= 6:
+        lon_size, lat_size = lon_size / 24, lat_size / 24
+        lon += (ord(loc[4]) - 65) * lon_size
+        lat += (ord(loc[5]) - 65) * lat_size
+    if len(loc) == 8:
+        lon_size, lat_size = lon_size / 10, lat_size / 10
+        lon += int(loc[6]) * lon_size
+        lat += int(loc[7]) * lat_size
+    return lat + lat_size / 2, lon + lon_size / 2
+
+
+def locator2latlon(locator: str) -> tuple[float, float]:
+    """Get the center of a locator (4, 6 or 8 chars), the results are cached
+    :param locator: the Maidenhead locator
+    :return: (latitude, longitude) in degrees (north and east positive)
+    :raises ValueError: if the locator is invalid"""
+
+    pos = _decode(locator)
+    if pos is None:
+        raise ValueError(f'Invalid locator "{locator}"')
+    return pos
+
+
+def latlon2locator(lat: float, lon: float, precision: int = 6) -> str:
+    """Get the locator for a position
+    :param lat: the latitude in degrees (north positive)
+    :param lon: the longitude in degrees (east positive)
+    :param precision: the number of chars (4, 6 or 8)
+    :return: the Maidenhead locator (subsquare in lower case)"""
+
+    if precision not in (4, 6, 8):
+        raise ValueError('Precision must be 4, 6 or 8')
+
+    lon = min(max(lon + 180, 0), 360 - 1e-9)
+    lat = min(max(lat + 90, 0), 180 - 1e-9)
+    loc = chr(65 + int(lon // 20)) + chr(65 + int(lat // 10)) + str(int(lon % 20 // 2)) + str(int(lat % 10))
+    if precision >= 6:
+        lon, lat = lon % 2 * 12, lat % 1 * 24
+        loc += chr(97 + int(lon)) + chr(97 + int(lat))
+    if precision == 8:
+        loc += str(int(lon % 1 * 10)) + str(int(lat % 1 * 10))
+    return loc
+
+
+def distance_bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> tuple[float, float]:
+    """Get great circle distance and initial bearing between two positions
+    :return: (distance in km, bearing in degrees 0..360 from north)"""
+
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dlambda = math.radians(lon2 - lon1)
+
+    hav = math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    dist = 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(hav)))
+    brg = math.degrees(math.atan2(math.sin(dlambda) * math.cos(phi2),
+                                  math.cos(phi1) * math.sin(phi2) -
+                                  math.sin(phi1) * math.cos(phi2) * math.cos(dlambda)))
+    return dist, brg % 360
+
+
+def locator_distance(locator1: str, locator2: str) -> tuple[float, float]:
+    """Get great circle distance and initial bearing between the centers of two locators
+    :return: (distance in km, bearing in degrees 0..360 from north)
+    :raises ValueError: if a locator is invalid"""
+
+    return distance_bearing(*locator2latlon(locator1), *locator2latlon(locator2))
+
+
+def _index(locators: Iterable[Optional[str]], index: dict, positions: list) -> list[int]:
+    """Map locators to indexes of their decoded positions, each distinct locator is decoded once"""
+    result = []
+    for loc in locators:
+        try:
+            result.append(index[loc])
+        except KeyError:
+            index[loc] = len(positions)
+            result.append(len(positions))
+            positions.append(_decode(loc))
+    return result
+
+
+def _batch_python(idx1: list[int], idx2: list[int], positions: list) -> tuple[list[float], list[float]]:
+    dists, brgs = [], []
+    cache = {}
+    for i1, i2 in zip(idx1, idx2):
+        try:
+            dist, brg = cache[i1, i2]
+        except KeyError:
+            p1, p2 = positions[i1], positions[i2]
+            if p1 is None or p2 is None:
+                dist = brg = math.nan
+            else:
+                dist, brg = distance_bearing(*p1, *p2)
+            cache[i1, i2] = dist, brg
+        dists.append(dist)
+        brgs.append(brg)
+    return dists, brgs
+
+
+def _batch_numpy(idx1: list[int], idx2: list[int], positions: list) -> tuple[list[float], list[float]]:
+    nan_pos = (math.nan, math.nan)
+    pos = numpy.radians(numpy.array([p or nan_pos for p in positions], dtype=float))
+    a1 = pos[numpy.array(idx1, dtype=numpy.intp)]
+    a2 = pos[numpy.array(idx2, dtype=numpy.intp)]
+    phi1, lambda1 = a1[:, 0], a1[:, 1]
+    phi2, lambda2 = a2[:, 0], a2[:, 1]
+    dlambda = lambda2 - lambda1
+    cos_phi1, cos_phi2 = numpy.cos(phi1), numpy.cos(phi2)
+
+    hav = numpy.sin((phi2 - phi1) / 2) ** 2 + cos_phi1 * cos_phi2 * numpy.sin(dlambda / 2) ** 2
+    dist = 2 * EARTH_RADIUS * numpy.arcsin(numpy.minimum(1.0, numpy.sqrt(hav)))
+    brg = numpy.degrees(numpy.arctan2(numpy.sin(dlambda) * cos_phi2,
+                                      cos_phi1 * numpy.sin(phi2) -
+                                      numpy.sin(phi1) * cos_phi2 * numpy.cos(dlambda))) % 360
+    return dist.tolist(), brg.tolist()
+
+
+def batch_distance(locators1: Iterable[Optional[str]], locators2: Iterable[Optional[str]],
+                   use_numpy: Optional[bool] = None) -> tuple[list[float], list[float]]:
+    """Get great circle distances and initial bearings for many pairs of locators
+    Missing or invalid locators result in NaN values.
+
+    :param locators1: the start locators (e.g. MY_GRIDSQUARE of the records)
+    :param locators2: the destination locators (e.g. GRIDSQUARE of the records)
+    :param use_numpy: force (True) or disable (False) NumPy, default: use it if installed
+    :return: (distances in km, bearings in degrees) as lists in the order of the pairs"""
+
+    index, positions = {}, []
+    idx1 = _index(locators1, index, positions)
+    idx2 = _index(locators2, index, positions)
+    if len(idx1) != len(idx2):
+        raise ValueError('Number of locators must be equal')
+
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+        raise ImportError('NumPy is not installed')
+
+    if use_numpy and positions:
+        return _batch_numpy(idx1, idx2, positions)
+    return _batch_python(idx1, idx2, positions)
+
+
+def qso_distance(record: dict) -> Optional[float]:
+    """Key function for the distance in km from MY_GRIDSQUARE to GRIDSQUARE (None if one is missing or invalid)"""
+    p1 = _decode(record.get('MY_GRIDSQUARE'))
+    p2 = _decode(record.get('GRIDSQUARE'))
+    if p1 is None or p2 is None:
+        return None
+    return distance_bearing(*p1, *p2)[0]
+
+
+__all__ = ['locator2latlon', 'latlon2locator', 'distance_bearing', 'locator_distance', 'batch_distance',
+           'qso_distance', 'EARTH_RADIUS']
@@ -0,0 +1,137 @@
+# PyADIF-File (c) 2023-2025 by Andreas Schawo is licensed under CC BY-SA 4.0.
+# To view a copy of this license, visit http://creativecommons.org/licenses/by-sa/4.0/
+
+"""Optional instrumentation of loading and dumping ADI/ADX
+Counters and timings are only collected while a Metrics object is active. The loaders and writers
+look up the active object once per call, so there is no overhead per record if no Metrics are used.
+Metrics are collected in the current thread or task only (not in worker processes).
+
+    with Metrics() as m:
+        adi.load('qsos.adi')
+    print(m.to_prometheus())
+"""
+
+import json
+import time
+from contextvars import ContextVar
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Iterator, Optional, Union
+
+COUNTERS = {'bytes_read': 'Bytes read from files',
+            'chars_read': 'Characters of ADI text read',
+            'records_parsed': 'Records (and headers) parsed',
+            'fields_parsed': 'Fields parsed',
+            'records_written': 'Records written',
+            'bytes_written': 'Bytes written to files',
+            'warnings': 'Warnings issued',
+            'replaced_values': 'Values with replaced non ASCII characters',
+            }
+TIMINGS = {'read': 'Reading and decoding the input',
+           'split': 'Splitting ADI text into header and records (tokenizing)',
+           'unpack': 'Building the dictionaries of ADI records',
+           'stages': 'Running record stages',
+           'parse': 'Parsing ADX',
+           'validate': 'Validating ADX against the schema',
+           'pack': 'Formatting ADI records',
+           'encode': 'Encoding and validating ADX with the export schema',
+           'write': 'Writing the output',
+           }
+
+_current: ContextVar[Optional['Metrics']] = ContextVar('adif_file_metrics', default=None)
+
+
+class Metrics:
+    """Counters and timings (in seconds) collected while ADI/ADX data is loaded or dumped
+    The object is activated as context manager. Nested activations replace the outer one for their duration."""
+
+    def __init__(self):
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        """the counters (see COUNTERS)"""
+        self.timings = dict.fromkeys(TIMINGS, 0.0)
+        """the accumulated timings in seconds (see TIMINGS)"""
+        self.peak_buffer = 0
+        """the largest text buffer held while splitting ADI (in characters)"""
+        self._tokens = []
+
+    def __enter__(self) -> 'Metrics':
+        self._tokens.append(_current.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _current.reset(self._tokens.pop())
+        return False
+
+    def add(self, counter: str, value: int = 1):
+        """Increase a counter"""
+        self.counters[counter] += value
+
+    def buffer(self, size: int):
+        """Report the size of a buffer to track the peak"""
+        if size > self.peak_buffer:
+            self.peak_buffer = size
+
+    @contextmanager
+    def time(self, timing: str) -> Iterator[None]:
+        """Measure the time of the block and add it to a timing"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[timing] += time.perf_counter() - start
+
+    def reset(self):
+        """Set all counters and timings to zero"""
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.timings = dict.fromkeys(TIMINGS, 0.0)
+        self.peak_buffer = 0
+
+    def to_dict(self) -> dict:
+        """Get all values as dictionary"""
+        return {'counters': dict(self.counters),
+                'timings': dict(self.timings),
+                'peak_buffer': self.peak_buffer,
+                }
+
+    def to_json(self, **params) -> str:
+        """Get all values as JSON (params are passed to json.dumps)"""
+        return json.dumps(self.to_dict(), **params)
+
+    def to_prometheus(self, prefix: str = 'adif_') -> str:
+        """Get all values in the Prometheus text exposition format
+        :param prefix: the prefix of the metric names
+        :return: the metrics text"""
+
+        lines = []
+        for name, help_text in COUNTERS.items():
+            lines += [f'# HELP {prefix}{name}_total {help_text}',
+                      f'# TYPE {prefix}{name}_total counter',
+                      f'{prefix}{name}_total {self.counters[name]}']
+        lines += [f'# HELP {prefix}seconds_total Time spent per processing step',
+                  f'# TYPE {prefix}seconds_total counter']
+        lines += [f'{prefix}seconds_total{{step="{name}"}} {self.timings[name]:.6f}' for name in TIMINGS]
+        lines += [f'# HELP {prefix}peak_buffer_chars Largest text buffer held while splitting ADI',
+                  f'# TYPE {prefix}peak_buffer_chars gauge',
+                  f'{prefix}peak_buffer_chars {self.peak_buffer}']
+        return '\n'.join(lines) + '\n'
+
+
+def current() -> Optional[Metrics]:
+    """Get the active Metrics or None if no Metrics are collected"""
+    return _current.get()
+
+
+def timed(timing: str):
+    """Measure the time of a block with the active Metrics (does nothing if no Metrics are active)"""
+    m = _current.get()
+    return nullcontext() if m is None else m.time(timing)
+
+
+def count(counter: str, value: Union[int, Callable[[], int]] = 1):
+    """Increase a counter of the active Metrics (does nothing if no Metrics are active)
+    The value can be given as function, which is only called if Metrics are active."""
+    m = _current.get()
+    if m is not None:
+        m.add(counter, value() if callable(value) else value)
+
+
+__all__ = ['Metrics', 'current', 'timed', 'count', 'COUNTERS', 'TIMINGS']
@@ -0,0 +1,104 @@
+# PyADIF-File (c) 2023-2025 by Andreas Schawo is licensed under CC BY-SA 4.0.
+# To view a copy of this license, visit http://creativecommons.org/licenses/by-sa/4.0/
+
+"""Lookup and normalisation of ADIF modes and submodes
+The mode table (data/modes.json) is loaded once on first use into read only structures.
+All names are interned, so normalised records share the same MODE/SUBMODE strings.
+
+    print(normalize_mode('usb'))  # ('SSB', 'USB')
+    for rec in adi.loadi(af, stages=[normalize_modes]):
+        ...
+"""
+
+import os
+import sys
+import json
+from types import MappingProxyType
+from typing import Optional
+from collections.abc import Mapping
+
+MODES_FILE = os.path.join(os.path.dirname(__file__), 'data', 'modes.json')
+
+_modes = None
+_submodes = None
+
+
+def load_modes() -> dict[str, list[str]]:
+    """Get the raw mode table as {mode: [submodes]}"""
+    with open(MODES_FILE) as mf:
+        return json.load(mf)
+
+
+def _load():
+    global _modes, _submodes
+    modes = {sys.intern(m): frozenset(map(sys.intern, subs)) for m, subs in load_modes().items()}
+    _submodes = MappingProxyType({s: m for m, subs in modes.items() for s in subs})
+    _modes = MappingProxyType(modes)
+
+
+def modes() -> Mapping[str, frozenset[str]]:
+    """Get the read only mapping of all modes to their submodes"""
+    if _modes is None:
+        _load()
+    return _modes
+
+
+def submodes() -> Mapping[str, str]:
+    """Get the read only mapping of all submodes to their mode"""
+    if _submodes is None:
+        _load()
+    return _submodes
+
+
+def submode2mode(submode: str) -> Optional[str]:
+    """Get the mode of a submode
+    :param submode: the submode (case insensitive)
+    :return: the mode or None if the submode is unknown"""
+    return submodes().get(submode.upper())
+
+
+def check_mode(mode: str, submode: Optional[str] = None) -> bool:
+    """Test if mode is an ADIF mode and the optional submode belongs to it (case insensitive)"""
+    subs = modes().get(mode.upper())
+    if subs is None:
+        return False
+    return not submode or submode.upper() in subs
+
+
+def normalize_mode(mode: Optional[str], submode: Optional[str] = None) -> tuple[Optional[str], Optional[str]]:
+    """Normalise mode and submode to uppercase interned values
+    A submode given as mode (e.g. USB) is moved to the submode and its mode is set (SSB),
+    a missing mode is set from the submode. Unknown values are kept but interned as well.
+
+    :param mode: the mode
+    :param submode: the submode
+    :return: (mode, submode)"""
+
+    mode = sys.intern(mode.upper()) if mode else mode
+    submode = sys.intern(submode.upper()) if submode else submode
+
+    if mode and mode not in modes():
+        parent = submodes().get(mode)
+        if parent and (not submode or submode == mode):
+            return parent, mode
+    elif not mode and submode:
+        mode = submodes().get(submode, mode)
+    return mode, submode
+
+
+def normalize_modes(record: dict) -> dict:
+    """Normalise MODE and SUBMODE of a record in place (see normalize_mode)
+    Can be used as stage for adi.loadi/loads/load.
+
+    :param record: the record
+    :return: the record"""
+
+    mode, submode = normalize_mode(record.get('MODE'), record.get('SUBMODE'))
+    if mode:
+        record['MODE'] = mode
+    if submode:
+        record['SUBMODE'] = submode
+    return record
+
+
+__all__ = ['modes', 'submodes', 'submode2mode', 'check_mode', 'normalize_mode', 'normalize_modes', 'load_modes']
@@ -0,0 +1,110 @@
+# PyADIF-File (c) 2023-2025 by Andreas Schawo is licensed under CC BY-SA 4.0.
+# To view a copy of this license, visit http://creativecommons.org/licenses/by-sa/4.0/
+
+"""Crash safe file output shared by the ADI and ADX writers
+The data is written to a temporary file in the target directory which replaces the target
+only after everything was written (and optionally synced) successfully. So a log file is never left truncated.
+
+    with AtomicFile('qsos.adi', encoding='ascii') as out:
+        out.file.write(data)
+        out.records = 1
+    print(out.stats)
+"""
+
+import os
+import stat
+import secrets
+from typing import Any, NamedTuple, Optional
+
+BUFFER_SIZE = 1 << 20
+
+
+class OutputStats(NamedTuple):
+    """Result of a file export"""
+    file_name: Optional[str]
+    """the target file name (None for streams)"""
+    bytes: Optional[int]
+    """number of bytes written (None for streams)"""
+    records: int
+    """number of records written"""
+
+
+class AtomicFile:
+    """Context manager writing to a temporary file which is atomically renamed to the target on success
+    If an exception occurs the temporary file is removed and the target stays untouched.
+    A replaced target keeps its permissions.
+
+    :param file_name: the target file name
+    :param binary: open the file in binary mode
+    :param encoding: the encoding for text mode
+    :param buffering: the write buffer size in bytes
+    :param fsync: sync the file and directory to disk before and after renaming"""
+
+    def __init__(self, file_name: str, binary: bool = False, encoding: Optional[str] = 'utf-8',
+                 buffering: int = BUFFER_SIZE, fsync: bool = False):
+        self.file_name = file_name
+        self._binary = binary
+        self._encoding = encoding
+        self._buffering = buffering
+        self._fsync = fsync
+        self._tmp_name = None
+        self.file: Any = None
+        """the opened temporary file to write to"""
+        self.records = 0
+        """number of records written (to be set by the writer)"""
+        self.bytes = None
+        """number of bytes written (available after closing)"""
+
+    @property
+    def stats(self) -> OutputStats:
+        """The statistics of the export"""
+        return OutputStats(self.file_name, self.bytes, self.records)
+
+    def __enter__(self) -> 'AtomicFile':
+        path, name = os.path.split(os.path.abspath(self.file_name))
+        self._tmp_name = os.path.join(path, f'.{name}.{secrets.token_hex(4)}.tmp')
+        if self._binary:
+            self.file = open(self._tmp_name, 'xb', buffering=self._buffering)
+        else:
+            self.file = open(self._tmp_name, 'x', buffering=self._buffering, encoding=self._encoding)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                self.file.flush()
+                if self._fsync:
+                    os.fsync(self.file.fileno())
+                self.bytes = os.fstat(self.file.fileno()).st_size
+        finally:
+            self.file.close()
+            if exc_type is not None:
+                os.remove(self._tmp_name)
+
+        if exc_type is None:
+            try:
+                if os.path.exists(self.file_name):
+                    os.chmod(self._tmp_name, stat.S_IMODE(os.stat(self.file_name).st_mode))
+                os.replace(self._tmp_name, self.file_name)
+            except BaseException:
+                os.remove(self._tmp_name)
+                raise
+            if self._fsync:
+                _fsync_dir(os.path.dirname(os.path.abspath(self.file_name)))
+        return False
+
+
+def _fsync_dir(path: str):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:  # pragma: no cover
+        return  # Directories can not be opened on Windows
+    try:
+        os.fsync(fd)
+    except OSError:  # pragma: no cover
+        pass
+    finally:
+        os.close(fd)
+
+
+__all__ = ['AtomicFile', 'OutputStats', 'BUFFER_SIZE']
@@ -0,0 +1,185 @@
+# PyADIF-File (c) 2023-2025 by Andreas Schawo is licensed under CC BY-SA 4.0.
+# To view a copy of this license, visit http://creativecommons.org/licenses/by-sa/4.0/
+
+"""Profiling harness for the library
+Runs one operation under cProfile or tracemalloc, writes the .pstats file or the allocation snapshot
+and prints the hottest functions or allocation sites. Without an input file a test log is generated
+with examples/gen_big_adi.py (needs a source checkout).
+
+    python -m adif_file.profile load big.adi
+    python -m adif_file.profile adx-dump -n 5000 --tool tracemalloc
+    py-spy record -o flame.svg -- python -m adif_file.profile loadi big.adi --tool none
+
+The .pstats files can be turned into flame graphs with tools like flameprof or snakeviz.
+"""
+
+import os
+import sys
+import time
+import pstats
+import cProfile
+import argparse
+import tempfile
+import tracemalloc
+import importlib.util
+from typing import Any, Optional, TextIO
+from collections.abc import Callable
+
+from . import adi, adx, compressed
+
+OPERATIONS = ('load', 'loads', 'loadi', 'dump', 'adx-load', 'adx-load-flat', 'adx-dump')
+TOOLS = ('cprofile', 'tracemalloc', 'none')
+GEN_SCRIPT = os.path.join(os.path.dirname(__file__), '..', '..', 'examples', 'gen_big_adi.py')
+
+
+def generate(file_name: str, records: int):
+    """Generate a test log with examples/gen_big_adi.py
+    :param file_name: the file to write (ADX if the extension is .adx)
+    :param records: the number of records
+    :raises FileNotFoundError: if the generator is not available (e.g. the package is installed)"""
+
+    if not os.path.isfile(GEN_SCRIPT):
+        raise FileNotFoundError(f'Generator "{os.path.abspath(GEN_SCRIPT)}" not found')
+    spec = importlib.util.spec_from_file_location('gen_big_adi', GEN_SCRIPT)
+    gen = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(gen)
+
+    doc = gen.gen_doc(records)
+    if file_name.lower().endswith('.adx'):
+        adx.dump(file_name, doc, False, fsync=False)
+    else:
+        adi.dump(file_name, doc, fsync=False)
+
+
+def prepare(operation: str, file_name: str, out_dir: str, strip_tags: bool = True,
+            validate: bool = False) -> Callable[[], Any]:
+    """Prepare an operation for profiling
+    Everything which is not part of the operation (e.g. reading the text for loads) is done here.
+
+    :param operation: the operation (see OPERATIONS)
+    :param file_name: the input file
+    :param out_dir: the directory to write dump output to
+    :param strip_tags: strip_tags option for the ADI loaders
+    :param validate: validate option for the ADX loaders
+    :return: a function running the operation
+    :raises ValueError: if the operation is unknown"""
+
+    if operation == 'load':
+        return lambda: adi.load(file_name, strip_tags=strip_tags)
+    if operation == 'loads':
+        with compressed.reader(file_name) as af:
+            text = af.read()
+        return lambda: adi.loads(text, strip_tags=strip_tags)
+    if operation == 'loadi':
+        def loadi():
+            with compressed.reader(file_name) as af:
+                for _ in adi.loadi(af, strip_tags=strip_tags):
+                    pass
+        return loadi
+    if operation == 'dump':
+        doc = adi.load(file_name)
+        return lambda: adi.dump(os.path.join(out_dir, 'dump.adi'), doc, fsync=False)
+    if operation == 'adx-load':
+        return lambda: adx.load(file_name, validate)
+    if operation == 'adx-load-flat':
+        return lambda: adx.load_flat(file_name, validate)
+    if operation == 'adx-dump':
+        doc = adx.load(file_name)
+        return lambda: adx.dump(os.path.join(out_dir, 'dump.adx'), doc, False, fsync=False)
+    raise ValueError(f'Unknown operation "{operation}"')
+
+
+def run(func: Callable[[], Any], tool: str = 'cprofile', output: Optional[str] = None, top: int = 20,
+        sort: str = 'cumulative', out: Optional[TextIO] = None) -> float:
+    """Run a function under a profiler and print the top entries
+    :param func: the function to run (see prepare)
+    :param tool: cprofile, tracemalloc or none (to run under an external profiler like py-spy)
+    :param output: the file to write the .pstats or the tracemalloc snapshot to (not written if None)
+    :param top: the number of functions or allocation sites to print
+    :param sort: the sort key for cProfile statistics (e.g. cumulative, tottime)
+    :param out: the stream to print to (default: stdout)
+    :return: the runtime in seconds
+    :raises ValueError: if the tool is unknown"""
+
+    out = out or sys.stdout
+    if tool == 'cprofile':
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.runcall(func)
+        elapsed = time.perf_counter() - start
+        if output:
+            profiler.dump_stats(output)
+        pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(top)
+    elif tool == 'tracemalloc':
+        tracemalloc.start(25)
+        start = time.perf_counter()
+        try:
+            result = func()  # Keep the result alive for the snapshot
+            elapsed = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),
+                                           tracemalloc.Filter(False, '<frozen importlib._bootstrap>')))
+        if output:
+            snapshot.dump(output)
+        out.write(f'Peak traced memory: {peak / 1024 / 1024:.1f} MiB, '
+                  f'held by the result ({type(result).__name__}): {current / 1024 / 1024:.1f} MiB\n')
+        for stat in snapshot.statistics('lineno')[:top]:
+            out.write(f'{stat}\n')
+    elif tool == 'none':
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+    else:
+        raise ValueError(f'Unknown tool "{tool}"')
+
+    return elapsed
+
+
+def main(args: Optional[list[str]] = None):
+    """Command line entry point for profiling"""
+
+    parser = argparse.ArgumentParser(prog='python -m adif_file.profile',
+                                     description='Profile an operation of the library with cProfile or tracemalloc.')
+    parser.add_argument('operation', choices=OPERATIONS, help='the operation to profile')
+    parser.add_argument('file', nargs='?', help='the input file (default: generated with examples/gen_big_adi.py)')
+    parser.add_argument('-n', '--records', type=int, default=10000,
+                        help='number of records to generate if no file is given (default 10000)')
+    parser.add_argument('-t', '--tool', choices=TOOLS, default='cprofile', help='the profiler (default cprofile)')
+    parser.add_argument('-o', '--output', help='the .pstats or snapshot file (default <operation>.pstats/.snapshot)')
+    parser.add_argument('--top', type=int, default=20, help='number of entries to print (default 20)')
+    parser.add_argument('--sort', default='cumulative', help='sort key for cProfile (default cumulative)')
+    parser.add_argument('--no-strip-tags', dest='strip_tags', action='store_false',
+                        help='do not strip whitespaces in ADI tag names')
+    parser.add_argument('--validate', action='store_true', help='validate ADX against the schema while loading')
+    opts = parser.parse_args(args)
+
+    output = opts.output
+    if output is None and opts.tool != 'none':
+        output = f'{opts.operation}.{"pstats" if opts.tool == "cprofile" else "snapshot"}'
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_name = opts.file
+        if file_name is None:
+            file_name = os.path.join(tmp_dir, 'profile.adx' if opts.operation.startswith('adx') else 'profile.adi')
+            try:
+                generate(file_name, opts.records)
+            except FileNotFoundError as exc:
+                sys.exit(f'{exc}, please give an input file')
+        elif not os.path.isfile(file_name):
+            sys.exit(f'Unable to read file "{file_name}"')
+
+        func = prepare(opts.operation, file_name, tmp_dir, opts.strip_tags, opts.validate)
+        elapsed = run(func, opts.tool, output, opts.top, opts.sort)
+
+    print(f'{opts.operation} {opts.file or f"({opts.records} generated records)"}: {elapsed:.3f} s')
+    if output:
+        print(f'Profile written to {output}')
+
+
+__all__ = ['generate', 'prepare', 'run', 'main', 'OPERATIONS', 'TOOLS']
+
+if __name__ == '__main__':
+    main()
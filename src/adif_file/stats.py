@@ -0,0 +1,299 @@
+# PyADIF-File (c) 2023-2025 by Andreas Schawo is licensed under CC BY-SA 4.0.
+# To view a copy of this license, visit http://creativecommons.org/licenses/by-sa/4.0/
+
+"""Compute statistics over ADIF records in a single streaming pass
+A set of declared aggregates is fed record by record. Aggregates of the same kind
+can be merged, so chunks of a log can be processed in parallel and combined afterwards.
+
+    aggs = {'qsos': Count(), 'bands': GroupBy('BAND', Count()), 'calls': DistinctCount('CALL')}
+    print(aggregate(adi.loads(adi_data)['RECORDS'], aggs))
+"""
+
+import math
+import hashlib
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional, Union
+from collections.abc import Iterable
+
+from .util import REGEX_LOCATOR
+from .callsign import parse_call
+
+Key = Union[str, Callable[[dict], Optional[str]]]
+
+
+class FieldKey:
+    """Key function returning the uppercase value of a field (None if missing or empty)
+
+    :param field: the field name"""
+
+    def __init__(self, field: str):
+        self.field = field.upper()
+
+    def __call__(self, record: dict) -> Optional[str]:
+        value = record.get(self.field)
+        return value.upper() if value else None
+
+
+def _key_func(key: Key) -> Callable[[dict], Optional[str]]:
+    return FieldKey(key) if isinstance(key, str) else key
+
+
+def qso_datetime(record: dict) -> Optional[str]:
+    """Key function for the QSO start as sortable text "YYYYMMDD HHMMSS" (None if QSO_DATE is missing)"""
+    date = record.get('QSO_DATE')
+    if not date:
+        return None
+    return date + ' ' + record.get('TIME_ON', '').ljust(6, '0')
+
+
+def grid_square(record: dict) -> Optional[str]:
+    """Key function for the 4 char grid square of GRIDSQUARE (None if missing or invalid)"""
+    loc = record.get('GRIDSQUARE')
+    if loc and REGEX_LOCATOR.fullmatch(loc):
+        return loc[:4].upper()
+    return None
+
+
+def call_prefix(record: dict) -> Optional[str]:
+    """Key function for the (WPX style) prefix of CALL e.g. DF1ASC -> DF1, HB9/DF1ASC -> HB9, F/DF1ASC -> F0
+    Returns None if the call sign is missing or invalid."""
+    call = record.get('CALL')
+    info = parse_call(call) if call else None
+    return info.wpx if info else None
+
+
+class Aggregate(ABC):
+    """Base class of all aggregates"""
+
+    @abstractmethod
+    def add(self, record: dict):
+        """Feed a record"""
+
+    @abstractmethod
+    def merge(self, other: 'Aggregate'):
+        """Merge the state of an aggregate of the same kind (e.g. from another chunk) into this one"""
+
+    @abstractmethod
+    def new(self) -> 'Aggregate':
+        """Get an empty aggregate with the same configuration"""
+
+    @abstractmethod
+    def result(self) -> Any:
+        """Get the result"""
+
+
+class Count(Aggregate):
+    """Count records, if a key is given only records having a value for it
+
+    :param key: a field name or a key function"""
+
+    def __init__(self, key: Optional[Key] = None):
+        self._key = key
+        self._key_func = _key_func(key) if key else None
+        self.count = 0
+
+    def add(self, record: dict):
+        if self._key_func is None or self._key_func(record) is not None:
+            self.count += 1
+
+    def merge(self, other: 'Count'):
+        self.count += other.count
+
+    def new(self) -> 'Count':
+        return Count(self._key)
+
+    def result(self) -> int:
+        return self.count
+
+
+class HyperLogLog:
+    """Approximate distinct counter with fixed memory of 2^precision bytes
+    The standard error is about 1.04 / sqrt(2^precision) (1.6% for the default precision of 12).
+
+    :param precision: number of index bits (4..16)"""
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 16:
+            raise ValueError('Precision must be between 4 and 16')
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: str):
+        h = int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+        idx = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def merge(self, other: 'HyperLogLog'):
+        if other.precision != self.precision:
+            raise ValueError('Cannot merge HyperLogLog with different precision')
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # Linear counting for small cardinalities
+        return round(estimate)
+
+
+class DistinctCount(Aggregate):
+    """Count distinct values of a key, exact or approximated with a HyperLogLog
+
+    :param key: a field name or a key function
+    :param approx: use a HyperLogLog instead of a set of all values
+    :param precision: the HyperLogLog precision"""
+
+    def __init__(self, key: Key, approx: bool = False, precision: int = 12):
+        self._key = key
+        self._key_func = _key_func(key)
+        self._approx = approx
+        self._precision = precision
+        self.values = HyperLogLog(precision) if approx else set()
+
+    def add(self, record: dict):
+        value = self._key_func(record)
+        if value is not None:
+            self.values.add(value)
+
+    def merge(self, other: 'DistinctCount'):
+        if self._approx:
+            self.values.merge(other.values)
+        else:
+            self.values |= other.values
+
+    def new(self) -> 'DistinctCount':
+        return DistinctCount(self._key, self._approx, self._precision)
+
+    def result(self) -> int:
+        return self.values.count() if self._approx else len(self.values)
+
+
+class Min(Aggregate):
+    """Minimum value of a key (string comparison)
+
+    :param key: a field name or a key function"""
+
+    def __init__(self, key: Key):
+        self._key = key
+        self._key_func = _key_func(key)
+        self.value = None
+
+    def _better(self, value: str) -> bool:
+        return value < self.value
+
+    def add(self, record: dict):
+        value = self._key_func(record)
+        if value is not None and (self.value is None or self._better(value)):
+            self.value = value
+
+    def merge(self, other: 'Min'):
+        if other.value is not None and (self.value is None or self._better(other.value)):
+            self.value = other.value
+
+    def new(self) -> 'Min':
+        return type(self)(self._key)
+
+    def result(self) -> Optional[str]:
+        return self.value
+
+
+class Max(Min):
+    """Maximum value of a key (string comparison)
+
+    :param key: a field name or a key function"""
+
+    def _better(self, value: str) -> bool:
+        return value > self.value
+
+
+class GroupBy(Aggregate):
+    """Compute an aggregate per value of a key, records without a value are skipped
+
+    :param key: a field name or a key function
+    :param aggregate: the aggregate template to compute per group"""
+
+    def __init__(self, key: Key, aggregate: Aggregate):
+        self._key = key
+        self._key_func = _key_func(key)
+        self._template = aggregate
+        self.groups = {}
+
+    def add(self, record: dict):
+        value = self._key_func(record)
+        if value is not None:
+            try:
+                self.groups[value].add(record)
+            except KeyError:
+                self.groups[value] = agg = self._template.new()
+                agg.add(record)
+
+    def merge(self, other: 'GroupBy'):
+        for value, agg in other.groups.items():
+            if value in self.groups:
+                self.groups[value].merge(agg)
+            else:
+                self.groups[value] = agg
+
+    def new(self) -> 'GroupBy':
+        return GroupBy(self._key, self._template.new())
+
+    def result(self) -> dict:
+        return {k: self.groups[k].result() for k in sorted(self.groups)}
+
+
+def default_aggregates(approx: bool = False) -> dict[str, Aggregate]:
+    """The aggregates commonly needed for award and contest reporting"""
+    return {'records': Count(),
+            'unique_calls': DistinctCount('CALL', approx),
+            'unique_grids': DistinctCount(grid_square, approx),
+            'unique_prefixes': DistinctCount(call_prefix, approx),
+            'first_qso': Min(qso_datetime),
+            'last_qso': Max(qso_datetime),
+            'bands': GroupBy('BAND', Count()),
+            'modes': GroupBy('MODE', Count()),
+            'days': GroupBy('QSO_DATE', Count()),
+            'prefixes': GroupBy(call_prefix, Count()),
+            }
+
+
+def collect(records: Iterable[dict], aggregates: dict[str, Aggregate]) -> dict[str, Aggregate]:
+    """Feed all records to all aggregates in one pass
+    :param records: the records (e.g. adi.loads(...)['RECORDS'])
+    :param aggregates: a mapping of names to aggregates
+    :return: the aggregates"""
+    aggs = list(aggregates.values())
+    for rec in records:
+        for agg in aggs:
+            agg.add(rec)
+    return aggregates
+
+
+def merge(aggregates: dict[str, Aggregate], other: dict[str, Aggregate]) -> dict[str, Aggregate]:
+    """Merge aggregates computed for another chunk into the first ones
+    :return: the merged aggregates"""
+    for name, agg in aggregates.items():
+        agg.merge(other[name])
+    return aggregates
+
+
+def results(aggregates: dict[str, Aggregate]) -> dict[str, Any]:
+    """Get the results of all aggregates"""
+    return {name: agg.result() for name, agg in aggregates.items()}
+
+
+def aggregate(records: Iterable[dict], aggregates: dict[str, Aggregate]) -> dict[str, Any]:
+    """Compute all aggregates over the records in one pass
+    :param records: the records (e.g. adi.loads(...)['RECORDS'])
+    :param aggregates: a mapping of names to aggregates
+    :return: a mapping of names to results"""
+    return results(collect(records, aggregates))
+
+
+__all__ = ['Aggregate', 'Count', 'DistinctCount', 'Min', 'Max', 'GroupBy', 'HyperLogLog',
+           'FieldKey', 'qso_datetime', 'grid_square', 'call_prefix',
+           'default_aggregates', 'collect', 'merge', 'results', 'aggregate']
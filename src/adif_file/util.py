@@ -4,8 +4,12 @@
 """Provides some useful function to handle ADIF data"""
 import re
 import sys
+import codecs
 import datetime
-from typing import Union
+import unicodedata
+from functools import lru_cache
+from typing import Optional, Union
+from collections.abc import Iterable
 
 
 def get_cur_adif_dt() -> str:
@@ -54,6 +58,10 @@ REGEX_ADIFTIME = re.compile(r'(([0-1][0-9])|(2[0-3]))([0-5][0-9])([0-5][0-9])?')
 REGEX_ADIFDATE = re.compile(r'([1-9][0-9]{3})((0[1-9])|(1[0-2]))((0[1-9])|([1-2][0-9])|(3[0-1]))')
 REGEX_ISOTIME = re.compile(r'(([0-1][0-9])|(2[0-3])):([0-5][0-9])(:[0-5][0-9])?')
 REGEX_ISODATE = re.compile(r'([1-9][0-9]{3})-((0[1-9])|(1[0-2]))-((0[1-9])|([1-2][0-9])|(3[0-1]))')
+# Fields with an *_INTL counterpart (UTF-8, only allowed in ADX)
+INTL_FIELDS = ('ADDRESS', 'COMMENT', 'COUNTRY', 'MY_ANTENNA', 'MY_CITY', 'MY_COUNTRY', 'MY_NAME', 'MY_POSTAL_CODE',
+               'MY_RIG', 'MY_SIG', 'MY_SIG_INFO', 'MY_STREET', 'NAME', 'NOTES', 'QSLMSG', 'QTH', 'RIG', 'SIG',
+               'SIG_INFO')
 # noinspection RegExpRedundantEscape
 REGEX_EMAIL = re.compile(r'[\w\-\.]+@([\w-]+\.)+[\w-]{2,}')
 
@@ -76,6 +84,145 @@ def check_call(call: str) -> Union[None, tuple]:
     return None
 
 
+_DIGITS = frozenset('0123456789')
+_FIELD_CHARS = frozenset('ABCDEFGHIJKLMNOPQRabcdefghijklmnopqr')
+_SUBSQUARE_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXabcdefghijklmnopqrstuvwx')
+
+
+def check_adif_date(date: str) -> bool:
+    """Test a date for ADIF format YYYYMMDD without a regular expression (same result as REGEX_ADIFDATE)"""
+    return (len(date) == 8 and _DIGITS.issuperset(date) and date[0] != '0'
+            and '01' <= date[4:6] <= '12' and '01' <= date[6:] <= '31')
+
+
+def check_adif_time(time: str) -> bool:
+    """Test a time for ADIF format HHMM or HHMMSS without a regular expression (same result as REGEX_ADIFTIME)"""
+    return (len(time) in (4, 6) and _DIGITS.issuperset(time)
+            and time[:2] <= '23' and time[2] <= '5' and (len(time) == 4 or time[4] <= '5'))
+
+
+def check_locator(locator: str) -> bool:
+    """Test a Maidenhead locator without a regular expression (same result as REGEX_LOCATOR)"""
+    size = len(locator)
+    return (size in (4, 6, 8) and locator[0] in _FIELD_CHARS and locator[1] in _FIELD_CHARS
+            and locator[2] in _DIGITS and locator[3] in _DIGITS
+            and (size == 4 or (locator[4] in _SUBSQUARE_CHARS and locator[5] in _SUBSQUARE_CHARS
+                               and (size == 6 or (locator[6] in _DIGITS and locator[7] in _DIGITS)))))
+
+
+VALIDATORS = {'date': check_adif_date,
+              'time': check_adif_time,
+              'locator': check_locator,
+              'rst': REGEX_RST.fullmatch,
+              'email': REGEX_EMAIL.fullmatch,
+              'call': REGEX_CALL.fullmatch,
+              }
+
+
+def validate_column(values: Iterable[Optional[str]], kind: Union[str, re.Pattern],
+                    bad_indices: bool = False, allow_empty: bool = False) -> list:
+    """Validate many values of the same format (e.g. a field of all records)
+    Each distinct value is checked only once.
+
+    :param values: the values
+    :param kind: one of VALIDATORS ('date', 'time', 'locator', 'rst', 'email', 'call') or a compiled pattern
+    :param bad_indices: return the indices of the invalid values instead of a mask
+    :param allow_empty: treat missing or empty values as valid
+    :return: a list of bool (True if valid) or a list of indices of invalid values
+    :raises ValueError: if the kind is unknown"""
+
+    if isinstance(kind, re.Pattern):
+        check = kind.fullmatch
+    else:
+        try:
+            check = VALIDATORS[kind.lower()]
+        except KeyError:
+            raise ValueError(f'Unknown kind "{kind}"') from None
+
+    known = {None: allow_empty, '': allow_empty}
+    mask = []
+    for value in values:
+        valid = known.get(value)
+        if valid is None:
+            valid = known[value] = bool(check(value))
+        mask.append(valid)
+
+    if bad_indices:
+        return [i for i, valid in enumerate(mask) if not valid]
+    return mask
+
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+@lru_cache(maxsize=1 << 14)
+def _date_epoch(date: str) -> int:
+    if not check_adif_date(date):
+        raise ValueError(f'Not a valide ADIF date "{date}"')
+    return (datetime.date(int(date[:4]), int(date[4:6]), int(date[6:])) - _EPOCH.date()).days * 86400
+
+
+@lru_cache(maxsize=1 << 17)
+def _time_seconds(time: str) -> int:
+    if not check_adif_time(time):
+        raise ValueError(f'Not a valide ADIF time "{time}"')
+    return int(time[:2]) * 3600 + int(time[2:4]) * 60 + (int(time[4:]) if len(time) == 6 else 0)
+
+
+def adif2epoch(date: str, time: Optional[str] = None) -> int:
+    """Convert ADIF date and time to seconds since the epoch (UTC)
+    Dates and times are converted separately and cached, so repeated values cost a dict lookup.
+
+    :param date: the ADIF date YYYYMMDD
+    :param time: the ADIF time HHMM or HHMMSS (default: midnight)
+    :return: the epoch seconds
+    :raises ValueError: if date or time are not valid ADIF values"""
+    return _date_epoch(date) + (_time_seconds(time) if time else 0)
+
+
+def adif2datetime(date: str, time: Optional[str] = None) -> datetime.datetime:
+    """Convert ADIF date and time to a timezone aware datetime (UTC)
+
+    :param date: the ADIF date YYYYMMDD
+    :param time: the ADIF time HHMM or HHMMSS (default: midnight)
+    :return: the datetime
+    :raises ValueError: if date or time are not valid ADIF values"""
+    return _EPOCH + datetime.timedelta(seconds=adif2epoch(date, time))
+
+
+def qso_epochs(record: dict) -> tuple[int, Optional[int]]:
+    """Get start and end of a QSO as epoch seconds from QSO_DATE, TIME_ON, QSO_DATE_OFF and TIME_OFF
+    Without QSO_DATE_OFF a TIME_OFF before TIME_ON is taken as the next day.
+
+    :param record: the QSO record
+    :return: (start, end or None if TIME_OFF is missing)
+    :raises ValueError: if QSO_DATE is missing or a value is not valid"""
+
+    start = adif2epoch(record.get('QSO_DATE', ''), record.get('TIME_ON'))
+    time_off = record.get('TIME_OFF')
+    if not time_off:
+        return start, None
+    end = adif2epoch(record.get('QSO_DATE_OFF') or record['QSO_DATE'], time_off)
+    if end < start and not record.get('QSO_DATE_OFF'):
+        end += 86400
+    return start, end
+
+
+def batch_epoch(dates: Iterable[Optional[str]], times: Optional[Iterable[Optional[str]]] = None) -> list[Optional[int]]:
+    """Convert columns of ADIF dates and times to epoch seconds (e.g. to sort or compare QSO times)
+    :param dates: the ADIF dates
+    :param times: the ADIF times (default: midnight)
+    :return: a list of epoch seconds, None for missing or invalid values"""
+
+    result = []
+    for date, time in zip(dates, times) if times is not None else ((d, None) for d in dates):
+        try:
+            result.append(adif2epoch(date, time))
+        except (ValueError, TypeError):
+            result.append(None)
+    return result
+
+
 def find_non_ascii(text: str) -> set:
     """Find all non ASCII chars in a text
     :param text: the text to search in
@@ -87,20 +234,133 @@ def find_non_ascii(text: str) -> set:
     return set(non_ascii)
 
 
-def replace_non_ascii(text: str, replace: dict[str, str] = None, default: str = '_') -> str:
+TRANSLIT_MAP = {'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'Ä': 'Ae', 'Ö': 'Oe', 'Ü': 'Ue', 'ß': 'ss',
+                'æ': 'ae', 'Æ': 'Ae', 'ø': 'oe', 'Ø': 'Oe', 'å': 'aa', 'Å': 'Aa', 'œ': 'oe', 'Œ': 'Oe',
+                'ł': 'l', 'Ł': 'L', 'đ': 'd', 'Đ': 'D', 'ð': 'd', 'Ð': 'D', 'þ': 'th', 'Þ': 'Th', 'ı': 'i',
+                '´': "'", '‘': "'", '’': "'", '‚': "'", '“': '"', '”': '"', '„': '"', '«': '"', '»': '"',
+                '–': '-', '—': '-', '…': '...', '\xa0': ' ', '°': 'deg', '€': 'EUR'}
+
+
+def _is_ascii(code: int) -> bool:
+    return 32 <= code <= 126 or code in (10, 13)
+
+
+class TranslationTable(dict):
+    """A table for str.translate() replacing every non ASCII char
+    The table is filled lazily on first use of a char, so the lookup for a char is computed only once.
+    ASCII chars (as allowed in ADI) are kept.
+
+    :param replace: a mapping with non ASCII chars and suiting substitutes (e.g. {'ä':'ae', 'ß':'ss'})
+    :param default: the default substitute if no mapping is found
+    :param translit: use the built-in TRANSLIT_MAP and strip diacritics (e.g. é -> e) before the default is used"""
+
+    def __init__(self, replace: Optional[dict[str, str]] = None, default: str = '_', translit: bool = False):
+        super().__init__()
+        self.default = default
+        self.translit = translit
+        for mapping in (TRANSLIT_MAP if translit else {}, replace or {}):
+            for c, r in mapping.items():
+                if len(c) == 1 and not _is_ascii(ord(c)):
+                    self[ord(c)] = r
+
+    def __missing__(self, code: int) -> Union[int, str]:
+        if _is_ascii(code):
+            self[code] = code
+            return code
+
+        subst = self.default
+        if self.translit:
+            stripped = ''.join(c for c in unicodedata.normalize('NFKD', chr(code)) if _is_ascii(ord(c)))
+            if stripped:
+                subst = stripped
+        self[code] = subst
+        return subst
+
+
+_TABLES = {}
+
+
+def get_translation_table(replace: Optional[dict[str, str]] = None, default: str = '_',
+                          translit: bool = False) -> TranslationTable:
+    """Get a cached translation table to replace non ASCII chars with str.translate()
+    :param replace: a mapping with non ASCII chars and suiting substitutes (e.g. {'ä':'ae', 'ß':'ss'})
+    :param default: the default substitute if no mapping is found
+    :param translit: use the built-in TRANSLIT_MAP and strip diacritics
+    :return: the translation table"""
+    key = (tuple(sorted(replace.items())) if replace else None, default, translit)
+    try:
+        return _TABLES[key]
+    except KeyError:
+        table = _TABLES[key] = TranslationTable(replace, default, translit)
+        return table
+
+
+def replace_non_ascii(text: str, replace: dict[str, str] = None, default: str = '_', translit: bool = False) -> str:
     """Replaces every non ASCII char with a str from a mapping
     :param text: the text containing non ASCII chars
     :param replace: a mapping with non ASCII chars and suiting substitutes (e.g. {'ä':'ae', 'ß':'ss'})
     :param default: the default substitute if no mapping is found
+    :param translit: use the built-in TRANSLIT_MAP and strip diacritics (e.g. é -> e) before the default is used
     :return: text with substitutes"""
-    replace = replace if type(replace) is dict else {}
+    replace = replace if type(replace) is dict else None
     default = default if type(default) is str else '_'
-    for na in find_non_ascii(text):
-        text = text.replace(na, replace.get(na, default))
-    return text
+    return text.translate(get_translation_table(replace, default, translit))
+
+
+SNIFF_SIZE = 1 << 16
+LATIN1_FALLBACK = 'latin1fallback'
+# Encodings of programs known to export non UTF-8 (PROGRAMID in upper case), used if the content is not conclusive
+ENCODING_HINTS: dict[str, str] = {}
+REGEX_PROGRAMID = re.compile(rb'<programid:(\d{1,3})(:[^>]*)?>', re.IGNORECASE)
+_BOMS = ((codecs.BOM_UTF8, 'utf-8-sig'),
+         (codecs.BOM_UTF16_LE, 'utf-16'),
+         (codecs.BOM_UTF16_BE, 'utf-16'),
+         )
+
+
+def _latin1_fallback(exc: UnicodeError) -> tuple[str, int]:
+    if not isinstance(exc, UnicodeDecodeError):
+        raise exc
+    return exc.object[exc.start:exc.end].decode('latin-1'), exc.end
+
+
+codecs.register_error(LATIN1_FALLBACK, _latin1_fallback)
+
+
+def sniff_encoding(prefix: bytes, fallback: str = 'latin-1') -> tuple[str, str]:
+    """Guess the encoding of ADIF data from its first bytes (see SNIFF_SIZE)
+    A BOM is respected. Else the prefix is validated with an incremental UTF-8 decoder. If it is valid UTF-8
+    the error handler LATIN1_FALLBACK is returned, so invalid bytes behind the prefix are decoded as latin-1.
+    If the content is not conclusive the PROGRAMID of the header is looked up in ENCODING_HINTS.
+
+    :param prefix: the first bytes of the data
+    :param fallback: the encoding if the data is not valid UTF-8
+    :return: (encoding, errors) to open the data with"""
+
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding, 'strict'
+
+    hint = None
+    m = REGEX_PROGRAMID.search(prefix)
+    if m:
+        program = prefix[m.end():m.end() + int(m.group(1))].decode('latin-1').strip().upper()
+        hint = ENCODING_HINTS.get(program)
+
+    try:
+        text = codecs.getincrementaldecoder('utf-8')().decode(prefix, final=False)
+    except UnicodeDecodeError:
+        return hint or fallback, 'strict'
+    if hint and text.isascii():
+        return hint, 'strict'
+    return 'utf-8', LATIN1_FALLBACK
 
 
 __all__ = ['get_cur_adif_dt', 'adif_date2iso', 'adif_time2iso', 'iso_date2adif', 'iso_time2adif',
-           'check_format', 'check_call', 'replace_non_ascii',
+           'check_format', 'check_call', 'check_adif_date', 'check_adif_time', 'check_locator',
+           'validate_column', 'VALIDATORS', 'adif2epoch', 'adif2datetime', 'qso_epochs', 'batch_epoch',
+           'replace_non_ascii', 'sniff_encoding', 'SNIFF_SIZE', 'LATIN1_FALLBACK', 'ENCODING_HINTS',
+           'get_translation_table', 'TranslationTable',
+           'TRANSLIT_MAP', 'INTL_FIELDS',
            'REGEX_ADIFDATE', 'REGEX_ADIFTIME', 'REGEX_ISODATE', 'REGEX_ISOTIME',
            'REGEX_EMAIL', 'REGEX_RST', 'REGEX_LOCATOR', 'REGEX_CALL']
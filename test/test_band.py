@@ -0,0 +1,44 @@
+import unittest
+
+import adif_file.adi
+from adif_file import band
+
+
+class Band(unittest.TestCase):
+    def test_10_freq2band(self):
+        self.assertEqual('20m', band.freq2band('14.074'))
+        self.assertEqual('20m', band.freq2band(14.0))
+        self.assertEqual('20m', band.freq2band(14.35))
+        self.assertEqual('2190m', band.freq2band('0.136'))
+        self.assertEqual('6m', band.freq2band('54'))
+        self.assertEqual('5m', band.freq2band('54.1'))
+        self.assertEqual('submm', band.freq2band('300000'))
+        self.assertIsNone(band.freq2band('14.5'))
+        self.assertIsNone(band.freq2band('0.1'))
+        self.assertIsNone(band.freq2band('abc'))
+        self.assertIsNone(band.freq2band(None))
+
+    def test_20_band_range(self):
+        self.assertTupleEqual((144.0, 148.0), band.band_range('2M'))
+        self.assertIsNone(band.band_range('11m'))
+        self.assertTrue(band.check_band('145.5', '2m'))
+        self.assertFalse(band.check_band('145.5', '70cm'))
+        self.assertFalse(band.check_band('x', '2m'))
+
+    def test_30_batch(self):
+        self.assertListEqual(['40m', None, '40m', '70cm'], band.batch_freq2band(['7.1', '', '7.1', 432.2]))
+
+    def test_40_fill_missing_band(self):
+        adi = '<EOH><CALL:6>XX1XXX <FREQ:6>14.074 <FREQ_RX:5>7.150 <EOR>' \
+              '<CALL:6>XX2XXX <FREQ:6>14.074 <BAND:3>40m <EOR>' \
+              '<CALL:6>XX3XXX <FREQ:2>11 <EOR>'
+
+        records = adif_file.adi.loads(adi, stages=[band.fill_missing_band])['RECORDS']
+        self.assertListEqual([{'CALL': 'XX1XXX', 'FREQ': '14.074', 'FREQ_RX': '7.150', 'BAND': '20m', 'BAND_RX': '40m'},
+                              {'CALL': 'XX2XXX', 'FREQ': '14.074', 'BAND': '40m'},
+                              {'CALL': 'XX3XXX', 'FREQ': '11'}],
+                             records)
+
+
+if __name__ == '__main__':
+    unittest.main()
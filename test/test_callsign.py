@@ -0,0 +1,67 @@
+import os
+import unittest
+
+from adif_file import callsign
+
+
+def get_file_path(file):
+    return os.path.join(os.path.dirname(__file__), file)
+
+
+class CallSign(unittest.TestCase):
+    def test_10_parse_call(self):
+        self.assertTupleEqual(('DF1ASC', None, 'DF1ASC', None, 'DF1'), callsign.parse_call('df1asc'))
+        self.assertTupleEqual(('HB9/DF1ASC/P', 'HB9', 'DF1ASC', '/P', 'HB9'), callsign.parse_call('HB9/DF1ASC/P'))
+        self.assertEqual('F0', callsign.parse_call('F/DF1ASC').wpx)
+        self.assertIsNone(callsign.parse_call('DF1 ASC'))
+
+        callsign.parse_call.cache_clear()
+        callsign.parse_call('DF1ASC')
+        callsign.parse_call('DF1ASC')
+        self.assertEqual(1, callsign.parse_call.cache_info().hits)
+
+    def test_20_trie(self):
+        trie = callsign.PrefixTrie()
+        trie.insert('HB', 1)
+        trie.insert('HB0', 2)
+        trie.insert('HB', 3)
+
+        self.assertEqual(2, len(trie))
+        self.assertEqual(3, trie.longest_match('HB9ABC'))
+        self.assertEqual(2, trie.longest_match('HB0ABC'))
+        self.assertIsNone(trie.longest_match('DF1ASC'))
+
+    def test_30_prefix_table(self):
+        table = callsign.PrefixTable.load(get_file_path('testdata/cty.dat'))
+
+        self.assertEqual(4, len(table.entities))
+        self.assertEqual('Fed. Rep. of Germany', table.lookup('DF1ASC').name)
+        self.assertEqual(10.0, table.lookup('DF1ASC').longitude)
+        self.assertEqual('Liechtenstein', table.lookup('HB0ABC').name)
+        self.assertEqual('Liechtenstein', table.lookup('HB3YZ').name)
+        self.assertEqual('Switzerland', table.lookup('HB9/DF1ASC/P').name)
+        self.assertEqual(14, table.lookup('HB3ABC').cq_zone)
+        self.assertEqual('AF', table.lookup('DL0ABC').continent)
+        self.assertEqual('EU', table.lookup('DL0ABD').continent)
+        self.assertEqual('France', table.lookup('F/DF1ASC').name)
+        self.assertIsNone(table.lookup('DF1ASC/MM'))
+        self.assertIsNone(table.lookup('K1ABC'))
+        self.assertIsNone(table.lookup('DF1 ASC'))
+        self.assertEqual(callsign.CACHE_SIZE, table._cache.cache_info().maxsize)
+
+        self.assertRaises(ValueError, callsign.PrefixTable.loads, 'Test: 14: 28: EU;')
+
+    def test_40_analyze_calls(self):
+        table = callsign.PrefixTable.load(get_file_path('testdata/cty.dat'))
+        result = callsign.analyze_calls(['DF1ASC', 'XX 1', 'HB9ABC', 'DF1ASC'], table)
+
+        self.assertEqual(4, len(result))
+        self.assertIs(result[0], result[3])
+        self.assertTupleEqual((None, None), result[1])
+        self.assertEqual('HB9', result[2][0].wpx)
+        self.assertEqual('Switzerland', result[2][1].name)
+        self.assertIsNone(callsign.analyze_calls(['DF1ASC'])[0][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
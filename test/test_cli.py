@@ -0,0 +1,85 @@
+import io
+import os
+import re
+import json
+import unittest
+import contextlib
+
+import adif_file.adi
+import adif_file.adx
+import adif_file.cli
+import adif_file.compressed
+
+
+def get_file_path(file):
+    return os.path.join(os.path.dirname(__file__), file)
+
+
+class CLI(unittest.TestCase):
+    def test_10_conditions(self):
+        cond = adif_file.cli.parse_conditions(['band=630m', 'CALL~^dl', 'MODE!=SSB'])
+        self.assertListEqual([('BAND', '=', '630M'), ('CALL', '~', re.compile('^dl', re.I)), ('MODE', '!=', 'SSB')],
+                             cond)
+        self.assertTrue(adif_file.cli.match({'BAND': '630M', 'CALL': 'DL5HJK', 'MODE': 'AM'}, cond))
+        self.assertFalse(adif_file.cli.match({'BAND': '630M', 'CALL': 'HB9XXX', 'MODE': 'AM'}, cond))
+        self.assertFalse(adif_file.cli.match({'BAND': '630M', 'CALL': 'DL5HJK', 'MODE': 'ssb'}, cond))
+        self.assertRaises(ValueError, adif_file.cli.parse_conditions, ['BAND'])
+        self.assertRaises(ValueError, adif_file.cli.parse_conditions, ['CALL~['])
+        self.assertTrue(adif_file.cli.match({'APP': {'$': 'DL'}}, adif_file.cli.parse_conditions(['APP!=DL'])))
+
+    def test_20_filter_select(self):
+        temp_file = get_file_path('testdata/~test.adi')
+
+        for jobs in ('1', '2'):
+            adif_file.cli.main(['filter', '-i', get_file_path('testdata/goodfile.txt'), '-o', temp_file,
+                                '-j', jobs, 'BAND=630m'])
+            self.assertListEqual(['20231008'] * 2,
+                                 [r['QSO_DATE'] for r in adif_file.adi.load(temp_file)['RECORDS']])
+
+        adif_file.cli.main(['select', '-i', get_file_path('testdata/goodfile.txt'), '-o', temp_file, 'call,band'])
+        self.assertListEqual([{'CALL': 'dl4bdf', 'BAND': '80M'}, {'CALL': 'DL5HJK', 'BAND': '630M'},
+                              {'BAND': '630M'}, {'BAND': '2190M'}, {'BAND': '12M'}],
+                             adif_file.adi.load(temp_file)['RECORDS'])
+        os.remove(temp_file)
+
+        temp_file = get_file_path('testdata/~test.adi.gz')
+        adif_file.cli.main(['convert', '-i', get_file_path('testdata/goodfile.txt'), '-o', temp_file])
+        self.assertEqual('gzip', adif_file.compressed.detect(temp_file))
+        self.assertEqual(5, len(adif_file.adi.load(temp_file)['RECORDS']))
+        os.remove(temp_file)
+
+    def test_30_stats(self):
+        temp_file = get_file_path('testdata/~test.json')
+
+        adif_file.cli.main(['stats', '-i', get_file_path('testdata/goodfile.txt'), '-o', temp_file, '--json'])
+        with open(temp_file) as jf:
+            stats = json.load(jf)
+        self.assertEqual(5, stats['records'])
+        self.assertEqual(2, stats['unique_calls'])
+        self.assertDictEqual({'12M': 1, '2190M': 1, '630M': 2, '80M': 1}, stats['bands'])
+
+        os.remove(temp_file)
+
+    def test_40_convert_adx(self):
+        temp_file = get_file_path('testdata/~test.adi')
+
+        adif_file.cli.main(['convert', '-i', get_file_path('testdata/goodfile.adx'), '-o', temp_file])
+        records = adif_file.adi.load(temp_file)['RECORDS']
+        self.assertEqual(2, len(records))
+        self.assertEqual('Test', records[1]['APP_TESTAPP_TESTFIELD'])
+
+        os.remove(temp_file)
+
+    def test_50_convert_adx_stdout(self):
+        out = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+        with contextlib.redirect_stdout(out):
+            adif_file.cli.main(['convert', '-i', get_file_path('testdata/goodfile.txt'), '-o', '-', '--to', 'adx'])
+        out.flush()
+
+        doc = adif_file.adx.loads(out.buffer.getvalue())
+        self.assertEqual(5, len(doc['RECORDS']))
+        self.assertEqual('dl4bdf', doc['RECORDS'][0]['CALL'])
+
+
+if __name__ == '__main__':
+    unittest.main()
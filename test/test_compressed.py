@@ -0,0 +1,53 @@
+import os
+import unittest
+
+import adif_file.adi
+import adif_file.adx
+from adif_file import compressed
+
+
+def get_file_path(file):
+    return os.path.join(os.path.dirname(__file__), file)
+
+
+class Compressed(unittest.TestCase):
+    extensions = ['.gz', '.bz2', '.xz'] + (['.zst'] if compressed.available('zstd') else [])
+
+    def test_10_detect(self):
+        self.assertEqual('gzip', compressed.from_extension('qsos.adi.GZ'))
+        self.assertIsNone(compressed.from_extension('qsos.adi'))
+        self.assertEqual('qsos.adi', compressed.strip_extension('qsos.adi.xz'))
+        self.assertIsNone(compressed.detect(get_file_path('testdata/goodfile.txt')))
+        self.assertRaises(ValueError, compressed.writer, None, 'zip')
+        self.assertTrue(compressed.available('xz'))
+        self.assertFalse(compressed.available('zip'))
+
+    def test_20_adi(self):
+        adi_dict = adif_file.adi.load(get_file_path('testdata/goodfile.txt'))
+
+        for ext in self.extensions:
+            temp_file = get_file_path('testdata/~test.adi' + ext)
+            stats = adif_file.adi.dump(temp_file, adi_dict, fsync=False)
+            self.assertEqual(os.path.getsize(temp_file), stats.bytes)
+            self.assertEqual(compressed.from_extension(temp_file), compressed.detect(temp_file))
+            self.assertListEqual(adi_dict['RECORDS'], adif_file.adi.load(temp_file)['RECORDS'])
+
+            # Content detection does not rely on the extension
+            plain_file = get_file_path('testdata/~test.adi')
+            os.replace(temp_file, plain_file)
+            self.assertListEqual(adi_dict['RECORDS'], adif_file.adi.load(plain_file)['RECORDS'])
+            os.remove(plain_file)
+
+    def test_30_adx(self):
+        adx_dict = adif_file.adx.load(get_file_path('testdata/goodfile.adx'))
+
+        for ext in self.extensions:
+            temp_file = get_file_path('testdata/~test.adx' + ext)
+            adif_file.adx.dump(temp_file, adx_dict, fsync=False)
+            self.assertEqual(compressed.from_extension(temp_file), compressed.detect(temp_file))
+            self.assertDictEqual(adx_dict, adif_file.adx.load(temp_file, True))
+            os.remove(temp_file)
+
+
+if __name__ == '__main__':
+    unittest.main()
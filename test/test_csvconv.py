@@ -0,0 +1,62 @@
+import os
+import unittest
+
+import adif_file.adi
+import adif_file.csvconv
+
+
+def get_file_path(file):
+    return os.path.join(os.path.dirname(__file__), file)
+
+
+class CSVConv(unittest.TestCase):
+    def test_10_norm(self):
+        self.assertEqual('20250425', adif_file.csvconv.norm2adif('QSO_DATE', '2025-04-25'))
+        self.assertEqual('1125', adif_file.csvconv.norm2adif('TIME_ON', '11:25'))
+        self.assertEqual('11:25', adif_file.csvconv.norm2adif('NAME', '11:25'))
+        self.assertEqual('2025-04-25', adif_file.csvconv.norm2iso('QSO_DATE', '20250425'))
+        self.assertEqual('18:33:45', adif_file.csvconv.norm2iso('TIME_OFF', '183345'))
+        self.assertEqual('2025042', adif_file.csvconv.norm2iso('QSO_DATE', '2025042'))
+
+    def test_20_adi2csv(self):
+        temp_file = get_file_path('testdata/~test.csv')
+
+        self.assertEqual(5, adif_file.csvconv.adi2csv(get_file_path('testdata/goodfile.txt'), temp_file))
+        with open(temp_file, newline='') as cf:
+            lines = cf.read().splitlines()
+        self.assertEqual(6, len(lines))
+        self.assertTrue(lines[0].startswith('QSO_DATE;TIME_ON;CALL;BAND;MODE;RST_SENT;RST_RCVD;NAME;'))
+        self.assertTrue(lines[1].startswith('20231008;1145;dl4bdf;80M;AM;;;Walter;'))
+
+        self.assertEqual(5, adif_file.csvconv.adi2csv(get_file_path('testdata/goodfile.txt'), temp_file,
+                                                      ['QSO_DATE', 'TIME_ON', 'CALL'], iso_format=True))
+        with open(temp_file, newline='') as cf:
+            lines = cf.read().splitlines()
+        self.assertEqual(['QSO_DATE;TIME_ON;CALL', '2023-10-08;11:45;dl4bdf'], lines[:2])
+
+        self.assertEqual(5, adif_file.csvconv.adi2csv(get_file_path('testdata/latin1file.txt'), temp_file,
+                                                      ['CALL', 'NAME']))
+        with open(temp_file, newline='', encoding='utf-8') as cf:
+            self.assertEqual(';Jörg', cf.read().splitlines()[-1])
+
+        os.remove(temp_file)
+
+    def test_30_csv2adi(self):
+        temp_csv = get_file_path('testdata/~test.csv')
+        temp_adi = get_file_path('testdata/~test.adi')
+
+        with open(temp_csv, 'w', newline='') as cf:
+            cf.write('QSO_DATE;TIME_ON;call;NAME\n2025-04-25;11:25;DF1ASC;Andy\n20250426;1126;XX1XXX;\n')
+
+        self.assertEqual(2, adif_file.csvconv.csv2adi(temp_csv, temp_adi, False))
+        adi_dict = adif_file.adi.load(temp_adi)
+        self.assertListEqual([{'QSO_DATE': '20250425', 'TIME_ON': '1125', 'CALL': 'DF1ASC', 'NAME': 'Andy'},
+                              {'QSO_DATE': '20250426', 'TIME_ON': '1126', 'CALL': 'XX1XXX'}],
+                             adi_dict['RECORDS'])
+
+        os.remove(temp_csv)
+        os.remove(temp_adi)
+
+
+if __name__ == '__main__':
+    unittest.main()
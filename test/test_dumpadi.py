@@ -1,4 +1,7 @@
+import io
 import os
+import asyncio
+import warnings
 import unittest
 
 import adif_file.adi
@@ -204,6 +207,148 @@ class DumpADI(unittest.TestCase):
 
         os.remove(temp_file)
 
+    def test_50_async_writer(self):
+        adi_dict = {
+            'HEADER': {'PROGRAMID': 'TProg',
+                       'ADIF_VER': '3',
+                       'PROGRAMVERSION': '1',
+                       'CREATED_TIMESTAMP': '1234'},
+            'RECORDS': [{'TEST1': 'test',
+                         'TEST2': 'test2'},
+                        {},
+                        {'TEST1': 'test3',
+                         'TEST2': 'test4'}]
+        }
+
+        class AsyncFile:
+            def __init__(self):
+                self.data = []
+
+            async def write(self, data):
+                self.data.append(data)
+
+        async def write_all():
+            stream = AsyncFile()
+            writer = adif_file.adi.AsyncWriter(stream, adi_dict['HEADER'])
+            for rec in adi_dict['RECORDS']:
+                await writer.write(rec)
+            await writer.flush()
+            return writer.records, ''.join(stream.data)
+
+        self.assertTupleEqual((2, adif_file.adi.dumps(adi_dict)), asyncio.run(write_all()))
+
+    def test_60_dump_many(self):
+        docs = [{'RECORDS': [{'CALL': f'XX{i}XXX', 'QSO_DATE': '20231204'}]} for i in range(20)]
+
+        self.assertListEqual([adif_file.adi.dumps(d) for d in docs], adif_file.adi.dump_many(docs, 4))
+
+    def test_70_dump_non_ascii(self):
+        adi_dict = {'RECORDS': [{'NAME': 'Jörg', 'QTH': 'Köln', 'NAME_INTL': 'Jörg'},
+                                {'NAME': 'Jürgen', 'QTH': 'Bonn'},
+                                {'NAME': 'Peter', 'QTH': 'Düsseldorf'}]}
+
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            adi_txt = adif_file.adi.dumps(adi_dict)
+        self.assertIn('<NAME:4>J_rg <QTH:4>K_ln', adi_txt)
+        self.assertEqual(2, len(w))  # One warning per tag only
+
+        adi_txt = adif_file.adi.dumps(adi_dict, translit=True, replace={'ü': '_'})
+        self.assertIn('<NAME:5>Joerg <QTH:5>Koeln', adi_txt)
+        self.assertIn('<NAME:6>J_rgen', adi_txt)
+        self.assertRaises(adif_file.adi.StringNotASCIIException, adif_file.adi.dumps, adi_dict, repl_non_ascii=False)
+
+        temp_file = get_file_path('testdata/~test.adi')
+        with open(temp_file, 'w') as af:
+            writer = adif_file.adi.Writer(af, translit=True)
+            for rec in adi_dict['RECORDS']:
+                writer.write(rec)
+        self.assertDictEqual({'NAME': 2, 'QTH': 2}, writer.replaced)
+
+        os.remove(temp_file)
+
+    def test_75_dump_intl(self):
+        adi_dict = {'RECORDS': [{'NAME_INTL': 'Jörg', 'QTH_INTL': 'Köln', 'QTH': 'Cologne'},
+                                {'NAME': 'Peter', 'NAME_INTL': ''}]}
+
+        self.assertEqual('<NAME:5>Joerg <QTH:7>Cologne \n<EOR>\n\n<NAME:5>Peter \n<EOR>',
+                         adif_file.adi.dumps(adi_dict, intl=True))
+        self.assertEqual('<QTH:7>Cologne \n<EOR>\n\n<NAME:5>Peter \n<EOR>', adif_file.adi.dumps(adi_dict))
+
+    def test_77_dump_raw(self):
+        with open(get_file_path('testdata/goodfile.txt')) as af:
+            adi_txt = af.read()
+        raw = list(adif_file.adi.loadi_raw(adi_txt))
+
+        out = io.StringIO()
+        writer = adif_file.adi.Writer(out, raw[0])
+        for rec in raw[1:]:
+            writer.write(rec)
+        self.assertEqual(len(raw) - 1, writer.records)
+        self.assertEqual(adi_txt.strip(), out.getvalue())
+        self.assertEqual(adi_txt.strip(), adif_file.adi.dumps({'HEADER': raw[0], 'RECORDS': raw[1:]}))
+
+        # Verbatim and formatted records can be mixed
+        res = adif_file.adi.dumps({'RECORDS': [raw[1], {'CALL': 'XX1XXX'}]})
+        self.assertEqual(raw[1].text + '\n\n<CALL:6>XX1XXX \n<EOR>', res)
+        self.assertListEqual([raw[1].fields, {'CALL': 'XX1XXX'}], adif_file.adi.loads(res)['RECORDS'])
+
+    def test_80_append(self):
+        header = {'PROGRAMID': 'TProg', 'ADIF_VER': '3', 'PROGRAMVERSION': '1', 'CREATED_TIMESTAMP': '1234'}
+        records = [{'CALL': f'XX{i}XXX', 'QSO_DATE': '20231204'} for i in range(4)]
+        temp_file = get_file_path('testdata/~test.adi')
+
+        for linebreaks in (True, False):
+            adif_file.adi.dump(temp_file, {'HEADER': header, 'RECORDS': records[:2]}, linebreaks=linebreaks)
+            self.assertEqual(2, adif_file.adi.append(temp_file, records[2:] + [{}], linebreaks=linebreaks))
+            self.assertEqual(0, adif_file.adi.append(temp_file, [], linebreaks=linebreaks))
+            with open(temp_file) as af:
+                self.assertEqual(adif_file.adi.dumps({'HEADER': header, 'RECORDS': records}, linebreaks=linebreaks),
+                                 af.read())
+
+        with open(temp_file, 'a') as af:
+            af.write('<CALL:6>XX9XXX')
+        with open(temp_file) as af:
+            content = af.read()
+        self.assertRaises(adif_file.adi.IncompleteFileException, adif_file.adi.append, temp_file, records)
+        with open(temp_file, 'w') as af:
+            af.write(content + ' <EOR>\n')
+        self.assertRaises(adif_file.adi.StringNotASCIIException, adif_file.adi.append, temp_file,
+                          [{'NAME': 'Jörg'}], repl_non_ascii=False)
+        with open(temp_file) as af:
+            self.assertEqual(content + ' <EOR>\n', af.read())
+        os.remove(temp_file)
+
+        self.assertEqual(0, adif_file.adi.append(temp_file, [{}]))
+        self.assertFalse(os.path.exists(temp_file))
+        self.assertEqual(1, adif_file.adi.append(temp_file, records[:1]))
+        self.assertEqual(1, len(adif_file.adi.load(temp_file)['RECORDS']))
+        os.remove(temp_file)
+
+    def test_90_dump_atomic(self):
+        adi_dict = {'RECORDS': [{'CALL': 'XX1XXX', 'NAME': 'Joerg'}, {}, {'CALL': 'XX2XXX'}]}
+        temp_file = get_file_path('testdata/~test.adi')
+
+        stats = adif_file.adi.dump(temp_file, adi_dict, buffering=64, fsync=False)
+        self.assertEqual(2, stats.records)
+        self.assertEqual(os.path.getsize(temp_file), stats.bytes)
+        self.assertEqual(temp_file, stats.file_name)
+
+        os.chmod(temp_file, 0o640)
+        adi_dict['RECORDS'].append({'NAME': 'Jörg'})
+        self.assertRaises(adif_file.adi.StringNotASCIIException, adif_file.adi.dump, temp_file, adi_dict,
+                          repl_non_ascii=False)
+        self.assertEqual(stats.bytes, os.path.getsize(temp_file))
+        self.assertListEqual(['~test.adi'], [f for f in os.listdir(get_file_path('testdata')) if 'test.adi' in f])
+
+        reports = []
+        adif_file.adi.dump(temp_file, adi_dict, report=reports.append)
+        self.assertEqual(3, reports[0].records)
+        if os.name == 'posix':
+            self.assertEqual(0o640, os.stat(temp_file).st_mode & 0o777)
+
+        os.remove(temp_file)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -207,6 +207,55 @@ class DumpADX(unittest.TestCase):
 
         os.remove(temp_file)
 
+    def test_50_dump_atomic(self):
+        adx_dict = {'RECORDS': [{'CALL': 'XX1XXX', 'QSO_DATE': '20231204', 'TIME_ON': '1100'},
+                                {'CALL': 'YY1YYY', 'QSO_DATE': '20231204', 'TIME_ON': '1200'}]}
+        temp_file = get_file_path('testdata/~test.adx')
+        stats = []
+
+        adif_file.adx.dump(temp_file, adx_dict, fsync=False, report=stats.append)
+        self.assertEqual(2, stats[0].records)
+        self.assertEqual(os.path.getsize(temp_file), stats[0].bytes)
+
+        adx_dict['RECORDS'][0]['MY_QTH'] = 'Test'
+        self.assertRaises(adif_file.adx.UndefinedElementException, adif_file.adx.dump, temp_file, adx_dict)
+        self.assertEqual(2, len(adif_file.adx.load(temp_file)['RECORDS']))
+        self.assertListEqual(['~test.adx'], [f for f in os.listdir(get_file_path('testdata')) if 'test.adx' in f])
+
+        os.remove(temp_file)
+
+    def test_60_dump_parallel(self):
+        records = [{'CALL': f'XX{i}XXX', 'QSO_DATE': '20231204', 'TIME_ON': '1100', 'NAME_INTL': 'Jörg'}
+                   for i in range(10)]
+        adx_dict = {'HEADER': {'CREATED_TIMESTAMP': '20231204 100000'}, 'RECORDS': records}
+        temp_file = get_file_path('testdata/~test.adx')
+        temp_file_par = get_file_path('testdata/~test_par.adx')
+        stats = []
+
+        adif_file.adx.dump(temp_file, adx_dict, fsync=False)
+        adif_file.adx.dump(temp_file_par, adx_dict, fsync=False, report=stats.append, workers=2, chunk_size=3)
+        with open(temp_file, 'rb') as f1, open(temp_file_par, 'rb') as f2:
+            self.assertEqual(f1.read(), f2.read())
+        self.assertEqual(10, stats[0].records)
+        self.assertNotIn('ADIF_VER', adx_dict['HEADER'])
+
+        records[0]['MY_QTH'] = 'Test'
+        records[7]['QSO_DATE'] = '2023x204'
+        exc = adif_file.adx.dump(temp_file, adx_dict, False, fsync=False)
+        exc_par = adif_file.adx.dump(temp_file_par, adx_dict, False, fsync=False, workers=2, chunk_size=3)
+        self.assertListEqual([str(e) for e in exc], [str(e) for e in exc_par])
+        self.assertIsInstance(exc_par[0], adif_file.adx.UndefinedElementException)
+        self.assertTrue(str(exc_par[0]).startswith('/ADX/RECORDS/RECORD[1]:'))
+        self.assertIsInstance(exc_par[1], adif_file.adx.MalformedValueException)
+        self.assertTrue(str(exc_par[1]).startswith('/ADX/RECORDS/RECORD[8]/QSO_DATE:'))
+
+        self.assertRaises(adif_file.adx.UndefinedElementException, adif_file.adx.dump, temp_file_par, adx_dict,
+                          workers=2, chunk_size=3)
+        self.assertEqual(10, len(adif_file.adx.load(temp_file_par)['RECORDS']))
+
+        os.remove(temp_file)
+        os.remove(temp_file_par)
+
 
 if __name__ == '__main__':
     unittest.main()
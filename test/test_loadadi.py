@@ -1,16 +1,28 @@
 # PyADIF-File (c) 2024 by Andreas Schawo is licensed under CC BY-SA 4.0.
 # To view a copy of this license, visit http://creativecommons.org/licenses/by-sa/4.0/
 
+import io
 import os
+import asyncio
+import itertools
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 import adif_file.adi
+import adif_file.band
+import adif_file.util
 
 
 def get_file_path(file: str):
     return os.path.join(os.path.dirname(__file__), file)
 
 
+class ChunkedStream(io.StringIO):
+    """Returns tiny chunks to force markers to be split"""
+    def read(self, size=-1):
+        return super().read(3)
+
+
 class LoadADI(unittest.TestCase):
     def test_10_unpack_header(self):
         adi_hdr1 = '''ADIF Export by Testprog
@@ -147,7 +159,110 @@ class LoadADI(unittest.TestCase):
         for exp, rec in zip(rec_list, adif_file.adi.loadi(adi_txt, 2)):
             self.assertDictEqual(exp, rec)
 
-    def test_80_utf8file(self):
+    def test_75_loadi_stream(self):
+        with open(get_file_path('testdata/goodfile.txt')) as af:
+            adi_txt = af.read()
+
+        self.assertListEqual(list(adif_file.adi.loadi(adi_txt)), list(adif_file.adi.loadi(ChunkedStream(adi_txt))))
+        self.assertListEqual(list(adif_file.adi.loadi(adi_txt, 3)),
+                             list(adif_file.adi.loadi(ChunkedStream(adi_txt), 3)))
+        self.assertListEqual([{}], list(adif_file.adi.loadi(ChunkedStream(''))))
+
+        with open(get_file_path('testdata/toomuchheadersfile.txt')) as af:
+            self.assertRaises(adif_file.adi.TooMuchHeadersException, list, adif_file.adi.loadi(af))
+
+    def test_77_aloadi(self):
+        with open(get_file_path('testdata/utf8file.txt'), 'rb') as af:
+            adi_bytes = af.read()
+        exp = list(adif_file.adi.loadi(adi_bytes.decode('utf-8')))
+
+        class ChunkReader:
+            """Returns 1 to 3 bytes per read, so markers and multibyte characters are split
+            One read returns only the lead byte of a multibyte character which decodes to nothing"""
+
+            def __init__(self, data):
+                self.data = data
+                self.pos = 0
+                self.sizes = itertools.cycle((1, 2, 3))
+
+            async def read(self, n):
+                lead = self.data.index(b'\xc3')
+                if self.pos < lead:  # Stop before the lead byte, so the next read holds the lead byte only
+                    size = min(lead - self.pos, next(self.sizes))
+                elif self.pos == lead:
+                    size = 1
+                else:
+                    size = min(n, next(self.sizes))
+                chunk = self.data[self.pos:self.pos + size]
+                self.pos += len(chunk)
+                return chunk
+
+        async def read_all(skip=0, executor=None):
+            reader = ChunkReader(adi_bytes)
+            return [rec async for rec in adif_file.adi.aloadi(reader, skip, yield_every=2, executor=executor)]
+
+        self.assertListEqual(exp, asyncio.run(read_all()))
+        self.assertListEqual([exp[0]] + exp[4:], asyncio.run(read_all(3)))
+        with ThreadPoolExecutor(1) as executor:
+            self.assertListEqual(exp, asyncio.run(read_all(executor=executor)))
+
+    def test_78_parse_many(self):
+        with open(get_file_path('testdata/goodfile.txt')) as af:
+            adi_txt = af.read()
+        with open(get_file_path('testdata/toomuchheadersfile.txt')) as af:
+            adi_bad = af.read()
+
+        exp = adif_file.adi.loads(adi_txt)
+        self.assertListEqual([exp] * 10, adif_file.adi.parse_many([adi_txt] * 10, 4))
+
+        self.assertRaises(adif_file.adi.TooMuchHeadersException, adif_file.adi.parse_many, [adi_txt, adi_bad], 2)
+        res = adif_file.adi.parse_many([adi_txt, adi_bad], 2, return_exceptions=True)
+        self.assertDictEqual(exp, res[0])
+        self.assertIsInstance(res[1], adif_file.adi.TooMuchHeadersException)
+
+    def test_79_load_many(self):
+        good = get_file_path('testdata/goodfile.txt')
+        bad = get_file_path('testdata/toomuchheadersfile.txt')
+        missing = get_file_path('testdata/~missing.adi')
+        exp = adif_file.adi.load(good)
+
+        res = list(adif_file.adi.load_many([good, bad, good, missing], 2, chunksize=2,
+                                           stages=[adif_file.band.fill_missing_band]))
+        self.assertListEqual([good, bad, good, missing], [r[0] for r in res])
+        self.assertTupleEqual((good, exp['HEADER'], exp['RECORDS']), res[0])
+        self.assertEqual(res[0], res[2])
+        self.assertIsNone(res[1][1])
+        self.assertIsInstance(res[1][2], adif_file.adi.TooMuchHeadersException)
+        self.assertIsInstance(res[3][2], FileNotFoundError)
+
+        res = list(adif_file.adi.load_many(get_file_path('testdata/goodfile*.txt'), 2))
+        self.assertListEqual(sorted(r[0] for r in res), [r[0] for r in res])
+        self.assertIn((good, exp['HEADER'], exp['RECORDS']), res)
+        self.assertEqual(3, len(res))
+
+    def test_80_loadi_raw(self):
+        with open(get_file_path('testdata/goodfile.txt')) as af:
+            adi_txt = af.read()
+        exp = list(adif_file.adi.loadi(adi_txt))
+
+        for src in (adi_txt, io.StringIO(adi_txt)):
+            raw = list(adif_file.adi.loadi_raw(src))
+            self.assertListEqual(exp, [r.fields for r in raw])
+            for r in raw:
+                self.assertEqual(adi_txt[r.start:r.end], r.text)
+            self.assertTrue(raw[0].text.startswith('ADIF Export by Testprog'))
+            self.assertTrue(raw[0].text.endswith('<eoh>'))
+            self.assertTrue(raw[1].text.startswith('<QSO_DATE:8>20231008'))
+            self.assertTrue(raw[1].text.endswith('<eor>'))
+
+        raw = list(adif_file.adi.loadi_raw(adi_txt, 2))
+        self.assertListEqual([exp[0]] + exp[3:], [r.fields for r in raw])
+
+        raw = list(adif_file.adi.loadi_raw('<CALL:4>XX1X <EOR>\n <CALL:4>YY1Y <EOR>'))
+        self.assertTupleEqual(({}, '', 0, 0), raw[0])
+        self.assertTupleEqual(({'CALL': 'YY1Y'}, '<CALL:4>YY1Y <EOR>', 20, 38), raw[2])
+
+    def test_81_utf8file(self):
         adi_dict = adif_file.adi.load(get_file_path('testdata/utf8file.txt'), encoding='utf8')
 
         self.assertIn('HEADER', adi_dict)
@@ -156,7 +271,7 @@ class LoadADI(unittest.TestCase):
         self.assertEqual(5, len(adi_dict['RECORDS']))
         self.assertEqual('Jörg', adi_dict['RECORDS'][4]['NAME'])
 
-    def test_81_latin1file(self):
+    def test_82_latin1file(self):
         adi_dict = adif_file.adi.load(get_file_path('testdata/latin1file.txt'), encoding='latin1')
 
         self.assertIn('HEADER', adi_dict)
@@ -165,6 +280,93 @@ class LoadADI(unittest.TestCase):
         self.assertEqual(5, len(adi_dict['RECORDS']))
         self.assertEqual('Jörg', adi_dict['RECORDS'][4]['NAME'])
 
+    def test_83_sniff_encoding(self):
+        for file in ('testdata/utf8file.txt', 'testdata/latin1file.txt'):
+            adi_dict = adif_file.adi.load(get_file_path(file))
+            self.assertEqual('Jörg', adi_dict['RECORDS'][4]['NAME'])
+
+        # Latin-1 behind a valid UTF-8 prefix is still decoded
+        temp_file = get_file_path('testdata/~test.adi')
+        with open(temp_file, 'wb') as af:
+            af.write('<EOH><NAME:4>Jörg <EOR>'.encode('utf-8') + b' ' * adif_file.util.SNIFF_SIZE +
+                     '<NAME:4>Jörg <EOR>'.encode('latin-1'))
+        self.assertListEqual([{'NAME': 'Jörg'}, {'NAME': 'Jörg'}], adif_file.adi.load(temp_file)['RECORDS'])
+        os.remove(temp_file)
+
+    def test_84_load_tolerant(self):
+        adi_txt = '''Test <ADIF_VER:5>3.1.4 <EOH>
+<CALL:4>AAAA <EOR>
+<CALL:x>BBBB <EOR>
+<CALL:4>CCCC <NAME>Test <EOR>
+<CALL:4>DDDD <NAME:4>Test <EOR>
+<CALL:4>EEEE <QTH:3:Test <EOR>'''
+
+        self.assertRaises(adif_file.adi.TagDefinitionException, adif_file.adi.loads, adi_txt)
+        try:
+            adif_file.adi.unpack('<CALL:4>CCCC <NAME>Test')
+        except adif_file.adi.TagDefinitionException as exc:
+            self.assertEqual(13, exc.offset)
+            self.assertEqual('<NAME>', exc.tag)
+
+        for src in (adi_txt, io.StringIO(adi_txt)):
+            errors = []
+            adi_dict = adif_file.adi.loads(src, errors=errors)
+            self.assertDictEqual({'ADIF_VER': '3.1.4'}, adi_dict['HEADER'])
+            self.assertListEqual([{'CALL': 'AAAA'}, {'CALL': 'DDDD', 'NAME': 'Test'}], adi_dict['RECORDS'])
+            self.assertListEqual([2, 3, 5], [e.record for e in errors])
+            self.assertListEqual(['<CALL:x>', '<NAME>', '<QTH:3:Test '], [e.tag for e in errors])
+            self.assertListEqual(['Wrong length', 'Wrong tag definition', 'Wrong tag definition'],
+                                 [e.message for e in errors])
+            for e in errors:
+                self.assertEqual(e.tag, adi_txt[e.offset:e.offset + len(e.tag)])
+
+        errors = []
+        self.assertListEqual([{'CALL': 'DDDD', 'NAME': 'Test'}],
+                             adif_file.adi.loads(adi_txt, 3, errors=errors)['RECORDS'])
+        self.assertListEqual([5], [e.record for e in errors])
+
+        errors = []
+        self.assertDictEqual({'HEADER': {}, 'RECORDS': [{'CALL': 'A'}]},
+                             adif_file.adi.loads('<PROGRAMID:x>Test <EOH><CALL:1>A <EOR>', errors=errors))
+        self.assertTupleEqual((0, 0, '<PROGRAMID:x>', 'Wrong length'), errors[0])
+
+    def test_85_load_lazy(self):
+        adi_txt = '<ADIF_VER:5>3.1.4 <EOH><CALL:4>AAAA <NAME:4>Test <EOR> <CALL:4>BBBB <EOR><CALL:x>CCCC <EOR>'
+        unpacked = []
+
+        def stage(rec):
+            unpacked.append(rec['CALL'])
+            return rec
+
+        adi_dict = adif_file.adi.loads(adi_txt, lazy=True, stages=[stage])
+        self.assertDictEqual({'ADIF_VER': '3.1.4'}, adi_dict['HEADER'])
+        self.assertEqual(3, len(adi_dict['RECORDS']))
+        self.assertListEqual([], unpacked)
+        for rec in adi_dict['RECORDS']:
+            self.assertIsInstance(rec, adif_file.adi.LazyRecord)
+            self.assertFalse(rec.unpacked)
+
+        rec = adi_dict['RECORDS'][0]
+        self.assertEqual('Test', rec['NAME'])
+        self.assertTrue(rec.unpacked)
+        self.assertEqual({'CALL': 'AAAA', 'NAME': 'Test'}, rec)
+        self.assertEqual('AAAA', rec.get('CALL'))
+        self.assertIsNone(rec.get('QTH'))
+        self.assertListEqual(['AAAA'], unpacked)
+        self.assertFalse(adi_dict['RECORDS'][1].unpacked)
+        self.assertRaises(adif_file.adi.TagDefinitionException, len, adi_dict['RECORDS'][2])
+
+        self.assertListEqual([{'CALL': 'BBBB'}],
+                             list(adif_file.adi.loadi(io.StringIO(adi_txt), 1, lazy=True))[1:2])
+        self.assertEqual(adif_file.adi.dumps({'RECORDS': [{'CALL': 'AAAA', 'NAME': 'Test'}]}),
+                         adif_file.adi.dumps({'RECORDS': adi_dict['RECORDS'][:1]}))
+        self.assertRaises(ValueError, adif_file.adi.loads, adi_txt, lazy=True, errors=[])
+
+    def test_86_split(self):
+        adi_txt = '<CALL:4>AAAA <EOR> <CALL:4>BBBB <EOR>'
+        self.assertListEqual([(True, ''), (False, '<CALL:4>AAAA '), (False, ' <CALL:4>BBBB ')],
+                             list(adif_file.adi.split(io.StringIO(adi_txt))))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,5 @@
 import os
+import asyncio
 import unittest
 
 import adif_file.adx
@@ -36,6 +37,8 @@ class LoadADX(unittest.TestCase):
 
         self.maxDiff = None
         self.assertDictEqual(adx_exp_dict, adif_file.adx.load(get_file_path('testdata/goodfile.adx')))
+        with open(get_file_path('testdata/goodfile.adx'), 'rb') as xf:
+            self.assertDictEqual(adx_exp_dict, adif_file.adx.loads(xf, True))
 
     def test_20_badfile(self):
         self.assertRaises(adif_file.adx.XmlSyntaxError, adif_file.adx.load,
@@ -47,6 +50,78 @@ class LoadADX(unittest.TestCase):
         self.assertRaises(adif_file.adx.UndefinedElementException, adif_file.adx.load,
                           get_file_path('testdata/badfile2.adx'), True)
 
+    def test_30_aload(self):
+        async def read_all():
+            reader = asyncio.StreamReader()
+            with open(get_file_path('testdata/goodfile.adx'), 'rb') as xf:
+                reader.feed_data(xf.read())
+            reader.feed_eof()
+            return await adif_file.adx.aload(reader)
+
+        self.assertDictEqual(adif_file.adx.load(get_file_path('testdata/goodfile.adx')), asyncio.run(read_all()))
+
+    def test_40_load_intl(self):
+        adx_dict = adif_file.adx.load(get_file_path('testdata/goodfile.adx'), intl=True)
+
+        self.assertEqual('Test', adx_dict['RECORDS'][0]['QTH_INTL'])
+        self.assertEqual('Töst', adx_dict['RECORDS'][1]['QTH_INTL'])
+        self.assertNotIn('QTH', adx_dict['RECORDS'][1])
+
+    def test_50_load_flat(self):
+        adx_exp_dict = {
+            'HEADER': {'ADIF_VER': '3.1.4',
+                       'CREATED_TIMESTAMP': '20231204 100000',
+                       'PROGRAMID': 'PyADIF-File',
+                       'PROGRAMVERSION': '1'},
+            'RECORDS': [{'CALL': 'XX1XXX',
+                         'QSO_DATE': '20231204',
+                         'TIME_ON': '1100',
+                         'QTH': 'Test'
+                         },
+                        {'CALL': 'YY1YYY',
+                         'QSO_DATE': '20231204',
+                         'TIME_ON': '1200',
+                         'QTH_INTL': 'Töst',
+                         'APP_TESTAPP_TESTFIELD': 'Test',
+                         }]
+        }
+
+        self.maxDiff = None
+        self.assertDictEqual(adx_exp_dict, adif_file.adx.load_flat(get_file_path('testdata/goodfile.adx')))
+        with open(get_file_path('testdata/goodfile.adx'), 'rb') as xf:
+            self.assertDictEqual(adx_exp_dict, adif_file.adx.loads_flat(xf, True))
+        self.assertEqual('Test', adif_file.adx.load_flat(get_file_path('testdata/goodfile.adx'),
+                                                         intl=True)['RECORDS'][0]['QTH_INTL'])
+
+        adx_data = '''<?xml version="1.0" encoding="UTF-8"?>
+<ADX>
+    <HEADER>
+        <ADIF_VER>3.1.4</ADIF_VER>
+        <USERDEF FIELDID="1" TYPE="E" ENUM="{S,M,L}">SWEATERSIZE</USERDEF>
+        <USERDEF FIELDID="2" TYPE="N" RANGE="{5:20}">SHOESIZE</USERDEF>
+        <USERDEF FIELDID="3" TYPE="S">EPC</USERDEF>
+    </HEADER>
+    <RECORDS>
+        <RECORD>
+            <CALL>XX1XXX</CALL>
+            <NAME>Tom &amp; Jerry</NAME>
+            <USERDEF FIELDNAME="SweaterSize">M</USERDEF>
+        </RECORD>
+    </RECORDS>
+</ADX>'''
+        self.assertDictEqual({'HEADER': {'ADIF_VER': '3.1.4',
+                                         'USERDEFS': [{'dtype': 'E', 'userdef': 'SWEATERSIZE,{S,M,L}'},
+                                                      {'dtype': 'N', 'userdef': 'SHOESIZE,{5:20}'},
+                                                      {'dtype': 'S', 'userdef': 'EPC'}]},
+                              'RECORDS': [{'CALL': 'XX1XXX', 'NAME': 'Tom & Jerry', 'SWEATERSIZE': 'M'}]},
+                             adif_file.adx.loads_flat(adx_data))
+        self.assertDictEqual({'HEADER': {}, 'RECORDS': []}, adif_file.adx.loads_flat('<ADX><RECORDS/></ADX>'))
+
+        self.assertRaises(adif_file.adx.XmlSyntaxError, adif_file.adx.load_flat,
+                          get_file_path('testdata/goodfile.txt'))
+        self.assertRaises(adif_file.adx.MalformedValueException, adif_file.adx.load_flat,
+                          get_file_path('testdata/badfile1.adx'), True)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,48 @@
+import math
+import unittest
+
+from adif_file import locator
+
+
+class Locator(unittest.TestCase):
+    def test_10_decode(self):
+        lat, lon = locator.locator2latlon('JO30')
+        self.assertAlmostEqual(50.5, lat)
+        self.assertAlmostEqual(7.0, lon)
+        lat, lon = locator.locator2latlon('jo30uj')
+        self.assertAlmostEqual(50.3958, lat, 3)
+        self.assertAlmostEqual(7.7083, lon, 3)
+        self.assertEqual('JO30uj', locator.latlon2locator(lat, lon))
+        self.assertEqual('JO30uj45', locator.latlon2locator(*locator.locator2latlon('JO30uj45'), 8))
+        self.assertEqual('AA00', locator.latlon2locator(-90, -180, 4))
+
+        self.assertRaises(ValueError, locator.locator2latlon, 'ZZ30')
+        self.assertRaises(ValueError, locator.latlon2locator, 0, 0, 5)
+
+    def test_20_distance(self):
+        dist, brg = locator.locator_distance('JO30uj', 'JN47kp')
+        self.assertAlmostEqual(317, dist, 0)
+        self.assertAlmostEqual(164, brg, 0)
+        self.assertEqual((0.0, 0.0), locator.locator_distance('JO30', 'JO30'))
+        self.assertAlmostEqual(317, locator.qso_distance({'MY_GRIDSQUARE': 'JO30uj', 'GRIDSQUARE': 'JN47kp'}), 0)
+        self.assertIsNone(locator.qso_distance({'MY_GRIDSQUARE': 'JO30uj'}))
+
+    def test_30_batch(self):
+        locs1 = ['JO30uj', 'JO30uj', None, 'JO30']
+        locs2 = ['JN47kp', 'IO91wm', 'JN47kp', 'XX00']
+        exp = [locator.locator_distance('JO30uj', 'JN47kp'), locator.locator_distance('JO30uj', 'IO91wm')]
+
+        for use_numpy in (False, None):
+            dists, brgs = locator.batch_distance(locs1, locs2, use_numpy)
+            self.assertEqual(4, len(dists))
+            for i, (dist, brg) in enumerate(exp):
+                self.assertAlmostEqual(dist, dists[i], 6)
+                self.assertAlmostEqual(brg, brgs[i], 6)
+            self.assertTrue(math.isnan(dists[2]) and math.isnan(brgs[3]))
+
+        self.assertEqual(([], []), locator.batch_distance([], []))
+        self.assertRaises(ValueError, locator.batch_distance, ['JO30'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
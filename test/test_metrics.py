@@ -0,0 +1,94 @@
+import io
+import os
+import json
+import warnings
+import unittest
+
+import adif_file.adi
+import adif_file.adx
+from adif_file import metrics
+
+
+def get_file_path(file):
+    return os.path.join(os.path.dirname(__file__), file)
+
+
+class Metrics(unittest.TestCase):
+    def test_10_activation(self):
+        self.assertIsNone(metrics.current())
+        metrics.count('records_parsed')
+        with metrics.timed('parse'):
+            pass
+
+        with metrics.Metrics() as m1:
+            self.assertIs(m1, metrics.current())
+            with metrics.Metrics() as m2:
+                self.assertIs(m2, metrics.current())
+                metrics.count('records_parsed', 2)
+            self.assertIs(m1, metrics.current())
+            metrics.count('records_parsed')
+        self.assertIsNone(metrics.current())
+
+        self.assertEqual(1, m1.counters['records_parsed'])
+        self.assertEqual(2, m2.counters['records_parsed'])
+        m1.reset()
+        self.assertEqual(0, m1.counters['records_parsed'])
+
+    def test_20_adi(self):
+        file_name = get_file_path('testdata/goodfile.txt')
+        with metrics.Metrics() as m:
+            doc = adif_file.adi.load(file_name)
+
+        self.assertEqual(os.path.getsize(file_name), m.counters['bytes_read'])
+        self.assertEqual(len(doc['RECORDS']) + 1, m.counters['records_parsed'])
+        self.assertEqual(sum(len(r) for r in doc['RECORDS']) + len(doc['HEADER']), m.counters['fields_parsed'])
+        self.assertGreater(m.counters['chars_read'], 0)
+        self.assertEqual(m.counters['chars_read'], m.peak_buffer)
+        self.assertGreater(m.timings['unpack'], 0)
+
+        out = io.StringIO()
+        with metrics.Metrics() as m, warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            adif_file.adi.dump(out, {'HEADER': {}, 'RECORDS': doc['RECORDS'] + [{'NAME': 'Jörg', 'QTH': 'Köln'}]})
+            adif_file.adi.dumps({'RECORDS': [{'NAME': 'Jörg'}]})
+        self.assertEqual(len(doc['RECORDS']) + 2, m.counters['records_written'])
+        self.assertEqual(3, m.counters['warnings'])
+        self.assertEqual(3, m.counters['replaced_values'])
+        self.assertGreater(m.timings['pack'], 0)
+
+    def test_30_adx(self):
+        temp_file = get_file_path('testdata/~test.adx')
+        with metrics.Metrics() as m:
+            doc = adif_file.adx.load(get_file_path('testdata/goodfile.adx'), True)
+            adif_file.adx.load_flat(get_file_path('testdata/goodfile.adx'))
+            adif_file.adx.dump(temp_file, doc, fsync=False)
+
+        self.assertEqual(4, m.counters['records_parsed'])
+        self.assertEqual(2, m.counters['records_written'])
+        self.assertEqual(os.path.getsize(temp_file), m.counters['bytes_written'])
+        for timing in ('validate', 'parse', 'encode', 'write'):
+            self.assertGreater(m.timings[timing], 0)
+
+        os.remove(temp_file)
+
+    def test_40_export(self):
+        m = metrics.Metrics()
+        m.add('records_parsed', 5)
+        m.timings['split'] = 1.5
+        m.buffer(100)
+        m.buffer(10)
+
+        self.assertDictEqual(m.to_dict(), json.loads(m.to_json()))
+        self.assertEqual(5, json.loads(m.to_json())['counters']['records_parsed'])
+        self.assertEqual(100, m.peak_buffer)
+
+        text = m.to_prometheus('test_')
+        self.assertIn('# TYPE test_records_parsed_total counter\ntest_records_parsed_total 5\n', text)
+        self.assertIn('test_seconds_total{step="split"} 1.500000\n', text)
+        self.assertIn('test_peak_buffer_chars 100\n', text)
+        for line in text.splitlines():
+            self.assertTrue(line.startswith('# ') or line.startswith('test_'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+import adif_file.adi
+from adif_file import mode
+
+
+class Mode(unittest.TestCase):
+    def test_10_lookup(self):
+        self.assertIn('USB', mode.modes()['SSB'])
+        self.assertEqual('SSB', mode.submode2mode('usb'))
+        self.assertEqual('MFSK', mode.submode2mode('FT4'))
+        self.assertIsNone(mode.submode2mode('SSB'))
+        self.assertTrue(mode.check_mode('ssb', 'usb'))
+        self.assertTrue(mode.check_mode('CW'))
+        self.assertFalse(mode.check_mode('CW', 'USB'))
+        self.assertFalse(mode.check_mode('USB'))
+
+        with self.assertRaises(TypeError):
+            # noinspection PyUnresolvedReferences
+            mode.modes()['XX'] = frozenset()
+
+    def test_20_normalize(self):
+        self.assertTupleEqual(('SSB', 'USB'), mode.normalize_mode('usb'))
+        self.assertTupleEqual(('SSB', 'LSB'), mode.normalize_mode('SSB', 'lsb'))
+        self.assertTupleEqual(('MFSK', 'FT4'), mode.normalize_mode(None, 'FT4'))
+        self.assertTupleEqual(('CW', None), mode.normalize_mode('cw'))
+        self.assertTupleEqual(('XYZ', 'ABC'), mode.normalize_mode('xyz', 'abc'))
+        self.assertTupleEqual((None, None), mode.normalize_mode(None))
+
+    def test_30_stage(self):
+        adi = '<EOH><MODE:3>usb <EOR><MODE:3>FT8 <EOR><MODE:3>Usb <EOR><MODE:4>MFSK <SUBMODE:3>ft4 <EOR><CALL:1>X <EOR>'
+
+        records = adif_file.adi.loads(adi, stages=[mode.normalize_modes])['RECORDS']
+        self.assertListEqual([{'MODE': 'SSB', 'SUBMODE': 'USB'},
+                              {'MODE': 'FT8'},
+                              {'MODE': 'SSB', 'SUBMODE': 'USB'},
+                              {'MODE': 'MFSK', 'SUBMODE': 'FT4'},
+                              {'CALL': 'X'}],
+                             records)
+        self.assertIs(records[0]['SUBMODE'], records[2]['SUBMODE'])
+
+
+if __name__ == '__main__':
+    unittest.main()
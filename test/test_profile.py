@@ -0,0 +1,49 @@
+import io
+import os
+import pstats
+import unittest
+import tracemalloc
+from contextlib import redirect_stdout
+
+from adif_file import profile
+
+
+def get_file_path(file):
+    return os.path.join(os.path.dirname(__file__), file)
+
+
+class Profile(unittest.TestCase):
+    def test_10_cprofile(self):
+        temp_file = get_file_path('testdata/~test.pstats')
+        out = io.StringIO()
+        with redirect_stdout(out):
+            profile.main(['loads', get_file_path('testdata/goodfile.txt'), '-o', temp_file, '--top', '5'])
+
+        self.assertIn('unpack', out.getvalue())
+        self.assertIn(f'Profile written to {temp_file}', out.getvalue())
+        self.assertGreater(pstats.Stats(temp_file).total_calls, 0)
+
+        os.remove(temp_file)
+
+    def test_20_tracemalloc(self):
+        temp_file = get_file_path('testdata/~test.snapshot')
+        out = io.StringIO()
+        with redirect_stdout(out):
+            profile.main(['load', '-n', '50', '-t', 'tracemalloc', '-o', temp_file])
+
+        self.assertIn('Peak traced memory', out.getvalue())
+        self.assertIn('(50 generated records)', out.getvalue())
+        self.assertGreater(len(tracemalloc.Snapshot.load(temp_file).traces), 0)
+
+        os.remove(temp_file)
+
+    def test_30_prepare(self):
+        res = profile.prepare('adx-load-flat', get_file_path('testdata/goodfile.adx'), '')()
+        self.assertEqual(2, len(res['RECORDS']))
+        self.assertRaises(ValueError, profile.prepare, 'parse', get_file_path('testdata/goodfile.adx'), '')
+        self.assertRaises(ValueError, profile.run, lambda: None, 'perf')
+        self.assertGreaterEqual(profile.run(lambda: None, 'none'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
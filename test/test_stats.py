@@ -0,0 +1,66 @@
+import os
+import pickle
+import unittest
+
+import adif_file.adi
+from adif_file import stats
+
+
+def get_file_path(file):
+    return os.path.join(os.path.dirname(__file__), file)
+
+
+class Stats(unittest.TestCase):
+    def test_10_keys(self):
+        self.assertEqual('DF1', stats.call_prefix({'CALL': 'df1asc/p'}))
+        self.assertEqual('HB9', stats.call_prefix({'CALL': 'HB9/DF1ASC'}))
+        self.assertEqual('F0', stats.call_prefix({'CALL': 'F/DF1ASC'}))
+        self.assertIsNone(stats.call_prefix({'CALL': 'DF1 ASC'}))
+        self.assertEqual('JO30', stats.grid_square({'GRIDSQUARE': 'jo30uj45'}))
+        self.assertIsNone(stats.grid_square({'GRIDSQUARE': 'ZZ30'}))
+        self.assertEqual('20231008 114500', stats.qso_datetime({'QSO_DATE': '20231008', 'TIME_ON': '1145'}))
+
+    def test_20_aggregate(self):
+        records = adif_file.adi.load(get_file_path('testdata/goodfile.txt'))['RECORDS']
+        result = stats.aggregate(records, stats.default_aggregates())
+
+        self.assertEqual(5, result['records'])
+        self.assertEqual(2, result['unique_calls'])
+        self.assertEqual(1, result['unique_grids'])
+        self.assertEqual('20231008 114500', result['first_qso'])
+        self.assertEqual('20231008 175500', result['last_qso'])
+        self.assertDictEqual({'12M': 1, '2190M': 1, '630M': 2, '80M': 1}, result['bands'])
+        self.assertDictEqual({'DL4': 1, 'DL5': 1}, result['prefixes'])
+
+    def test_30_merge(self):
+        records = adif_file.adi.load(get_file_path('testdata/goodfile.txt'))['RECORDS']
+        exp = stats.aggregate(records, stats.default_aggregates())
+
+        first = stats.collect(records[:2], stats.default_aggregates())
+        second = pickle.loads(pickle.dumps(stats.collect(records[2:], stats.default_aggregates())))
+        self.assertDictEqual(exp, stats.results(stats.merge(first, second)))
+
+        class Incomplete(stats.Aggregate):
+            def add(self, record: dict):
+                pass
+
+        self.assertRaises(TypeError, Incomplete)
+
+    def test_40_hyperloglog(self):
+        records = [{'CALL': f'DL{i}ABC'} for i in range(20000)]
+        aggs = {'exact': stats.DistinctCount('CALL'), 'approx': stats.DistinctCount('CALL', True)}
+
+        result = stats.aggregate(records + records[:5000], aggs)
+        self.assertEqual(20000, result['exact'])
+        self.assertAlmostEqual(20000, result['approx'], delta=20000 * 0.05)
+
+        hll1, hll2 = stats.HyperLogLog(), stats.HyperLogLog()
+        for i in range(100):
+            hll1.add(str(i))
+            hll2.add(str(i + 50))
+        hll1.merge(hll2)
+        self.assertAlmostEqual(150, hll1.count(), delta=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
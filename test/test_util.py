@@ -111,3 +111,74 @@ class Util(unittest.TestCase):
         self.assertEqual(txt_ascii_default, replace_non_ascii(txt_non_ascii))
         self.assertEqual(txt_ascii_defsharp, replace_non_ascii(txt_non_ascii, default='#'))
         self.assertEqual(txt_ascii_de, replace_non_ascii(txt_non_ascii, ascii_map))
+
+    def test_210_replace_translit(self):
+        self.assertEqual('Joerg Sass Cafe Lodz', replace_non_ascii('Jörg Saß Café Łódź', translit=True))
+        self.assertEqual('Joerg Sas_', replace_non_ascii('Jörg Saß', {'ö': 'oe', 'ß': 's_'}, translit=True))
+        self.assertEqual('Tab_and_?', replace_non_ascii('Tab\tand\x00中', {'中': '?'}))
+        self.assertEqual('Keep\r\nlines', replace_non_ascii('Keep\r\nlines'))
+
+    def test_220_translation_table(self):
+        table = get_translation_table({'ä': 'ae'}, '#')
+        self.assertIs(table, get_translation_table({'ä': 'ae'}, '#'))
+        self.assertEqual('aeb#', 'äbé'.translate(table))
+
+    def test_300_fast_checks(self):
+        import random
+
+        random.seed(4711)
+        samples = ['20251231', '02251231', '20250001', '20251300', '2025123', '2025123x', '2025１231',
+                   '2359', '235959', '2400', '2360', '235960', '0000', '000000', '12345',
+                   'JO30', 'jo30uj', 'JO30UJ45', 'SO30', 'JO3O', 'JO30uy', 'JO30uj4', 'JO30uj4a', 'AA00aa00']
+        chars = '0123456789ARSXYarsxy'
+        for _ in range(3000):
+            samples.append(''.join(random.choice(chars) for _ in range(random.choice((4, 6, 8)))))
+
+        for txt in samples:
+            self.assertEqual(check_format(REGEX_ADIFDATE, txt), check_adif_date(txt), txt)
+            self.assertEqual(check_format(REGEX_ADIFTIME, txt), check_adif_time(txt), txt)
+            self.assertEqual(check_format(REGEX_LOCATOR, txt), check_locator(txt), txt)
+
+    def test_310_validate_column(self):
+        dates = ['20251231', None, '2025-12-31', '20251231', '']
+
+        self.assertListEqual([True, False, False, True, False], validate_column(dates, 'date'))
+        self.assertListEqual([2], validate_column(dates, 'DATE', bad_indices=True, allow_empty=True))
+        self.assertListEqual([True, False, True], validate_column(['59', '5x', '-10'], 'rst'))
+        self.assertListEqual([1], validate_column(['a@b.de', 'ab.de'], REGEX_EMAIL, True))
+        self.assertRaises(ValueError, validate_column, dates, 'datum')
+
+    def test_320_epoch(self):
+        import datetime
+
+        self.assertEqual(1735689600, adif2epoch('20250101'))
+        self.assertEqual(1735689600 + 3600 + 120 + 3, adif2epoch('20250101', '010203'))
+        self.assertEqual(datetime.datetime(2025, 1, 1, 1, 2, tzinfo=datetime.timezone.utc),
+                         adif2datetime('20250101', '0102'))
+        self.assertRaises(ValueError, adif2epoch, '20251301')
+        self.assertRaises(ValueError, adif2epoch, '20250101', '2460')
+
+        self.assertTupleEqual((1735689600 + 82800, 1735689600 + 86400 + 60),
+                              qso_epochs({'QSO_DATE': '20250101', 'TIME_ON': '2300', 'TIME_OFF': '0001'}))
+        self.assertTupleEqual((1735689600, None), qso_epochs({'QSO_DATE': '20250101', 'TIME_ON': '0000'}))
+
+        self.assertListEqual([1735689600, None, None, 1735689660],
+                             batch_epoch(['20250101', None, '2025', '20250101'], ['0000', '0000', '0000', '0001']))
+        self.assertListEqual([1735689600], batch_epoch(['20250101']))
+
+    def test_330_sniff_encoding(self):
+        self.assertTupleEqual(('utf-8', LATIN1_FALLBACK), sniff_encoding('<NAME:4>Jörg'.encode('utf-8')))
+        self.assertTupleEqual(('utf-8', LATIN1_FALLBACK), sniff_encoding('<NAME:4>Jörg'.encode('utf-8')[:-3]))
+        self.assertTupleEqual(('latin-1', 'strict'), sniff_encoding('<NAME:4>Jörg'.encode('latin-1')))
+        self.assertTupleEqual(('cp1252', 'strict'), sniff_encoding('<NAME:4>Jörg'.encode('latin-1'), 'cp1252'))
+        self.assertTupleEqual(('utf-8-sig', 'strict'), sniff_encoding('\ufeff<EOH>'.encode('utf-8')))
+        self.assertTupleEqual(('utf-16', 'strict'), sniff_encoding('<EOH>'.encode('utf-16')))
+        self.assertEqual('Jörg Jörg', (b'J\xf6rg ' + 'Jörg'.encode('utf-8')).decode('utf-8', LATIN1_FALLBACK))
+
+        ENCODING_HINTS['TESTPROG'] = 'cp1252'
+        try:
+            self.assertTupleEqual(('cp1252', 'strict'), sniff_encoding(b'<PROGRAMID:8>Testprog <EOH>'))
+            self.assertTupleEqual(('utf-8', LATIN1_FALLBACK),
+                                  sniff_encoding('<PROGRAMID:8>Testprog <EOH> Jörg'.encode('utf-8')))
+        finally:
+            del ENCODING_HINTS['TESTPROG']